@@ -0,0 +1,43 @@
+"""
+File: __init__.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    The benchmarks log to the console only,
+    the log files of util and util_instance_mode are removed before any benchmark runs,
+    so the runs do not write into log/.
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+from util.logging import logger, log_files
+from util_instance_mode.logging import log_files as instance_mode_log_files
+
+for sink in log_files + instance_mode_log_files:
+    logger.remove(sink)
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
@@ -0,0 +1,206 @@
+"""
+File: atlas_draws.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    Compare the glyph atlas with the old one-texture-per-glyph path.
+    It reports the draw calls, texture binds and the frame time.
+
+    BENCH_GL=egl python -m benchmark.atlas_draws --font ./some.ttf
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+from .headless import HeadlessContext
+
+import sys
+import time
+import argparse
+import freetype
+
+from util.easy_import import *
+from util.gl_stats import gl_stats
+from util.text_render import TextRenderer
+from util.text_layout import VERTEX_FLOATS, vertex_colors, vertex_opposites
+from OpenGL.GL import *
+
+LINES = [
+    'The quick brown fox jumps over the lazy dog. 0123456789',
+    'GLFW is rendering at 1920 x 1080 (60 Hz) | FPS: 59.94',
+    '窗口获得焦点，中文测试：天地玄黄，宇宙洪荒。日月盈昃，辰宿列张。',
+]
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+class PerGlyphTextRenderer(TextRenderer):
+    '''
+    The old path, one texture per glyph, one bind and one draw per glyph.
+    '''
+
+    def load_char(self, char):
+        if char in self.characters:
+            return self.characters[char]
+
+        face = self.faces.face(char)
+        face.load_char(char, freetype.FT_LOAD_RENDER)
+        bitmap = face.glyph.bitmap
+        glyph = face.glyph
+
+        texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, texture)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+
+        if bitmap.pixel_mode == freetype.FT_PIXEL_MODE_MONO:
+            data = self.mono_to_grayscale(bitmap)
+        else:
+            data = np.array(bitmap.buffer, dtype=np.ubyte)
+
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+
+        if bitmap.width > 0 and bitmap.rows > 0:
+            glTexImage2D(GL_TEXTURE_2D, 0, GL_RED, bitmap.width,
+                         bitmap.rows, 0, GL_RED, GL_UNSIGNED_BYTE, data)
+        else:
+            glTexImage2D(GL_TEXTURE_2D, 0, GL_RED, 1, 1, 0,
+                         GL_RED, GL_UNSIGNED_BYTE, np.array([0], dtype=np.ubyte))
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+        self.characters[char] = {
+            'texture': texture,
+            'size': (bitmap.width, bitmap.rows),
+            'bearing': (glyph.bitmap_left, glyph.bitmap_top),
+            'advance': glyph.advance.x >> 6
+        }
+        return self.characters[char]
+
+    def render_text(self, text, x, y, scale=1.0, color=(1.0, 1.0, 1.0)):
+        if not text:
+            return
+
+        glUseProgram(self.shader_program)
+        glUniformMatrix4fv(glGetUniformLocation(self.shader_program, "projection"),
+                           1, GL_FALSE, self.projection)
+        glActiveTexture(GL_TEXTURE0)
+        glBindVertexArray(self.vao)
+
+        vertices = []
+        textures_used = []
+        for char in text:
+            ch = self.load_char(char)
+            xpos = x + ch['bearing'][0] * scale
+            ypos = y - (ch['size'][1] - ch['bearing'][1]) * scale
+            w = ch['size'][0] * scale
+            h = ch['size'][1] * scale
+            x += ch['advance'] * scale
+            if not all([w > 0, h > 0]):
+                continue
+            start = len(vertices) // 4
+            vertices.extend([
+                xpos, ypos + h, 0.0, 0.0,
+                xpos + w, ypos, 1.0, 1.0,
+                xpos, ypos, 0.0, 1.0,
+                xpos, ypos + h, 0.0, 0.0,
+                xpos + w, ypos + h, 1.0, 0.0,
+                xpos + w, ypos, 1.0, 1.0,
+            ])
+            textures_used.append((ch['texture'], start, 6))
+
+        if vertices:
+            vertices_array = np.zeros(
+                (len(vertices) // 4, VERTEX_FLOATS), dtype=np.float32)
+            vertices_array[:, :4] = np.reshape(vertices, (-1, 4))
+            vertex_colors(vertices_array)[:] = np.round(
+                np.array([*color[:3], 1.0]) * 255)
+            # 每个字符一张纹理，对角的纹理坐标是 1 - uv
+            vertex_opposites(vertices_array)[:] = np.round(
+                (1 - vertices_array[:, 2:4]) * 65535)
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+            glBufferSubData(GL_ARRAY_BUFFER, 0,
+                            vertices_array.nbytes, vertices_array)
+            for texture, start, count in textures_used:
+                glBindTexture(GL_TEXTURE_2D, texture)
+                glDrawArrays(GL_TRIANGLES, start, count)
+
+        glBindVertexArray(0)
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+
+def run(renderer, ctx, frames):
+    # Load the glyphs before timing
+    for line in LINES:
+        renderer.render_text(line, 10, 10, 0.5)
+    ctx.swap()
+
+    gl_stats.reset()
+    frame_times = []
+    for _ in range(frames):
+        tic = time.perf_counter()
+        glClear(GL_COLOR_BUFFER_BIT)
+        y = ctx.height - 60
+        for line in LINES:
+            renderer.render_text(line, 10, y, 0.5, (1.0, 1.0, 1.0))
+            y -= 40
+        ctx.swap()
+        frame_times.append(time.perf_counter() - tic)
+        gl_stats.new_frame()
+
+    frame_times = np.array(frame_times) * 1000
+    calls = gl_stats.stats()['totals']['calls']
+    return {
+        'draws/frame': calls.get('glDrawArrays', 0) / frames,
+        'binds/frame': calls.get('glBindTexture', 0) / frames,
+        'frame(ms) mean': frame_times.mean(),
+        'frame(ms) p95': np.percentile(frame_times, 95),
+    }
+
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--font', required=True)
+    parser.add_argument('--size', type=int, default=48)
+    parser.add_argument('--frames', type=int, default=200)
+    args = parser.parse_args()
+
+    ctx = HeadlessContext()
+    logger.info(f'Benchmark on: {ctx.renderer()}')
+
+    glEnable(GL_BLEND)
+    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+
+    # 计数 util 的模块以及本模块中逐字绘制的调用
+    gl_stats.enable([sys.modules[__name__]])
+    for cls in [PerGlyphTextRenderer, TextRenderer]:
+        renderer = cls()
+        renderer.default_font_path = args.font
+        renderer.load_font(args.font, args.size)
+        renderer.init_shader(ctx.width, ctx.height)
+        result = run(renderer, ctx, args.frames)
+        print(cls.__name__)
+        for k, v in result.items():
+            print(f'    {k:16s}{v:10.3f}')
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
@@ -0,0 +1,138 @@
+"""
+File: bitmap_ingest.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    Microbenchmark of the glyph bitmap ingestion,
+    the old python loops against the bitmap_to_array of util.glyph_bitmap.
+    It needs no OpenGL context.
+
+    The mono bitmaps are rendered with FT_LOAD_TARGET_MONO at many sizes,
+    and the embedded bitmap strikes of the font are used as well if it has any.
+
+    python -m benchmark.bitmap_ingest --font ./some.ttf
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+import time
+import argparse
+import freetype
+
+from util.easy_import import *
+from util.glyph_bitmap import bitmap_to_array
+
+SAMPLE = 'AbgQWjy@#0123456789'
+SIZES = [8, 12, 16, 24, 32, 48, 64, 96, 128]
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+def mono_to_grayscale_loop(bitmap):
+    '''The old path, one pixel at a time.'''
+    width = bitmap.width
+    rows = bitmap.rows
+    pitch = bitmap.pitch
+    data = np.zeros((rows, width), dtype=np.ubyte)
+    for y in range(rows):
+        for x in range(width):
+            byte_index = y * pitch + x // 8
+            bit_index = 7 - (x % 8)
+            if byte_index < len(bitmap.buffer):
+                byte_val = bitmap.buffer[byte_index]
+                bit_val = (byte_val >> bit_index) & 1
+                data[y, x] = 255 if bit_val else 0
+    return data.flatten()
+
+
+def ingest_loop(bitmap):
+    if bitmap.pixel_mode == freetype.FT_PIXEL_MODE_MONO:
+        return mono_to_grayscale_loop(bitmap)
+    return np.array(bitmap.buffer, dtype=np.ubyte)
+
+
+def ingest_numpy(bitmap):
+    return bitmap_to_array(bitmap)
+
+
+def strikes(face):
+    '''The (label, flags, set_size) of the sizes to measure.'''
+    cases = []
+    for size in SIZES:
+        cases.append((f'mono {size}px', freetype.FT_LOAD_RENDER | freetype.FT_LOAD_TARGET_MONO,
+                      lambda s=size: face.set_pixel_sizes(0, s)))
+        cases.append((f'gray {size}px', freetype.FT_LOAD_RENDER,
+                      lambda s=size: face.set_pixel_sizes(0, s)))
+    # 字体内嵌的位图字号
+    for i, strike in enumerate(face.available_sizes):
+        cases.append((f'strike {strike.height}px', freetype.FT_LOAD_RENDER,
+                      lambda i=i: face.select_size(i)))
+    return cases
+
+
+def measure(face, chars, flags, fn, repeat):
+    '''The seconds of ingesting every char once, the best of the repeats.'''
+    best = float('inf')
+    for _ in range(repeat):
+        elapsed = 0.0
+        for char in chars:
+            face.load_char(char, flags)
+            bitmap = face.glyph.bitmap
+            t = time.perf_counter()
+            fn(bitmap)
+            elapsed += time.perf_counter() - t
+        best = min(best, elapsed)
+    return best
+
+
+def check(face, chars, flags):
+    '''Both paths give the same pixels, where the old path is right (positive pitch == width).'''
+    for char in chars:
+        face.load_char(char, flags)
+        bitmap = face.glyph.bitmap
+        got = bitmap_to_array(bitmap)
+        assert got.shape == (bitmap.rows, bitmap.width)
+        if bitmap.pixel_mode == freetype.FT_PIXEL_MODE_GRAY and bitmap.pitch != bitmap.width:
+            continue
+        expect = ingest_loop(bitmap)
+        assert np.array_equal(expect, got.ravel()), char
+
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--font', required=True)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    face = freetype.Face(args.font)
+
+    print(f'{"case":>14s}{"loop(us)":>12s}{"numpy(us)":>12s}{"speedup":>10s}')
+    for label, flags, set_size in strikes(face):
+        set_size()
+        check(face, SAMPLE, flags)
+        t_loop = measure(face, SAMPLE, flags, ingest_loop, args.repeat)
+        t_numpy = measure(face, SAMPLE, flags, ingest_numpy, args.repeat)
+        n = len(SAMPLE)
+        print(f'{label:>14s}{t_loop/n*1e6:12.1f}{t_numpy/n*1e6:12.1f}{t_loop/t_numpy:10.1f}')
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
@@ -0,0 +1,129 @@
+"""
+File: first_frame.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    Time-to-first-frame of a text heavy overlay,
+    without the glyph disk cache, with the cold cache and with the warm cache.
+
+    The first frame draws every char of the charset once,
+    the time counts from creating the TextRenderer to the finished frame.
+
+    BENCH_GL=egl python -m benchmark.first_frame --font ./some.ttf
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+from .headless import HeadlessContext
+
+import time
+import shutil
+import argparse
+import tempfile
+import freetype
+from OpenGL.GL import *
+
+from util.easy_import import *
+from util.gl_state import gl_state
+from util.text_render import TextRenderer
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+def font_charset(font_path, count):
+    '''
+    The first count chars the font has, the CJK chars first.
+    '''
+    face = freetype.Face(font_path)
+    chars = []
+    for start, stop in [(0x4E00, 0xA000), (0x21, 0x4E00)]:
+        for codepoint in range(start, stop):
+            if face.get_char_index(codepoint) > 0:
+                chars.append(chr(codepoint))
+                if len(chars) == count:
+                    return ''.join(chars)
+    return ''.join(chars)
+
+
+def first_frame(ctx, font_path, size, charset, cache_dir, line_length=40):
+    '''
+    :return seconds float: the time-to-first-frame.
+    :return stats dict: the cache_stats() after the frame.
+    '''
+    gl_state.invalidate()
+    t = time.perf_counter()
+
+    renderer = TextRenderer(max_cache_size=len(charset) + 1,
+                            max_cache_bytes=1 << 30, disk_cache_dir=cache_dir)
+    renderer.default_font_path = font_path
+    renderer.load_font(font_path, size)
+    renderer.init_shader(ctx.width, ctx.height)
+
+    glClear(GL_COLOR_BUFFER_BIT)
+    renderer.new_frame()
+    for i in range(0, len(charset), line_length):
+        y = ctx.height - size * (1 + i // line_length) % ctx.height
+        renderer.queue_text(charset[i:i+line_length], 0, y, 0.5)
+    renderer.flush()
+    ctx.swap()
+
+    seconds = time.perf_counter() - t
+    stats = renderer.cache_stats()
+    if renderer.disk_cache is not None:
+        renderer.disk_cache.save()
+    renderer.atlas.release()
+    renderer.stream.release()
+    return seconds, stats
+
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--font', required=True)
+    parser.add_argument('--size', type=int, default=48)
+    parser.add_argument('--chars', type=int, default=3500)
+    args = parser.parse_args()
+
+    ctx = HeadlessContext()
+    glEnable(GL_BLEND)
+    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+    print(f'Renderer: {ctx.renderer()}')
+
+    charset = font_charset(args.font, args.chars)
+    print(f'Charset: {len(charset)} chars')
+
+    # 先完整运行一次，着色器编译和驱动的初始化不计入结果
+    first_frame(ctx, args.font, args.size, charset, None)
+
+    cache_dir = tempfile.mkdtemp(prefix='glyph-cache-')
+    try:
+        print(f'{"case":>10s}{"first frame(ms)":>18s}{"disk hits":>12s}{"disk misses":>14s}')
+        for case, folder in [('no cache', None), ('cold', cache_dir), ('warm', cache_dir)]:
+            seconds, stats = first_frame(
+                ctx, args.font, args.size, charset, folder)
+            disk = stats['disk_cache'] or {'hits': 0, 'misses': 0}
+            print(
+                f'{case:>10s}{seconds*1000:18.1f}{disk["hits"]:12d}{disk["misses"]:14d}')
+    finally:
+        shutil.rmtree(cache_dir)
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
@@ -0,0 +1,152 @@
+"""
+File: headless.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    Offscreen OpenGL context for the benchmarks.
+
+    Select the backend with the BENCH_GL environment variable,
+    it must be decided before OpenGL.GL is imported.
+
+    - glfw: hidden GLFW window, needs a display (real or Xvfb).
+    - egl:  surfaceless EGL context rendering into a FBO, needs no display.
+
+    Run the benchmarks from the repository root, e.g.
+    BENCH_GL=egl python -m benchmark.atlas_draws --font ./some.ttf
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+import os
+import ctypes
+
+BACKEND = os.environ.get('BENCH_GL', 'glfw')
+
+if BACKEND == 'egl':
+    os.environ.setdefault('PYOPENGL_PLATFORM', 'egl')
+    os.environ.setdefault('EGL_PLATFORM', 'surfaceless')
+
+from OpenGL.GL import *
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+class HeadlessContext:
+    '''
+    The offscreen context, make it current on creating.
+    It is the 3.3 core profile, or the compatibility profile for the fixed-function drawing,
+    like util_instance_mode.
+    '''
+
+    def __init__(self, width=1280, height=720, compatibility=False):
+        self.width = width
+        self.height = height
+        self.backend = BACKEND
+        self.compatibility = compatibility
+
+        if self.backend == 'egl':
+            self._init_egl()
+        elif self.backend == 'glfw':
+            self._init_glfw()
+        else:
+            raise ValueError(f'Unknown BENCH_GL backend: {self.backend}')
+
+    def _init_glfw(self):
+        import glfw
+
+        if not glfw.init():
+            raise RuntimeError('Failed initialize GLFW')
+
+        if not self.compatibility:
+            glfw.window_hint(glfw.CONTEXT_VERSION_MAJOR, 3)
+            glfw.window_hint(glfw.CONTEXT_VERSION_MINOR, 3)
+            glfw.window_hint(glfw.OPENGL_PROFILE, glfw.OPENGL_CORE_PROFILE)
+        glfw.window_hint(glfw.VISIBLE, glfw.FALSE)
+
+        self.window = glfw.create_window(
+            self.width, self.height, 'Benchmark', None, None)
+        if not self.window:
+            glfw.terminate()
+            raise RuntimeError(f'Can not create window: {glfw.get_error()}')
+        glfw.make_context_current(self.window)
+
+    def _init_egl(self):
+        from OpenGL import EGL
+
+        display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        major, minor = EGL.EGLint(), EGL.EGLint()
+        if not EGL.eglInitialize(display, ctypes.pointer(major), ctypes.pointer(minor)):
+            raise RuntimeError('Failed initialize EGL')
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+
+        config_attribs = (EGL.EGLint * 5)(
+            EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+            EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+            EGL.EGL_NONE)
+        config = EGL.EGLConfig()
+        num_configs = EGL.EGLint()
+        EGL.eglChooseConfig(display, config_attribs, ctypes.pointer(config),
+                            1, ctypes.pointer(num_configs))
+        if num_configs.value < 1:
+            raise RuntimeError('No EGL config for desktop OpenGL')
+
+        if self.compatibility:
+            context_attribs = (EGL.EGLint * 3)(
+                EGL.EGL_CONTEXT_OPENGL_PROFILE_MASK, EGL.EGL_CONTEXT_OPENGL_COMPATIBILITY_PROFILE_BIT,
+                EGL.EGL_NONE)
+        else:
+            context_attribs = (EGL.EGLint * 7)(
+                EGL.EGL_CONTEXT_MAJOR_VERSION, 3,
+                EGL.EGL_CONTEXT_MINOR_VERSION, 3,
+                EGL.EGL_CONTEXT_OPENGL_PROFILE_MASK, EGL.EGL_CONTEXT_OPENGL_CORE_PROFILE_BIT,
+                EGL.EGL_NONE)
+        context = EGL.eglCreateContext(
+            display, config, EGL.EGL_NO_CONTEXT, context_attribs)
+        EGL.eglMakeCurrent(display, EGL.EGL_NO_SURFACE,
+                           EGL.EGL_NO_SURFACE, context)
+
+        # There is no default framebuffer, draw into the FBO.
+        self.fbo = glGenFramebuffers(1)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
+        self.rbo = glGenRenderbuffers(1)
+        glBindRenderbuffer(GL_RENDERBUFFER, self.rbo)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8,
+                              self.width, self.height)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0,
+                                  GL_RENDERBUFFER, self.rbo)
+        glViewport(0, 0, self.width, self.height)
+
+    def renderer(self):
+        return glGetString(GL_RENDERER).decode()
+
+    def swap(self):
+        '''
+        Finish the frame, so the frame time includes the GPU work.
+        '''
+        if self.backend == 'glfw':
+            import glfw
+            glfw.swap_buffers(self.window)
+        glFinish()
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
@@ -0,0 +1,227 @@
+"""
+File: instance_mode_text.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    Compare the util_instance_mode renderer with its old glBegin/glEnd path.
+    The old one has one RGBA texture for every glyph, one glBegin(GL_QUADS) for every char,
+    and queries the viewport on every render_text().
+    The new one draws every string from the vertex arrays with the GL_ALPHA atlas.
+    It reports the GL calls, the texture memory and the frame time,
+    on the compatibility profile context.
+
+    BENCH_GL=egl python -m benchmark.instance_mode_text --font ./some.ttf
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+from .headless import HeadlessContext
+
+import sys
+import time
+import argparse
+import freetype
+
+import util_instance_mode.text_render as text_render
+from util_instance_mode.easy_import import *
+from util_instance_mode.text_render import TextRenderer
+from util.gl_stats import gl_stats
+from OpenGL.GL import *
+
+LINES = [
+    'The quick brown fox jumps over the lazy dog. 0123456789',
+    'GLFW is rendering at 1920 x 1080 (60 Hz) | FPS: 59.94',
+    'Welcome to my GLFW window, the damage is 1234 points!',
+]
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+class ImmediateTextRenderer(TextRenderer):
+    '''
+    The old path, one RGBA texture per glyph, and one glBegin/glEnd per char.
+    '''
+
+    def load_char(self, char):
+        if char in self.characters:
+            return self.characters[char]
+
+        self.face.load_char(char, freetype.FT_LOAD_RENDER |
+                            freetype.FT_LOAD_TARGET_LIGHT)
+        face = self.face
+        if self.face.get_char_index(char) == 0:
+            self.default_face.load_char(char, freetype.FT_LOAD_RENDER |
+                                        freetype.FT_LOAD_TARGET_LIGHT)
+            face = self.default_face
+        bitmap = face.glyph.bitmap
+        metrics = face.glyph.metrics
+
+        buffer = np.array(bitmap.buffer, dtype=np.uint8).reshape(
+            (bitmap.rows, bitmap.width))
+        rgba_data = np.zeros((bitmap.rows, bitmap.width, 4), dtype=np.uint8)
+        rgba_data[..., :3] = 255
+        rgba_data[..., 3] = buffer
+
+        texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, texture)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, bitmap.width, bitmap.rows,
+                     0, GL_RGBA, GL_UNSIGNED_BYTE, rgba_data.flatten())
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+
+        descender = bitmap.rows - face.glyph.bitmap_top
+        self.characters[char] = {
+            'texture': texture,
+            'texture_bytes': rgba_data.nbytes,
+            'size': (bitmap.width, bitmap.rows),
+            'bearing': (face.glyph.bitmap_left, face.glyph.bitmap_top),
+            'advance': face.glyph.advance.x >> 6,
+            'descender': descender,
+            'bbox_height': metrics.height >> 6,
+        }
+        return self.characters[char]
+
+    def render_text(self, text, x, y, scale=1.0, color=(1.0, 1.0, 1.0, 1.0)):
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glEnable(GL_TEXTURE_2D)
+        glColor4f(*color)
+
+        viewport = glGetIntegerv(GL_VIEWPORT)
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        glOrtho(0, viewport[2], 0, viewport[3], -1, 1)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+
+        for char in text:
+            ch = self.load_char(char)
+            xpos = x + ch['bearing'][0] * scale
+            ypos = y - (ch['size'][1] - ch['bearing'][1]) * scale
+            w = ch['size'][0] * scale
+            h = ch['size'][1] * scale
+
+            glBindTexture(GL_TEXTURE_2D, ch['texture'])
+            glBegin(GL_QUADS)
+            glTexCoord2f(0, 0)
+            glVertex2f(xpos, ypos + h)
+            glTexCoord2f(1, 0)
+            glVertex2f(xpos + w, ypos + h)
+            glTexCoord2f(1, 1)
+            glVertex2f(xpos + w, ypos)
+            glTexCoord2f(0, 1)
+            glVertex2f(xpos, ypos)
+            glEnd()
+
+            x += ch['advance'] * scale
+
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+        glPopMatrix()
+        glDisable(GL_TEXTURE_2D)
+
+    def texture_bytes(self):
+        return sum(ch['texture_bytes'] for ch in self.characters.values())
+
+
+class VertexArrayTextRenderer(TextRenderer):
+    '''
+    The new path of util_instance_mode.
+    '''
+
+    def texture_bytes(self):
+        return self.atlas.memory_bytes()
+
+
+def run(renderer, ctx, frames, repeat):
+    '''
+    :return stats dict: the GL calls, the texture memory and the frame time.
+    '''
+    # Load the glyphs before timing
+    for line in LINES:
+        renderer.render_text(line, 10, 10, 0.5)
+    ctx.swap()
+
+    gl_stats.reset()
+    frame_times = []
+    for _ in range(frames):
+        tic = time.perf_counter()
+        glClear(GL_COLOR_BUFFER_BIT)
+        y = ctx.height - 40
+        for _ in range(repeat):
+            for line in LINES:
+                renderer.render_text(line, 10, y, 0.5, (1.0, 1.0, 1.0, 1.0))
+                y -= 30
+        ctx.swap()
+        frame_times.append(time.perf_counter() - tic)
+        gl_stats.new_frame()
+
+    frame_times = np.array(frame_times) * 1000
+    calls = gl_stats.stats()['totals']['calls']
+    glyph_bytes = sum(ch['size'][0] * ch['size'][1]
+                      for ch in renderer.characters.values())
+    return {
+        'draws/frame': calls.get('glDrawArrays', 0) / frames,
+        'glBegin/frame': calls.get('glBegin', 0) / frames,
+        'binds/frame': calls.get('glBindTexture', 0) / frames,
+        'viewport/frame': calls.get('glGetIntegerv', 0) / frames,
+        'glyph texels (KB)': glyph_bytes / 1024,
+        'texture (KB)': renderer.texture_bytes() / 1024,
+        'frame(ms) mean': frame_times.mean(),
+        'frame(ms) p95': np.percentile(frame_times, 95),
+    }
+
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--font', required=True)
+    parser.add_argument('--size', type=int, default=48)
+    parser.add_argument('--frames', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=7)
+    args = parser.parse_args()
+
+    ctx = HeadlessContext(compatibility=True)
+    glEnable(GL_BLEND)
+    print(f'Renderer: {ctx.renderer()}')
+    print(f'{len(LINES) * args.repeat} lines every frame')
+
+    # 计数本模块中 glBegin 的绘制，以及 util_instance_mode 的顶点数组绘制
+    gl_stats.enable([sys.modules[__name__], text_render])
+
+    results = {}
+    for name, cls in [('glBegin', ImmediateTextRenderer), ('vertex array', VertexArrayTextRenderer)]:
+        renderer = cls()
+        renderer.default_font_path = args.font
+        renderer.load_font(args.font, args.size)
+        results[name] = run(renderer, ctx, args.frames, args.repeat)
+
+    print(f'{"":>20s}{"glBegin":>14s}{"vertex array":>14s}')
+    for key in results['glBegin']:
+        print(
+            f'{key:>20s}{results["glBegin"][key]:14.2f}{results["vertex array"][key]:14.2f}')
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
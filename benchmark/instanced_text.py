@@ -0,0 +1,115 @@
+"""
+File: instanced_text.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    The instanced glyphs against the 6 vertices per char.
+    The bytes uploaded per frame, the CPU time of queuing and flushing the text,
+    and the frame time of a text heavy frame, every label changes every frame.
+
+    BENCH_GL=egl python -m benchmark.instanced_text --font ./some.ttf
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+from .headless import HeadlessContext
+
+import time
+import argparse
+from OpenGL.GL import *
+
+from util.easy_import import *
+from util.gl_state import gl_state
+from util.text_render import TextRenderer
+
+SAMPLE = 'The quick brown fox jumps over the lazy dog.'
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+def run(ctx, font_path, size, instanced, labels, frames):
+    '''
+    :return stats dict: the upload size, the CPU time and the frame time of the mode.
+    '''
+    gl_state.invalidate()
+    renderer = TextRenderer(instanced=instanced)
+    renderer.default_font_path = font_path
+    renderer.load_font(font_path, size)
+    renderer.init_shader(ctx.width, ctx.height)
+    renderer.warm_up(SAMPLE + '0123456789')
+
+    rng = np.random.default_rng(0)
+    xs = rng.uniform(0, ctx.width * 0.6, labels)
+    ys = rng.uniform(0, ctx.height * 0.95, labels)
+    colors = rng.uniform(0, 1, (labels, 3))
+
+    cpu_times = []
+    frame_times = []
+    for frame in range(frames):
+        t = time.perf_counter()
+        glClear(GL_COLOR_BUFFER_BIT)
+        renderer.new_frame()
+        # 每帧文本都不同，不能直接复用上一帧的顶点
+        for i, (x, y, color) in enumerate(zip(xs, ys, colors)):
+            renderer.queue_text(f'{SAMPLE[:30]} {frame + i:6d}', x, y, 0.4, color)
+        chars = renderer.batch_size
+        renderer.flush()
+        cpu_times.append(time.perf_counter() - t)
+        ctx.swap()
+        frame_times.append(time.perf_counter() - t)
+
+    record_bytes = renderer.staging[:1].nbytes
+    renderer.atlas.release()
+    renderer.stream.release()
+    return {
+        'bytes per char': record_bytes,
+        'bytes per frame': chars * record_bytes,
+        'cpu (ms)': np.median(cpu_times[1:]) * 1000,
+        'frame (ms)': np.median(frame_times[1:]) * 1000,
+    }
+
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--font', required=True)
+    parser.add_argument('--size', type=int, default=48)
+    parser.add_argument('--labels', type=int, default=500)
+    parser.add_argument('--frames', type=int, default=60)
+    args = parser.parse_args()
+
+    ctx = HeadlessContext()
+    glEnable(GL_BLEND)
+    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+    print(f'Renderer: {ctx.renderer()}')
+
+    results = {}
+    for name, instanced in [('triangles', False), ('instanced', True)]:
+        results[name] = run(ctx, args.font, args.size,
+                            instanced, args.labels, args.frames)
+
+    print(f'{"":>20s}{"triangles":>12s}{"instanced":>12s}')
+    for key in results['triangles']:
+        print(
+            f'{key:>20s}{results["triangles"][key]:12.1f}{results["instanced"][key]:12.1f}')
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
@@ -0,0 +1,101 @@
+"""
+File: kerning.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    The cost of the kerning in the layout.
+    The vectorized layout without and with the Kerning table,
+    and the naive layout calling face.get_kerning for every pair.
+
+    python -m benchmark.kerning --font ./some.ttf
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+import timeit
+import argparse
+import freetype
+
+from util.easy_import import *
+from util.kerning import Kerning
+from util.font_fallback import FontChain
+from util.text_layout import layout_quads, text_to_codepoints, VERTEX_FLOATS
+
+from .layout_vectorized import load_glyphs, SAMPLE
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+def layout_naive(face, table, text, x, y, scale, staging):
+    '''Kerning by face.get_kerning() of every pair, and then the vectorized layout.'''
+    indices = [face.get_char_index(c) for c in text]
+    kerning = [face.get_kerning(a, b).x / 64
+               for a, b in zip(indices[:-1], indices[1:])]
+    slots = table.slots(text_to_codepoints(text))
+    count, _ = layout_quads(table, slots, x, y, scale, staging)
+    return kerning, staging[:count]
+
+
+def layout(table, text, x, y, scale, staging):
+    slots = table.slots(text_to_codepoints(text))
+    count, _ = layout_quads(table, slots, x, y, scale, staging)
+    return staging[:count]
+
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--font', required=True)
+    parser.add_argument('--size', type=int, default=48)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    characters, table = load_glyphs(args.font, args.size, SAMPLE)
+    faces = FontChain([args.font]).open(args.size)
+    kerning = Kerning(faces, args.size)
+    for char, ch in characters.items():
+        slot = int(table.slots(text_to_codepoints(char))[0])
+        table.kern_rows[slot] = kerning.row(0, faces[0].get_char_index(char))
+    staging = np.zeros((1024, 6, VERTEX_FLOATS), dtype=np.float32)
+
+    text = SAMPLE * 2
+    slots = table.slots(text_to_codepoints(text))
+    print(f'Kerning pairs: {len(kerning)} in the font, '
+          f'{np.count_nonzero(kerning.lookup(table.kern_rows[slots]))} in the sample')
+
+    print(f'{"chars":>8s}{"off(us)":>12s}{"on(us)":>12s}{"overhead":>10s}{"naive(us)":>12s}')
+    for n in [10, 100, 1000]:
+        text = (SAMPLE * (n // len(SAMPLE) + 1))[:n]
+
+        def timing(func):
+            return min(timeit.repeat(func, number=args.repeat, repeat=3)) / args.repeat
+
+        table.kerning = None
+        t_off = timing(lambda: layout(table, text, 10, 10, 0.5, staging))
+        table.kerning = kerning
+        t_on = timing(lambda: layout(table, text, 10, 10, 0.5, staging))
+        table.kerning = None
+        t_naive = timing(lambda: layout_naive(
+            faces[0], table, text, 10, 10, 0.5, staging))
+        print(f'{n:8d}{t_off*1e6:12.1f}{t_on*1e6:12.1f}{t_on/t_off:10.2f}{t_naive*1e6:12.1f}')
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
@@ -0,0 +1,127 @@
+"""
+File: layout_vectorized.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    Microbenchmark of the text layout, the old python loop against the vectorized layout_quads.
+    It needs no OpenGL context, the glyph metrics come from FreeType directly.
+
+    python -m benchmark.layout_vectorized --font ./some.ttf
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+import timeit
+import argparse
+import freetype
+
+from util.easy_import import *
+from util.text_layout import GlyphTable, layout_quads, text_to_codepoints, VERTEX_FLOATS
+
+SAMPLE = 'The quick brown fox jumps over the lazy dog. 0123456789 '
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+def load_glyphs(font_path, size, chars):
+    '''
+    The glyph metrics, both as the dict of TextRenderer.characters and as the GlyphTable.
+    '''
+    face = freetype.Face(font_path)
+    face.set_char_size(size << 6)
+
+    characters = {}
+    table = GlyphTable()
+    for char in sorted(set(chars)):
+        face.load_char(char, freetype.FT_LOAD_RENDER)
+        glyph = face.glyph
+        ch = {
+            'page': 0,
+            'uv': (0.0, 0.0, 1.0, 1.0),
+            'size': (glyph.bitmap.width, glyph.bitmap.rows),
+            'bearing': (glyph.bitmap_left, glyph.bitmap_top),
+            'advance': glyph.advance.x >> 6
+        }
+        characters[char] = ch
+        table.add(ord(char), ch['advance'], ch['bearing'],
+                  ch['size'], ch['uv'], ch['page'])
+    return characters, table
+
+
+def layout_loop(characters, text, x, y, scale):
+    '''The old path, vertices in python list of lists.'''
+    vertices = []
+    for char in text:
+        ch = characters[char]
+        xpos = x + ch['bearing'][0] * scale
+        ypos = y - (ch['size'][1] - ch['bearing'][1]) * scale
+        w = ch['size'][0] * scale
+        h = ch['size'][1] * scale
+        x += ch['advance'] * scale
+        if not all([w > 0, h > 0]):
+            continue
+        u0, v0, u1, v1 = ch['uv']
+        _vertices = [
+            [xpos,     ypos + h, u0, v0],
+            [xpos + w, ypos,     u1, v1],
+            [xpos,     ypos,     u0, v1],
+            [xpos,     ypos + h, u0, v0],
+            [xpos + w, ypos + h, u1, v0],
+            [xpos + w, ypos,     u1, v1],
+        ]
+        [vertices.extend(e) for e in _vertices]
+    return np.array(vertices, dtype=np.float32)
+
+
+def layout_vectorized(table, text, x, y, scale, staging):
+    slots = table.slots(text_to_codepoints(text))
+    count, _ = layout_quads(table, slots, x, y, scale, staging)
+    return staging[:count]
+
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--font', required=True)
+    parser.add_argument('--size', type=int, default=48)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    characters, table = load_glyphs(args.font, args.size, SAMPLE)
+    staging = np.zeros((1024, 6, VERTEX_FLOATS), dtype=np.float32)
+
+    print(f'{"chars":>8s}{"loop(us)":>12s}{"numpy(us)":>12s}{"speedup":>10s}')
+    for n in [10, 100, 1000]:
+        text = (SAMPLE * (n // len(SAMPLE) + 1))[:n]
+
+        # Same vertices from both paths, the (x, y, u, v) of every vertex
+        expect = layout_loop(characters, text, 10, 10, 0.5)
+        got = layout_vectorized(table, text, 10, 10, 0.5, staging)[..., :4]
+        assert np.allclose(expect.reshape(got.shape), got)
+
+        t_loop = min(timeit.repeat(lambda: layout_loop(characters, text, 10, 10, 0.5),
+                                   number=args.repeat, repeat=3)) / args.repeat
+        t_numpy = min(timeit.repeat(lambda: layout_vectorized(table, text, 10, 10, 0.5, staging),
+                                    number=args.repeat, repeat=3)) / args.repeat
+        print(f'{n:8d}{t_loop*1e6:12.1f}{t_numpy*1e6:12.1f}{t_loop/t_numpy:10.1f}')
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
@@ -0,0 +1,114 @@
+"""
+File: sdf_text.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    The SDF glyphs against the bitmap glyphs.
+    The atlas memory and the warm-up time of the charset,
+    and the frame time of the labels with the animated scale, like the PoppingText of welcome.py.
+
+    BENCH_GL=egl python -m benchmark.sdf_text --font ./some.ttf
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+from .headless import HeadlessContext
+
+import time
+import argparse
+from OpenGL.GL import *
+
+from util.easy_import import *
+from util.gl_state import gl_state
+from util.text_render import TextRenderer
+
+SAMPLE = 'The quick brown fox jumps over the lazy dog. 0123456789'
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+def run(ctx, font_path, size, sdf, charset, labels, frames):
+    '''
+    :return stats dict: the memory, warm-up and frame time of the mode.
+    '''
+    gl_state.invalidate()
+    renderer = TextRenderer(max_cache_size=1 << 16,
+                            max_cache_bytes=1 << 30, sdf=sdf)
+    renderer.default_font_path = font_path
+    renderer.load_font(font_path, size)
+    renderer.init_shader(ctx.width, ctx.height)
+    warm_up = renderer.warm_up(charset)
+
+    # 每个标签的缩放随时间变化
+    rng = np.random.default_rng(0)
+    phases = rng.uniform(0, 2 * np.pi, labels)
+    xs = rng.uniform(0, ctx.width * 0.6, labels)
+    ys = rng.uniform(0, ctx.height * 0.9, labels)
+
+    times = []
+    for frame in range(frames):
+        t = time.perf_counter()
+        glClear(GL_COLOR_BUFFER_BIT)
+        renderer.new_frame()
+        scales = 0.3 + 1.2 * (np.sin(phases + frame * 0.1) + 1) / 2
+        for x, y, scale in zip(xs, ys, scales):
+            renderer.queue_text(SAMPLE[:20], x, y, float(scale))
+        renderer.flush()
+        ctx.swap()
+        times.append(time.perf_counter() - t)
+
+    stats = renderer.cache_stats()
+    renderer.atlas.release()
+    renderer.stream.release()
+    return {
+        'atlas texel bytes': stats['glyph_bytes'] - len(renderer.characters) * renderer.glyph_overhead_bytes,
+        'atlas pages': stats['pages'],
+        'warm up (ms)': warm_up['seconds'] * 1000,
+        'frame (ms)': np.median(times[1:]) * 1000,
+    }
+
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--font', required=True)
+    parser.add_argument('--size', type=int, default=48)
+    parser.add_argument('--charset', default='ascii')
+    parser.add_argument('--labels', type=int, default=200)
+    parser.add_argument('--frames', type=int, default=60)
+    args = parser.parse_args()
+
+    ctx = HeadlessContext()
+    glEnable(GL_BLEND)
+    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+    print(f'Renderer: {ctx.renderer()}')
+
+    results = {}
+    for name, sdf in [('bitmap', False), ('sdf', True)]:
+        results[name] = run(ctx, args.font, args.size, sdf,
+                            args.charset, args.labels, args.frames)
+
+    print(f'{"":>20s}{"bitmap":>12s}{"sdf":>12s}')
+    for key in results['bitmap']:
+        print(f'{key:>20s}{results["bitmap"][key]:12.1f}{results["sdf"][key]:12.1f}')
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
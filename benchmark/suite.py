@@ -0,0 +1,368 @@
+"""
+File: suite.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    The benchmark suite of the text and window pipeline, it runs on the software GL (Mesa llvmpipe).
+    Every workload is the main_render() of a GLFWWindow, drawn for the fixed number of frames,
+    with the top bar and the flush of the render loop.
+
+    - ascii:       the static lines of the ASCII text, queued every frame.
+    - cjk:         the lines of the Chinese text, the chars from the --cjk-font,
+                   it is skipped without the --cjk-font, the chars would be the .notdef boxes.
+    - many_labels: the retained labels, a few of them change every frame.
+    - animated:    the moving texts, the changing colors and numbers, and a template.
+
+    It records the frame time percentiles, the glyphs per second, the draw calls and the upload bytes,
+    writes them into the JSON, and compares them with the stored baseline.
+
+    BENCH_GL=egl python -m benchmark.suite --font ./some.ttf --output results.json
+    BENCH_GL=egl python -m benchmark.suite --font ./some.ttf --save-baseline
+
+    With BENCH_GL=glfw (Xvfb), the workloads run through GLFWWindow.render_loop(max_frames=...),
+    with BENCH_GL=egl there is no GLFW window, the frames are drawn by GLFWWindow.render_frame().
+    The exit code is 1 when a workload is worse than the baseline.
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+from .headless import HeadlessContext, BACKEND
+
+import sys
+import glfw
+import json
+import time
+import argparse
+from pathlib import Path
+from OpenGL.GL import *
+
+from util.easy_import import *
+from util.gl_state import gl_state
+from util.gl_stats import gl_stats
+from util.glfw_window import GLFWWindow, TextAnchor
+from util.text_render import TextRenderer
+
+BASELINE = Path(__file__).parent / 'baseline.json'
+
+ASCII_LINES = [
+    'The quick brown fox jumps over the lazy dog. 0123456789',
+    'GLFW is rendering at 1920 x 1080 (60 Hz) | FPS: 59.94',
+    'Sphinx of black quartz, judge my vow! (x + y) * z = 42',
+    'Pack my box with five dozen liquor jugs; ~ @ # $ % ^ & _',
+]
+
+CJK_LINES = [
+    '天地玄黄，宇宙洪荒。日月盈昃，辰宿列张。',
+    '寒来暑往，秋收冬藏。闰余成岁，律吕调阳。',
+    '云腾致雨，露结为霜。金生丽水，玉出昆冈。',
+    '窗口获得焦点，中文测试：伤害一二三四五六七八九十。',
+]
+
+# Which way is better, None for only reporting it,
+# the tail of the frame times on the software GL is too noisy to fail the run
+METRICS = {
+    'frame_ms_p50': 'lower',
+    'frame_ms_p90': None,
+    'frame_ms_p99': None,
+    'glyphs_per_second': 'higher',
+    'glyphs_per_frame': 'equal',
+    'draw_calls_per_frame': 'lower',
+    'binds_per_frame': 'lower',
+    'uniforms_per_frame': 'lower',
+    'upload_bytes_per_frame': 'lower',
+}
+# The timed metrics compare with the tolerance,
+# the counted ones are the same on every machine, except the FPS digits of the top bar
+TIMED = ['frame_ms_p50', 'glyphs_per_second']
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+class FrameRecorder:
+    '''
+    The main_render() of the workload, taking the time and the GL stats of the last frame
+    at the start of every frame.
+    The frame is from its start to the start of the next frame, including the flush and the swap.
+    '''
+
+    def __init__(self, main_render, instanced):
+        self.main_render = main_render
+        # 三角形每个字符6个顶点，实例化每个字符4个顶点
+        self.vertices_per_glyph = 4 if instanced else 6
+        self.times = []
+        self.frames = []
+        self.renderer = None
+
+    def __call__(self):
+        if self.renderer is None:
+            self.renderer = glGetString(GL_RENDERER).decode()
+        self.times.append(time.perf_counter())
+        self.frames.append(gl_stats.frame_stats())
+        self.main_render()
+
+    def results(self, warmup):
+        '''
+        :param warmup int: the first frames not recorded, the glyphs are rasterized and uploaded in them.
+
+        :return results dict: the metrics of the frames after the warmup.
+        '''
+        # 第 i 帧的统计在第 i+1 帧开始时读取
+        frame_ms = np.diff(self.times[warmup:]) * 1000
+        stats = self.frames[warmup+1:]
+        uploads = [e['texture_bytes'] + e['buffer_bytes'] for e in self.frames[1:]]
+        glyphs = np.mean([e['vertices'] for e in stats]) / self.vertices_per_glyph
+        return {
+            'frames': len(frame_ms),
+            'frame_ms_mean': frame_ms.mean(),
+            'frame_ms_p50': np.percentile(frame_ms, 50),
+            'frame_ms_p90': np.percentile(frame_ms, 90),
+            'frame_ms_p99': np.percentile(frame_ms, 99),
+            'glyphs_per_frame': glyphs,
+            'glyphs_per_second': glyphs / frame_ms.mean() * 1000,
+            'draw_calls_per_frame': np.mean([e['draw_calls'] for e in stats]),
+            'binds_per_frame': np.mean([e['binds'] for e in stats]),
+            'uniforms_per_frame': np.mean([e['uniforms'] for e in stats]),
+            'upload_bytes_per_frame': np.mean(uploads[warmup:]),
+            'warmup_upload_bytes': sum(uploads[:warmup]),
+        }
+
+
+def ascii_scene(window):
+    def main_render():
+        for i, line in enumerate(ASCII_LINES * 6):
+            window.draw_text(line, -0.98, 0.9 - i * 0.075, 0.5, TextAnchor.TL)
+    return main_render
+
+
+def cjk_scene(window):
+    def main_render():
+        for i, line in enumerate(CJK_LINES * 6):
+            window.draw_text(line, -0.98, 0.9 - i * 0.075, 0.5, TextAnchor.TL)
+    return main_render
+
+
+def many_labels_scene(window, labels=500, changing=5):
+    rng = np.random.default_rng(0)
+    positions = rng.uniform((-1, -0.95), (0.3, 0.9), (labels, 2))
+    colors = rng.uniform(0, 1, (labels, 3))
+    items = [window.create_label(f'{ASCII_LINES[0][:30]} {i:6d}', x, y, 0.4, color=tuple(color))
+             for i, ((x, y), color) in enumerate(zip(positions, colors))]
+    frame = [0]
+
+    def main_render():
+        # 只有前 changing 个标签的文本每帧变化
+        frame[0] += 1
+        for i, label in enumerate(items[:changing]):
+            label.text = f'{ASCII_LINES[0][:30]} {frame[0] + i:6d}'
+    return main_render
+
+
+def animated_scene(window, texts=40):
+    template = window.create_template(
+        'Score {:8d} | Combo {:4d}', 0.98, -0.98, 0.5, TextAnchor.BR, values=(0, 0))
+    frame = [0]
+
+    def main_render():
+        # 飘字：位置、颜色和数字每帧都变化
+        frame[0] += 1
+        t = frame[0] / 60
+        for i in range(texts):
+            phase = t + i * 0.37
+            x = np.sin(phase) * 0.8
+            y = ((t * 0.5 + i / texts) % 1.0) * 1.8 - 0.9
+            color = (0.5 + 0.5 * np.sin(phase), 0.5 + 0.5 * np.cos(phase), 0.5, 1.0)
+            window.draw_text(f'Damage {(frame[0] * 37 + i * 101) % 10000}!',
+                             x, y, 0.4 + 0.2 * (i % 3), TextAnchor.C, color)
+        template.set(frame[0] * 10, frame[0] % 100)
+    return main_render
+
+
+WORKLOADS = {
+    'ascii': ascii_scene,
+    'cjk': cjk_scene,
+    'many_labels': many_labels_scene,
+    'animated': animated_scene,
+}
+
+
+def make_window(ctx, font_path, cjk_font_path, size):
+    '''
+    :return window GLFWWindow: the window with its own TextRenderer, ready to draw.
+    '''
+    window = GLFWWindow()
+    window.text_renderer = TextRenderer()
+    window.text_renderer.default_font_path = font_path
+    window.fallback_fonts = [cjk_font_path] if cjk_font_path else []
+
+    gl_state.invalidate()
+    if ctx is None:
+        # 隐藏的 GLFW 窗口，关闭垂直同步，帧时间不被刷新率限制
+        glfw.init()
+        glfw.window_hint(glfw.VISIBLE, glfw.FALSE)
+        window.load_font(font_path, size)
+        window.init_window()
+        glfw.swap_interval(0)
+    else:
+        window.width, window.height, window.refresh_rate = ctx.width, ctx.height, 60
+        window.load_font(font_path, size)
+        window.text_renderer.init_shader(ctx.width, ctx.height)
+    return window
+
+
+def run(ctx, workload, font_path, cjk_font_path, size, frames, warmup):
+    '''
+    Draw the workload for the frames.
+
+    :param ctx HeadlessContext: the EGL context, None for the GLFW window and its render_loop().
+
+    :return renderer str: the name of the GL renderer.
+    :return results dict: the metrics of the workload.
+    '''
+    window = make_window(ctx, font_path, cjk_font_path, size)
+    recorder = FrameRecorder(WORKLOADS[workload](window), window.text_renderer.instanced)
+    gl_stats.reset()
+    # 多画一帧，最后一帧的结束是它的开始
+    total = warmup + frames + 1
+
+    if ctx is None:
+        window.render_loop(recorder, max_frames=total)
+    else:
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        for _ in range(total):
+            window.render_frame(recorder)
+            ctx.swap()
+            window.fps.update()
+
+        renderer = window.text_renderer
+        renderer.labels.release()
+        renderer.atlas.release()
+        renderer.stream.release()
+
+    return recorder.renderer, recorder.results(warmup)
+
+
+def compare(results, baseline, tolerance):
+    '''
+    Compare the results with the baseline, print the table of the metrics.
+
+    :param tolerance float: the timed metrics may be worse by the ratio, the software GL is noisy.
+
+    :return regressions list: the (workload, metric) worse than the baseline.
+    '''
+    if baseline['renderer'] != results['renderer']:
+        logger.warning(
+            f'The baseline is from {baseline["renderer"]}, the timing is not comparable')
+
+    regressions = []
+    print(f'{"":>12s}{"":>24s}{"baseline":>12s}{"current":>12s}{"change":>10s}')
+    for workload, metrics in results['workloads'].items():
+        if workload not in baseline['workloads']:
+            continue
+        # 不同的中文字体，字形的数量与大小都不同
+        if workload == 'cjk' and baseline.get('cjk_font') != results['cjk_font']:
+            logger.warning(
+                f'The cjk baseline is from the font {baseline.get("cjk_font")}, not compared')
+            continue
+        for metric, direction in METRICS.items():
+            if metric not in baseline['workloads'][workload]:
+                continue
+            a = baseline['workloads'][workload][metric]
+            b = metrics[metric]
+            change = (b - a) / a if a else float(b != a)
+            allowed = tolerance if metric in TIMED else 0.01
+            worse = {
+                'lower': change > allowed,
+                'higher': change < -allowed,
+                'equal': abs(change) > allowed,
+                None: False,
+            }[direction]
+            if worse:
+                regressions.append((workload, metric))
+            print(f'{workload:>12s}{metric:>24s}{a:12.2f}{b:12.2f}{change:10.1%}{"  worse" if worse else ""}')
+    return regressions
+
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--font', required=True)
+    parser.add_argument('--cjk-font', default=None,
+                        help='The fallback font of the Chinese chars')
+    parser.add_argument('--size', type=int, default=48)
+    parser.add_argument('--frames', type=int, default=120)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--workloads', nargs='+',
+                        default=list(WORKLOADS), choices=list(WORKLOADS))
+    parser.add_argument('--output', default=None,
+                        help='Write the results into the JSON file')
+    parser.add_argument('--baseline', default=str(BASELINE))
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Write the results as the baseline, instead of comparing with it')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    workloads = list(args.workloads)
+    if 'cjk' in workloads and not args.cjk_font:
+        logger.warning('No --cjk-font, the cjk workload is skipped')
+        workloads.remove('cjk')
+
+    ctx = HeadlessContext() if BACKEND == 'egl' else None
+    gl_stats.enable()
+
+    results = {
+        'renderer': None,
+        'backend': BACKEND,
+        'font': Path(args.font).name,
+        'cjk_font': args.cjk_font and Path(args.cjk_font).name,
+        'size': args.size,
+        'workloads': {},
+    }
+    for workload in workloads:
+        results['renderer'], results['workloads'][workload] = run(
+            ctx, workload, args.font, args.cjk_font, args.size, args.frames, args.warmup)
+        logger.info(f'Benchmark {workload}: {results["workloads"][workload]}')
+
+    print(f'Renderer: {results["renderer"]} ({BACKEND})')
+    print(f'{"":>12s}{"frame p50":>12s}{"p90":>10s}{"p99":>10s}{"glyphs/s":>12s}{"draws":>8s}{"bytes":>10s}')
+    for workload, r in results['workloads'].items():
+        print(f'{workload:>12s}{r["frame_ms_p50"]:12.2f}{r["frame_ms_p90"]:10.2f}{r["frame_ms_p99"]:10.2f}'
+              f'{r["glyphs_per_second"]:12.0f}{r["draw_calls_per_frame"]:8.1f}{r["upload_bytes_per_frame"]:10.0f}')
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        logger.info(f'Results: {args.output}')
+
+    if args.save_baseline:
+        Path(args.baseline).write_text(json.dumps(results, indent=2))
+        logger.info(f'Baseline saved: {args.baseline}')
+    elif Path(args.baseline).is_file():
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f'Worse than the baseline: {regressions}')
+            sys.exit(1)
+    else:
+        logger.warning(
+            f'No baseline: {args.baseline}, save one with --save-baseline')
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
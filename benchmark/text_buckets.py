@@ -0,0 +1,155 @@
+"""
+File: text_buckets.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    The glyphs rasterized at the pixel size of the text (the size buckets),
+    against shrinking the glyphs of the font size by the scale.
+    The texts are drawn at the scales like the top bar (0.5) and the popping texts,
+    it reports the texture memory of the glyphs, the texels under the drawn glyphs every frame,
+    which is the texture the sampler walks through, and the frame time.
+
+    BENCH_GL=egl python -m benchmark.text_buckets --font ./some.ttf
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+from .headless import HeadlessContext
+
+import time
+import argparse
+from OpenGL.GL import *
+
+from util.easy_import import *
+from util.gl_state import gl_state
+from util.glyph_atlas import GlyphAtlas
+from util.text_render import TextRenderer
+
+# The (text, scale) drawn every frame
+TOP_BAR = [
+    ('GLFW (2.8.0) is Rendering at 1920 x 1080 (60 Hz)', 0.5),
+    ('Got focus', 0.5),
+    ('- | FPS:  59.94', 0.5),
+]
+SCENES = {
+    'top bar': TOP_BAR,
+    'mixed scales': TOP_BAR + [
+        ('The quick brown fox jumps over the lazy dog.', 0.25),
+        ('The quick brown fox jumps over the lazy dog.', 0.33),
+        ('Damage 1234! Critical 5678!', 0.75),
+        ('Welcome to my GLFW window.', 1.0),
+    ],
+}
+
+SIZE_BUCKETS = (12, 16, 20, 24, 32)
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+def sampled_texels(renderer, text, scale):
+    '''
+    :return texels int: the texels of the glyphs the text is drawn with.
+    '''
+    bucket = renderer.size_bucket(scale)
+    texels = 0
+    for char in text:
+        ch = renderer.characters[(char, bucket) if bucket else char]
+        texels += ch['texels']
+    return texels
+
+
+def run(ctx, font_path, size, size_buckets, texts, repeat, frames):
+    '''
+    :return stats dict: the glyph memory, the texels sampled and the frame time.
+    '''
+    gl_state.invalidate()
+    renderer = TextRenderer()
+    renderer.size_buckets = size_buckets
+    renderer.load_font(font_path, size)
+    renderer.init_shader(ctx.width, ctx.height)
+
+    frame_times = []
+    for frame in range(frames):
+        t = time.perf_counter()
+        glClear(GL_COLOR_BUFFER_BIT)
+        renderer.new_frame()
+        y = ctx.height - 10
+        for text, scale in texts * repeat:
+            y -= size * scale + 4
+            renderer.queue_text(text, 10, y % ctx.height, scale, (1.0, 1.0, 1.0))
+        renderer.flush()
+        ctx.swap()
+        frame_times.append(time.perf_counter() - t)
+
+    # 字形占用的纹素，含图集中的留白
+    glyph_bytes = 0
+    for ch in renderer.characters.values():
+        if ch['page'] is not None:
+            u0, v0, u1, v1 = ch['uv']
+            s = renderer.atlas.page_size
+            glyph_bytes += GlyphAtlas.glyph_bytes(round((u1 - u0) * s), round((v1 - v0) * s))
+
+    texels = sum(sampled_texels(renderer, text, scale) for text, scale in texts) * repeat
+    # 屏幕上字形覆盖的像素
+    pixels = sum(sampled_texels(renderer, text, scale) *
+                 (size * scale / (renderer.size_bucket(scale) or size)) ** 2
+                 for text, scale in texts) * repeat
+
+    results = {
+        'glyphs': len(renderer.characters),
+        'glyph texels (KB)': glyph_bytes / 1024,
+        'sampled texels (K)': texels / 1000,
+        'texels per pixel': texels / pixels,
+        'frame (ms)': np.median(frame_times[1:]) * 1000,
+    }
+    renderer.atlas.release()
+    renderer.stream.release()
+    return results
+
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--font', required=True)
+    parser.add_argument('--size', type=int, default=48)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--frames', type=int, default=30)
+    args = parser.parse_args()
+
+    ctx = HeadlessContext()
+    glEnable(GL_BLEND)
+    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+    print(f'Renderer: {ctx.renderer()}')
+    print(f'The font size is {args.size}, the buckets are {SIZE_BUCKETS}')
+
+    for name, texts in SCENES.items():
+        results = {
+            'font size': run(ctx, args.font, args.size, None, texts, args.repeat, args.frames),
+            'buckets': run(ctx, args.font, args.size, SIZE_BUCKETS, texts, args.repeat, args.frames),
+        }
+        print(f'{name}, {len(texts) * args.repeat} texts every frame')
+        print(f'{"":>20s}{"font size":>12s}{"buckets":>12s}{"saved":>10s}')
+        for key in results['font size']:
+            a, b = results['font size'][key], results['buckets'][key]
+            print(f'{key:>20s}{a:12.2f}{b:12.2f}{1 - b / a:10.0%}')
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
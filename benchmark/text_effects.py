@@ -0,0 +1,123 @@
+"""
+File: text_effects.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    The fill-rate cost of the text effects.
+    The screen is covered by the lines of large text, drawn several times every frame,
+    with every variant of the shader, for the bitmap and the SDF glyphs.
+    The frame time is measured with glFinish(), so it is the GPU time of the fragments.
+
+    BENCH_GL=egl python -m benchmark.text_effects --font ./some.ttf
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+from .headless import HeadlessContext
+
+import time
+import argparse
+from OpenGL.GL import *
+
+from util.easy_import import *
+from util.gl_state import gl_state
+from util.text_render import TextRenderer
+from util.text_effect import TextEffect
+
+SAMPLE = 'The quick brown fox jumps over the lazy dog. 0123456789 '
+
+EFFECTS = [
+    TextEffect('plain'),
+    TextEffect('shadow'),
+    TextEffect('outline', width=1.5),
+    TextEffect('glow', width=2.0, color=(1.0, 0.8, 0.0, 0.8)),
+]
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+def run(ctx, font_path, size, sdf, layers, frames):
+    '''
+    :return stats dict: the median frame time of every effect, in ms.
+    '''
+    gl_state.invalidate()
+    renderer = TextRenderer()
+    renderer.sdf = sdf
+    renderer.load_font(font_path, size)
+    renderer.init_shader(ctx.width, ctx.height)
+    renderer.warm_up(SAMPLE)
+
+    # 文字的行铺满整个屏幕
+    scale = 1.0
+    line_height = size * scale
+    lines = int(ctx.height / line_height) + 1
+    w, _, _ = renderer.bounding_box(SAMPLE, scale)
+    text = SAMPLE * (int(ctx.width / max(w, 1)) + 1)
+
+    results = {}
+    for effect in EFFECTS:
+        frame_times = []
+        for frame in range(frames):
+            t = time.perf_counter()
+            glClear(GL_COLOR_BUFFER_BIT)
+            renderer.new_frame()
+            for layer in range(layers):
+                for i in range(lines):
+                    renderer.queue_text(
+                        text, -layer * 7, i * line_height, scale, (1.0, 1.0, 1.0, 0.5), effect)
+            renderer.flush()
+            glFinish()
+            frame_times.append(time.perf_counter() - t)
+        results[effect.kind] = np.median(frame_times[1:]) * 1000
+
+    renderer.atlas.release()
+    renderer.stream.release()
+    return results
+
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--font', required=True)
+    parser.add_argument('--size', type=int, default=48)
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--layers', type=int, default=4)
+    parser.add_argument('--frames', type=int, default=30)
+    args = parser.parse_args()
+
+    ctx = HeadlessContext(args.width, args.height)
+    glEnable(GL_BLEND)
+    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+    print(f'Renderer: {ctx.renderer()}')
+    print(f'{args.width} x {args.height} covered {args.layers} times, frame time (ms)')
+
+    results = {
+        'bitmap': run(ctx, args.font, args.size, False, args.layers, args.frames),
+        'sdf': run(ctx, args.font, args.size, True, args.layers, args.frames),
+    }
+    print(f'{"":>12s}{"bitmap":>12s}{"sdf":>12s}')
+    for effect in EFFECTS:
+        kind = effect.kind
+        print(f'{kind:>12s}{results["bitmap"][kind]:12.2f}{results["sdf"][kind]:12.2f}')
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
@@ -0,0 +1,182 @@
+"""
+File: text_labels.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    The retained TextLabels against queuing the same texts every frame.
+    Most of the labels are static, a few of them change every frame,
+    the CPU time and the bytes uploaded per frame.
+    And the counter updated every frame, as the TextLabel and as the TextTemplate.
+
+    BENCH_GL=egl python -m benchmark.text_labels --font ./some.ttf
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+from .headless import HeadlessContext
+
+import time
+import argparse
+from OpenGL.GL import *
+
+from util.easy_import import *
+from util.gl_state import gl_state
+from util.text_render import TextRenderer
+
+SAMPLE = 'The quick brown fox jumps over the lazy dog.'
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+def run(ctx, font_path, size, instanced, retained, labels, changing, frames):
+    '''
+    :return stats dict: the CPU time, the frame time and the upload size of the mode.
+    '''
+    gl_state.invalidate()
+    renderer = TextRenderer(instanced=instanced)
+    renderer.default_font_path = font_path
+    renderer.load_font(font_path, size)
+    renderer.init_shader(ctx.width, ctx.height)
+    renderer.warm_up(SAMPLE + '0123456789')
+
+    rng = np.random.default_rng(0)
+    xs = rng.uniform(0, ctx.width * 0.6, labels)
+    ys = rng.uniform(0, ctx.height * 0.95, labels)
+    colors = [tuple(c) for c in rng.uniform(0, 1, (labels, 3))]
+    texts = [f'{SAMPLE[:30]} {i:6d}' for i in range(labels)]
+
+    if retained:
+        items = [renderer.labels.create(text, x, y, 0.4, color)
+                 for text, x, y, color in zip(texts, xs, ys, colors)]
+
+    cpu_times = []
+    frame_times = []
+    uploaded = []
+    for frame in range(frames):
+        t = time.perf_counter()
+        glClear(GL_COLOR_BUFFER_BIT)
+        renderer.new_frame()
+        # 只有前 changing 个标签的文本每帧变化
+        for i in range(changing):
+            texts[i] = f'{SAMPLE[:30]} {frame + i:6d}'
+        if retained:
+            for i in range(changing):
+                items[i].text = texts[i]
+            before = renderer.labels.uploaded_bytes
+            renderer.flush()
+            uploaded.append(renderer.labels.uploaded_bytes - before)
+        else:
+            for text, x, y, color in zip(texts, xs, ys, colors):
+                renderer.queue_text(text, x, y, 0.4, color)
+            uploaded.append(renderer.batch_size * renderer.staging[:1].nbytes)
+            renderer.flush()
+        cpu_times.append(time.perf_counter() - t)
+        ctx.swap()
+        frame_times.append(time.perf_counter() - t)
+
+    renderer.labels.release()
+    renderer.atlas.release()
+    renderer.stream.release()
+    return {
+        'bytes per frame': np.median(uploaded[1:]),
+        'cpu (ms)': np.median(cpu_times[1:]) * 1000,
+        'frame (ms)': np.median(frame_times[1:]) * 1000,
+    }
+
+
+def run_counter(ctx, font_path, size, instanced, frames):
+    '''
+    :return stats dict: the CPU time and the upload size of updating the counter, as the label and the template.
+    '''
+    gl_state.invalidate()
+    renderer = TextRenderer(instanced=instanced)
+    renderer.default_font_path = font_path
+    renderer.load_font(font_path, size)
+    renderer.init_shader(ctx.width, ctx.height)
+    renderer.warm_up(SAMPLE + '0123456789')
+
+    label = renderer.labels.create('', 10, 10, 0.5)
+    template = renderer.labels.create_template(
+        'FPS: {:7.2f} | frame {:6d}', 10, 60, 0.5, values=(0, 0))
+    renderer.flush()
+
+    results = {}
+    for name in ['label', 'template']:
+        cpu_times = []
+        uploaded = []
+        for frame in range(frames):
+            fps = 60 + np.sin(frame) * 0.5
+            t = time.perf_counter()
+            if name == 'label':
+                label.text = f'FPS: {fps:7.2f} | frame {frame:6d}'
+            else:
+                template.set(fps, frame)
+            before = renderer.labels.uploaded_bytes
+            renderer.labels.update()
+            cpu_times.append(time.perf_counter() - t)
+            uploaded.append(renderer.labels.uploaded_bytes - before)
+        results[f'{name} cpu (us)'] = np.median(cpu_times) * 1e6
+        results[f'{name} bytes'] = np.median(uploaded)
+
+    renderer.labels.release()
+    renderer.atlas.release()
+    renderer.stream.release()
+    return results
+
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--font', required=True)
+    parser.add_argument('--size', type=int, default=48)
+    parser.add_argument('--labels', type=int, default=500)
+    parser.add_argument('--changing', type=int, default=5)
+    parser.add_argument('--frames', type=int, default=60)
+    args = parser.parse_args()
+
+    ctx = HeadlessContext()
+    glEnable(GL_BLEND)
+    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+    print(f'Renderer: {ctx.renderer()}')
+    print(f'{args.labels} labels, {args.changing} of them change every frame')
+
+    for name, instanced in [('triangles', False), ('instanced', True)]:
+        results = {
+            'queued': run(ctx, args.font, args.size, instanced, False,
+                          args.labels, args.changing, args.frames),
+            'retained': run(ctx, args.font, args.size, instanced, True,
+                            args.labels, args.changing, args.frames),
+        }
+        print(f'{name:>20s}{"queued":>12s}{"retained":>12s}')
+        for key in results['queued']:
+            print(
+                f'{key:>20s}{results["queued"][key]:12.1f}{results["retained"][key]:12.1f}')
+
+    print('The counter changing every frame')
+    results = {name: run_counter(ctx, args.font, args.size, instanced, args.frames)
+               for name, instanced in [('triangles', False), ('instanced', True)]}
+    print(f'{"":>20s}{"triangles":>12s}{"instanced":>12s}')
+    for key in results['triangles']:
+        print(
+            f'{key:>20s}{results["triangles"][key]:12.1f}{results["instanced"][key]:12.1f}')
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
@@ -387,18 +387,18 @@ class ModernTextRenderer1:
         rows = bitmap.rows
         pitch = bitmap.pitch
 
-        # 创建灰度数据数组
-        data = np.zeros((rows, width), dtype=np.ubyte)
-
-        for y in range(rows):
-            for x in range(width):
-                byte_index = y * pitch + x // 8
-                bit_index = 7 - (x % 8)  # FT 位图是 MSB 优先
-
-                if byte_index < len(bitmap.buffer):
-                    byte_val = bitmap.buffer[byte_index]
-                    bit_val = (byte_val >> bit_index) & 1
-                    data[y, x] = 255 if bit_val else 0
+        if rows == 0 or width == 0:
+            return np.zeros(0, dtype=np.ubyte)
+
+        # 直接读取 FreeType 缓冲区，不经过 bitmap.buffer 的 python 列表
+        packed = np.ctypeslib.as_array(
+            bitmap._FT_Bitmap.buffer, shape=(rows * abs(pitch),)).reshape(rows, abs(pitch))
+        # 负的 pitch 表示自下而上存储
+        if pitch < 0:
+            packed = packed[::-1]
+
+        # FT 位图是 MSB 优先，np.unpackbits 的默认顺序
+        data = np.unpackbits(packed, axis=1)[:, :width] * np.ubyte(255)
 
         return data.flatten()
 
@@ -18,12 +18,15 @@ Functions:
 
 # %% ---- 2025-10-13 ------------------------
 # Requirements and constants
+import sys
 import glfw
 
 from OpenGL.GL import *
 from OpenGL.GL.shaders import compileProgram, compileShader
 
 from util.easy_import import *
+from util.gl_state import gl_state
+from util.gl_stats import gl_stats
 from util.glfw_window import GLFWWindow
 
 # %%
@@ -50,8 +53,8 @@ def compile(vertices=vertices):
     vbo = glGenBuffers(1)
 
     # Bind to array buffer
-    glBindVertexArray(vao)
-    glBindBuffer(GL_ARRAY_BUFFER, vbo)
+    gl_state.bind_vertex_array(vao)
+    gl_state.bind_buffer(GL_ARRAY_BUFFER, vbo)
     glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
 
     # Setup vertex attr (x, y, z)
@@ -63,10 +66,6 @@ def compile(vertices=vertices):
                           7 * 4, ctypes.c_void_p(3*4))
     glEnableVertexAttribArray(1)
 
-    # Unbind
-    glBindBuffer(GL_ARRAY_BUFFER, 0)
-    glBindVertexArray(0)
-
     # Compile shader
     shader = compileProgram(
         compileShader(shader_script['vert'], GL_VERTEX_SHADER),
@@ -96,10 +95,10 @@ def key_callback(window, key, scancode, action, mods):
 
 
 def main_render():
-    glUseProgram(shader)
-    glBindVertexArray(vao)
+    # Bind through the gl_state, it skips the binds which change nothing
+    gl_state.use_program(shader)
+    gl_state.bind_vertex_array(vao)
     glDrawArrays(GL_TRIANGLES, 0, 3)
-    glBindVertexArray(0)
 
     t = glfw.get_time()
 
@@ -114,6 +113,8 @@ def main_render():
 # %% ---- 2025-10-13 ------------------------
 # Play ground
 wnd = GLFWWindow()
+# Count the GL calls with: python fixed-large-triangle.py --count-gl-calls
+wnd.count_gl_calls = '--count-gl-calls' in sys.argv
 wnd.load_font('c:\\windows\\fonts\\stxinwei.ttf')
 wnd.init_window()
 
@@ -121,8 +122,13 @@ shader, vao = compile()
 
 glfw.set_key_callback(wnd.window, key_callback)
 
+# Count the GL calls of the window and the text, and the triangle of the main_render()
+if wnd.count_gl_calls:
+    gl_stats.enable([sys.modules[__name__]])
 wnd.render_loop(main_render)
 
+if wnd.count_gl_calls:
+    wnd.dump_frame_stats('./log/gl_stats.json')
 wnd.cleanup()
 
 # %% ---- 2025-10-13 ------------------------
@@ -0,0 +1,23 @@
+#version 330 core
+
+// 每个字符一个实例，四个顶点（三角形带）由 gl_VertexID 展开
+layout(location = 1) in vec2 aPos;
+layout(location = 2) in vec2 aSize;
+layout(location = 3) in vec4 aUV;
+layout(location = 4) in vec4 aColor;
+
+out vec2 TexCoord;
+out vec4 Color;
+flat out vec4 UVRect;
+
+uniform mat4 projection;
+
+void main() {
+    // (0, 0), (1, 0), (0, 1), (1, 1)
+    vec2 corner = vec2(gl_VertexID & 1, gl_VertexID >> 1);
+    gl_Position = projection * vec4(aPos + corner * aSize, 0.0, 1.0);
+    // v0 是字符的顶部
+    TexCoord = vec2(mix(aUV.x, aUV.z, corner.x), mix(aUV.w, aUV.y, corner.y));
+    Color = aColor;
+    UVRect = aUV;
+}
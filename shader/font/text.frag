@@ -0,0 +1,118 @@
+#version 330 core
+
+// 变体由编译时插入的宏选择，见 TextShader.effect_program()
+// SDF: 纹理是距离场，否则是灰度位图
+// EFFECT_SHADOW, EFFECT_OUTLINE, EFFECT_GLOW: 文字下面的效果，都没有时只画文字
+
+in vec2 TexCoord;
+in vec4 Color;
+// 字符四边形的纹理坐标范围 (u0, v0, u1, v1)，效果不采样其外的相邻字符
+flat in vec4 UVRect;
+out vec4 FragColor;
+
+uniform sampler2D textTexture;
+
+// 效果的参数，单位是屏幕像素
+uniform vec2 effectOffset;  // 阴影的偏移，x 向右，y 向上
+uniform float effectWidth;  // 描边和光晕的宽度
+uniform vec4 effectColor;
+uniform int effectInverse;  // 1 时效果的颜色是文字颜色的反色
+
+#ifdef SDF
+// 距离场中 0.5 是字符边缘，一个屏幕像素内距离的变化
+float pixelDistance()
+{
+    return max(fwidth(texture(textTexture, TexCoord).r), 1e-4);
+}
+
+// 边缘向外移动 grow 个像素时的覆盖率，保持一个像素宽的抗锯齿
+float coverage(vec2 uv, float grow)
+{
+    float d = texture(textTexture, uv).r;
+    float w = pixelDistance();
+    float edge = 0.5 - grow * w;
+    return smoothstep(edge - w, edge + w, d);
+}
+#else
+float coverage(vec2 uv, float grow)
+{
+    return texture(textTexture, uv).r;
+}
+#endif
+
+// 效果的采样，四边形之外的覆盖率是 0
+float effectCoverage(vec2 uv, float grow)
+{
+    vec2 lo = min(UVRect.xy, UVRect.zw);
+    vec2 hi = max(UVRect.xy, UVRect.zw);
+    if (any(lessThan(uv, lo)) || any(greaterThan(uv, hi)))
+        return 0.0;
+    return coverage(uv, grow);
+}
+
+// 屏幕像素到纹理坐标，与字符的缩放无关
+vec2 pixelsToUV(vec2 pixels)
+{
+    return dFdx(TexCoord) * pixels.x + dFdy(TexCoord) * pixels.y;
+}
+
+#if defined(EFFECT_OUTLINE) && !defined(SDF)
+// 8个方向的最大值，位图向外扩展 effectWidth 个像素
+float outline()
+{
+    float a = 0.0;
+    for (int i = 0; i < 8; i++) {
+        float angle = float(i) * 0.785398;
+        a = max(a, effectCoverage(TexCoord + pixelsToUV(vec2(cos(angle), sin(angle)) * effectWidth), 0.0));
+    }
+    return a;
+}
+#endif
+
+#if defined(EFFECT_GLOW) && !defined(SDF)
+// 两圈各8个方向的平均，近似模糊
+float glow()
+{
+    float a = 0.0;
+    for (int i = 0; i < 8; i++) {
+        float angle = float(i) * 0.785398;
+        vec2 dir = vec2(cos(angle), sin(angle)) * effectWidth;
+        a += effectCoverage(TexCoord + pixelsToUV(dir), 0.0);
+        a += effectCoverage(TexCoord + pixelsToUV(dir * 0.5), 0.0);
+    }
+    return min(a / 8.0, 1.0);
+}
+#endif
+
+void main()
+{
+    // 主文本的alpha值
+    float alpha = coverage(TexCoord, 0.0);
+
+#if defined(EFFECT_SHADOW) || defined(EFFECT_OUTLINE) || defined(EFFECT_GLOW)
+#if defined(EFFECT_SHADOW)
+    float effectAlpha = effectCoverage(TexCoord - pixelsToUV(effectOffset), 0.0);
+#elif defined(EFFECT_OUTLINE) && defined(SDF)
+    float effectAlpha = coverage(TexCoord, effectWidth);
+#elif defined(EFFECT_OUTLINE)
+    float effectAlpha = outline();
+#elif defined(SDF)
+    // 距离场的光晕，覆盖率从边缘向外 effectWidth 个像素衰减
+    float d = texture(textTexture, TexCoord).r;
+    float effectAlpha = smoothstep(0.5 - effectWidth * pixelDistance(), 0.5, d);
+    effectAlpha *= effectAlpha;
+#else
+    float effectAlpha = glow();
+#endif
+
+    vec3 rgb = effectInverse == 1 ? vec3(1.0) - Color.rgb : effectColor.rgb;
+    vec4 effect = vec4(rgb, effectAlpha * effectColor.a);
+    vec4 text = vec4(Color.rgb, alpha);
+
+    // 先绘制效果，再在其上绘制文本
+    FragColor = mix(effect, text, text.a);
+#else
+    FragColor = vec4(Color.rgb, alpha);
+#endif
+    FragColor.a *= Color.a;
+}
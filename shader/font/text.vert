@@ -0,0 +1,19 @@
+#version 330 core
+
+layout(location = 0) in vec2 aPos;
+layout(location = 1) in vec2 aTexCoord;
+layout(location = 2) in vec4 aColor;
+layout(location = 3) in vec2 aOpposite;  // 四边形对角的纹理坐标
+
+out vec2 TexCoord;
+out vec4 Color;
+flat out vec4 UVRect;
+
+uniform mat4 projection;
+
+void main() {
+    gl_Position = projection * vec4(aPos, 0.0, 1.0);
+    TexCoord = aTexCoord;
+    Color = aColor;
+    UVRect = vec4(min(aTexCoord, aOpposite), max(aTexCoord, aOpposite));
+}
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""
+File: charset.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    The charsets for warming up the glyph cache.
+
+    The named sets are
+    - ascii: the printable ASCII chars.
+    - gb2312-1: the 3755 Hanzi of the GB2312 level-1.
+    - Any ./resource/charset/<name>.txt is the named set <name> as well.
+
+    The string like a set name (lowercase words joined by '-', like 'big5-1') must be a known set,
+    ValueError is raised if it is not, instead of warming up the letters of the name.
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+from .easy_import import *
+
+import re
+from pathlib import Path
+
+CHARSET_FOLDER = Path('./resource/charset')
+
+# The strings like the set names
+SET_NAME = re.compile(r'[a-z][a-z0-9]*(-[a-z0-9]+)+')
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+def ascii_chars():
+    return ''.join(chr(c) for c in range(0x20, 0x7F))
+
+
+def gb2312_level1_chars():
+    '''
+    The GB2312 level-1 Hanzi, the rows 0xB0 - 0xD7, the row 0xD7 stops at 0xF9.
+    '''
+    codes = bytearray()
+    for row in range(0xB0, 0xD8):
+        for cell in range(0xA1, 0xFF):
+            if row == 0xD7 and cell > 0xF9:
+                break
+            codes += bytes([row, cell])
+    return codes.decode('gb2312')
+
+
+def file_chars(path):
+    '''The chars in the text file, the whitespaces are ignored.'''
+    text = Path(path).read_text(encoding='utf-8')
+    return ''.join(text.split())
+
+
+NAMED_CHARSETS = {
+    'ascii': ascii_chars,
+    'gb2312-1': gb2312_level1_chars,
+}
+
+
+def named_charset(name):
+    '''
+    The chars of the named set.
+
+    :return chars str: the chars, or None if it is not a set name.
+    '''
+    key = name.lower()
+    if key in NAMED_CHARSETS:
+        return NAMED_CHARSETS[key]()
+    path = CHARSET_FOLDER.joinpath(f'{key}.txt')
+    if path.is_file():
+        return file_chars(path)
+    if SET_NAME.fullmatch(name):
+        raise ValueError(
+            f'Unknown charset: {name}, the named sets are {list(NAMED_CHARSETS)} and {CHARSET_FOLDER}/<name>.txt')
+    return None
+
+
+def charset_chars(charset):
+    '''
+    Expand the charset into the chars, without duplicates, in the order they appear.
+
+    :param charset: one of them, or the list of them
+        - the named set, like 'ascii', see NAMED_CHARSETS.
+        - the string of the chars.
+        - the range of the codepoints, like range(0x4E00, 0x9FA6).
+        - the (start, stop) codepoints, the stop is excluded like the range.
+
+    :return chars str: the chars.
+    '''
+    return ''.join(dict.fromkeys(_expand(charset)))
+
+
+def _expand(charset):
+    if isinstance(charset, str):
+        chars = named_charset(charset)
+        return charset if chars is None else chars
+
+    if isinstance(charset, range):
+        return ''.join(map(chr, charset))
+
+    if isinstance(charset, tuple) and len(charset) == 2 and all(isinstance(e, int) for e in charset):
+        return ''.join(map(chr, range(*charset)))
+
+    return ''.join(_expand(e) for e in charset)
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
@@ -0,0 +1,168 @@
+"""
+File: font_fallback.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    The font fallback chain.
+    The char is drawn with the first font of the chain having it.
+
+    The cmap of every font is scanned once into the FontCoverage,
+    a bitset of the BMP and a set of the higher codepoints,
+    and the chain keeps the font of every codepoint in a lookup table,
+    so choosing the font never goes through FreeType.
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+from .easy_import import *
+
+import os
+import freetype
+
+BMP_SIZE = 0x10000
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+class FontCoverage:
+    '''
+    The codepoints of the font.
+    - bmp: the bitset of the codepoints < 0x10000, 8 KB.
+    - extra: the set of the higher codepoints.
+    '''
+
+    # The coverage of the scanned fonts, (path, mtime) -> FontCoverage
+    _scanned = {}
+
+    def __init__(self, face):
+        codepoints = np.fromiter(
+            (codepoint for codepoint, _ in face.get_chars()), dtype=np.int64)
+        bmp = np.zeros(BMP_SIZE, dtype=bool)
+        bmp[codepoints[codepoints < BMP_SIZE]] = True
+        self.bmp = np.packbits(bmp, bitorder='little')
+        self.extra = set(codepoints[codepoints >= BMP_SIZE].tolist())
+        self.count = len(codepoints)
+
+    @classmethod
+    def of_font(cls, font_path):
+        '''
+        The coverage of the font file, every file is scanned only once.
+        '''
+        key = (os.path.abspath(font_path), os.path.getmtime(font_path))
+        if key not in cls._scanned:
+            cls._scanned[key] = cls(freetype.Face(font_path))
+        return cls._scanned[key]
+
+    def bmp_mask(self):
+        '''The (0x10000,) bool array of the BMP codepoints.'''
+        return np.unpackbits(self.bmp, bitorder='little').astype(bool)
+
+    def __contains__(self, codepoint):
+        if codepoint < BMP_SIZE:
+            return bool(self.bmp[codepoint >> 3] >> (codepoint & 7) & 1)
+        return codepoint in self.extra
+
+    def __len__(self):
+        return self.count
+
+
+class FontChain:
+    '''
+    The ordered fonts, the char is drawn with the first font having it,
+    or with the first font if none of them has it.
+
+    It only knows the files, the faces are opened by open(),
+    so every thread can have its own faces of the same chain.
+    '''
+
+    def __init__(self, font_paths):
+        '''
+        :param font_paths list: the font files in order, the duplicated and missing ones are skipped.
+        '''
+        self.font_paths = []
+        for path in dict.fromkeys(font_paths):
+            if os.path.isfile(path):
+                self.font_paths.append(path)
+            else:
+                logger.warning(f'Skip the missing font: {path}')
+        if not self.font_paths:
+            raise FileNotFoundError(f'None of the fonts exists: {font_paths}')
+
+        self.coverages = [FontCoverage.of_font(path)
+                          for path in self.font_paths]
+
+        # 每个码位对应的字体序号，靠前的字体优先
+        self.bmp_fonts = np.zeros(BMP_SIZE, dtype=np.uint8)
+        for i, coverage in reversed(list(enumerate(self.coverages))):
+            self.bmp_fonts[coverage.bmp_mask()] = i
+        self.extra_fonts = {}
+        for i, coverage in reversed(list(enumerate(self.coverages))):
+            self.extra_fonts.update(dict.fromkeys(coverage.extra, i))
+
+    def __len__(self):
+        return len(self.font_paths)
+
+    def resolve(self, codepoint):
+        '''
+        :return index int: the font of the codepoint in the chain.
+        '''
+        if codepoint < BMP_SIZE:
+            return int(self.bmp_fonts[codepoint])
+        return self.extra_fonts.get(codepoint, 0)
+
+    def missing(self, chars):
+        '''The chars none of the fonts has.'''
+        return ''.join(c for c in chars if not any(ord(c) in e for e in self.coverages))
+
+    def open(self, size):
+        '''
+        Open the faces of the fonts at the size.
+
+        :return faces ChainFaces: the faces for rasterize_glyph().
+        '''
+        return ChainFaces(self, size)
+
+
+class ChainFaces:
+    '''
+    The faces of the FontChain at one size, used by one thread.
+    '''
+
+    def __init__(self, chain, size):
+        self.chain = chain
+        self.size = size
+        self.faces = []
+        for path in chain.font_paths:
+            face = freetype.Face(path)
+            face.set_char_size(size << 6)
+            self.faces.append(face)
+
+    def face(self, char):
+        '''The face to draw the char.'''
+        return self.faces[self.chain.resolve(ord(char))]
+
+    def __getitem__(self, i):
+        return self.faces[i]
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
@@ -0,0 +1,149 @@
+"""
+File: gl_state.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    GL state tracker.
+    Remember the bound program, VAO, buffers, textures and the uniform values,
+    and skip the GL calls which change nothing.
+
+    The state is only right if every bind goes through the tracker,
+    call gl_state.invalidate() after binding things directly.
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+from .easy_import import *
+
+from OpenGL.GL import *
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+class GLState:
+    '''
+    The tracked GL state of the current context.
+    '''
+
+    def __init__(self):
+        # Uniform locations and the last uploaded values, per program
+        self.locations = {}
+        self.uniforms = {}
+        self.invalidate()
+
+    def invalidate(self):
+        '''Forget the bindings, the next binds go to GL anyway.'''
+        self.program = None
+        self.vertex_array = None
+        self.buffers = {}
+        self.active_texture = None
+        self.textures = {}
+
+    def use_program(self, program):
+        if program != self.program:
+            glUseProgram(program)
+            self.program = program
+
+    def bind_vertex_array(self, vao):
+        if vao != self.vertex_array:
+            glBindVertexArray(vao)
+            self.vertex_array = vao
+
+    def bind_buffer(self, target, buffer):
+        if self.buffers.get(target) != buffer:
+            glBindBuffer(target, buffer)
+            self.buffers[target] = buffer
+
+    def bind_texture(self, texture, unit=0, target=GL_TEXTURE_2D):
+        if self.textures.get((unit, target)) == texture:
+            return
+        if unit != self.active_texture:
+            glActiveTexture(GL_TEXTURE0 + unit)
+            self.active_texture = unit
+        glBindTexture(target, texture)
+        self.textures[(unit, target)] = texture
+
+    def delete_textures(self, textures):
+        '''Delete the textures, and forget them in the bindings.'''
+        glDeleteTextures(textures)
+        for key, texture in list(self.textures.items()):
+            if texture in textures:
+                del self.textures[key]
+
+    def delete_buffers(self, buffers):
+        '''Delete the buffers, and forget them in the bindings.'''
+        glDeleteBuffers(len(buffers), buffers)
+        for key, buffer in list(self.buffers.items()):
+            if buffer in buffers:
+                del self.buffers[key]
+
+    def uniform_location(self, program, name):
+        key = (program, name)
+        location = self.locations.get(key)
+        if location is None:
+            location = glGetUniformLocation(program, name)
+            self.locations[key] = location
+        return location
+
+    def set_uniform(self, program, name, kind, value):
+        '''
+        Upload the uniform of the program, if its value changes.
+        The program must be in use.
+
+        :param kind str: one of '1i', '1f', '2f', '3f', '4f', 'mat4'.
+        :param value: the value, a number, tuple or np.array.
+        '''
+        key = (program, name)
+        if kind == 'mat4':
+            old = self.uniforms.get(key)
+            if old is not None and np.array_equal(old, value):
+                return
+            value = np.array(value, dtype=np.float32)
+        else:
+            if self.uniforms.get(key) == value:
+                return
+
+        location = self.uniform_location(program, name)
+        if kind == '1i':
+            glUniform1i(location, value)
+        elif kind == '1f':
+            glUniform1f(location, value)
+        elif kind == '2f':
+            glUniform2f(location, *value)
+        elif kind == '3f':
+            glUniform3f(location, *value)
+        elif kind == '4f':
+            glUniform4f(location, *value)
+        elif kind == 'mat4':
+            glUniformMatrix4fv(location, 1, GL_FALSE, value)
+        else:
+            raise ValueError(f'Unknown uniform kind: {kind}')
+
+        self.uniforms[key] = value
+
+
+# The single GL context of the application
+gl_state = GLState()
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
@@ -0,0 +1,249 @@
+"""
+File: gl_stats.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    GL call accounting.
+    Count the draw calls, binds, uniform uploads, texture uploads, state queries and the uploaded bytes of every frame.
+    The glBegin of the fixed-function (instance mode) text is counted as a draw call.
+
+    The modules call the GL functions by their global names (from OpenGL.GL import *),
+    gl_stats.enable() replaces the names in the modules by the counting wrappers,
+    and gl_stats.disable() puts the GL functions back.
+    When it is not enabled nothing is wrapped, the only cost is the check in new_frame().
+
+    The binds and uniforms through the gl_state are counted only when they reach GL,
+    the ones it skips cost nothing.
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+from .easy_import import *
+
+import json
+import importlib
+from pathlib import Path
+from collections import Counter, deque
+from OpenGL.GL import *
+
+# The counted GL functions and their kinds
+KINDS = {
+    **{name: 'draw_calls' for name in [
+        'glDrawArrays', 'glDrawArraysInstanced', 'glMultiDrawArrays', 'glDrawElements', 'glBegin']},
+    **{name: 'binds' for name in [
+        'glUseProgram', 'glBindVertexArray', 'glBindBuffer', 'glActiveTexture', 'glBindTexture']},
+    **{name: 'uniforms' for name in [
+        'glUniform1i', 'glUniform1f', 'glUniform2f', 'glUniform3f', 'glUniform4f', 'glUniformMatrix4fv']},
+    **{name: 'texture_uploads' for name in ['glTexImage2D', 'glTexSubImage2D']},
+    **{name: 'buffer_uploads' for name in ['glBufferData', 'glBufferSubData', 'glMapBufferRange']},
+    **{name: 'queries' for name in ['glGetIntegerv']},
+}
+
+# The numbers of every frame
+FIELDS = ['draw_calls', 'vertices', 'binds', 'uniforms',
+          'texture_uploads', 'texture_bytes', 'buffer_uploads', 'buffer_bytes', 'queries']
+
+# The modules of the window and the text renderer calling GL
+MODULES = ['gl_state', 'glfw_window', 'glyph_atlas',
+           'stream_buffer', 'text_label', 'text_render']
+
+# The bytes of one texel of the format
+TEXEL_BYTES = {GL_RED: 1, GL_ALPHA: 1, GL_RG: 2, GL_RGB: 3, GL_RGBA: 4}
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+# 每个函数额外计数的内容，参数与 GL 函数相同
+def _draw_arrays(counts, mode, first, count):
+    counts['vertices'] += int(count)
+
+
+def _draw_arrays_instanced(counts, mode, first, count, instances):
+    counts['vertices'] += int(count) * int(instances)
+
+
+def _multi_draw_arrays(counts, mode, firsts, vertex_counts, n):
+    counts['vertices'] += int(np.sum(vertex_counts[:n]))
+
+
+def _draw_elements(counts, mode, count, type, indices):
+    counts['vertices'] += int(count)
+
+
+# 孤立缓冲区的 glBufferData(None) 不传输数据
+def _buffer_data(counts, target, size, data, usage):
+    if data is not None:
+        counts['buffer_bytes'] += int(size)
+
+
+def _buffer_sub_data(counts, target, offset, size, data):
+    counts['buffer_bytes'] += int(size)
+
+
+def _map_buffer_range(counts, target, offset, length, access):
+    if access & GL_MAP_WRITE_BIT:
+        counts['buffer_bytes'] += int(length)
+
+
+def _tex_image_2d(counts, target, level, internal_format, width, height, border, format, type, pixels):
+    if pixels is not None:
+        counts['texture_bytes'] += width * height * TEXEL_BYTES.get(format, 4)
+
+
+def _tex_sub_image_2d(counts, target, level, x, y, width, height, format, type, pixels):
+    counts['texture_bytes'] += width * height * TEXEL_BYTES.get(format, 4)
+
+
+ARGUMENTS = {
+    'glDrawArrays': _draw_arrays,
+    'glDrawArraysInstanced': _draw_arrays_instanced,
+    'glMultiDrawArrays': _multi_draw_arrays,
+    'glDrawElements': _draw_elements,
+    'glBufferData': _buffer_data,
+    'glBufferSubData': _buffer_sub_data,
+    'glMapBufferRange': _map_buffer_range,
+    'glTexImage2D': _tex_image_2d,
+    'glTexSubImage2D': _tex_sub_image_2d,
+}
+
+
+class GLStats:
+    '''
+    The GL calls and the bytes of every frame.
+
+    - current: the counts of the frame being drawn, by the kinds and the function names.
+    - history: the numbers of the last frames, see frame_stats().
+    '''
+
+    def __init__(self, history=120):
+        self.enabled = False
+        # (module, name, the GL function) replaced by the wrappers
+        self.wrapped = []
+        self.history = deque(maxlen=history)
+        self.reset()
+
+    def reset(self):
+        '''Forget the counted frames.'''
+        self.frame = 0
+        self.current = Counter()
+        self.totals = Counter()
+        self.history.clear()
+
+    def enable(self, modules=()):
+        '''
+        Wrap the GL functions of the window and text modules, and the modules.
+
+        :param modules list: more modules calling GL, like the script of the main_render().
+        '''
+        modules = [importlib.import_module(f'{__package__}.{name}')
+                   for name in MODULES] + list(modules)
+        done = {id(module) for module, _, _ in self.wrapped}
+        for module in modules:
+            if id(module) in done:
+                continue
+            done.add(id(module))
+            for name in KINDS:
+                func = module.__dict__.get(name)
+                if func is None:
+                    continue
+                self.wrapped.append((module, name, func))
+                setattr(module, name, self._wrap(name, func))
+        self.enabled = True
+
+    def disable(self):
+        '''Put the GL functions back.'''
+        for module, name, func in self.wrapped:
+            setattr(module, name, func)
+        self.wrapped = []
+        self.enabled = False
+
+    def _wrap(self, name, func):
+        kind = KINDS[name]
+        arguments = ARGUMENTS.get(name)
+
+        def wrapped(*args):
+            counts = self.current
+            counts[name] += 1
+            counts[kind] += 1
+            if arguments is not None:
+                arguments(counts, *args)
+            return func(*args)
+        return wrapped
+
+    def new_frame(self):
+        '''
+        End the frame, its counts go to the history.
+        '''
+        if not self.enabled:
+            return
+        self.history.append(self.summary(self.current))
+        self.totals.update(self.current)
+        self.current = Counter()
+        self.frame += 1
+
+    @staticmethod
+    def summary(counts):
+        stats = {field: counts[field] for field in FIELDS}
+        stats['calls'] = {name: counts[name]
+                          for name in KINDS if counts[name]}
+        return stats
+
+    def frame_stats(self):
+        '''
+        :return stats dict: the numbers of the last frame, zeros before the first frame ends.
+        '''
+        if not self.history:
+            return self.summary(Counter())
+        return self.history[-1]
+
+    def average(self):
+        '''
+        :return stats dict: the numbers of every frame, averaged over the history.
+        '''
+        n = max(len(self.history), 1)
+        return {field: sum(e[field] for e in self.history) / n for field in FIELDS}
+
+    def stats(self):
+        return {
+            'frames': self.frame,
+            'last_frame': self.frame_stats(),
+            'average': self.average(),
+            'totals': self.summary(self.totals),
+            'history': [{field: e[field] for field in FIELDS} for e in self.history],
+        }
+
+    def dump(self, path):
+        '''
+        Write the stats() into the JSON file.
+        '''
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.stats(), indent=2))
+        logger.info(f'GL stats of {self.frame} frames: {path}')
+
+
+# The single GL context of the application
+gl_stats = GLStats()
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
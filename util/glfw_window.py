@@ -20,7 +20,10 @@ Functions:
 # Requirements and constants
 from .fps_ruler import FPSRuler
 from .text_render import TextRenderer
+from .text_effect import TextEffect
 from .color_transfer import ColorTransfer
+from .gl_state import gl_state
+from .gl_stats import gl_stats
 from .easy_import import *
 
 import glfw
@@ -79,6 +82,31 @@ class GLFWWindow(CursorPosition):
     # Options
     is_focused = True
     click_through = False
+    # Queue the draw_text() calls and draw them all before swapping buffers
+    deferred_text = True
+    # Rasterize the new chars on a worker thread, set it before load_font()
+    async_glyphs = False
+    # Keep the rasterized glyphs in the folder for the next start, set it before load_font()
+    glyph_cache_dir = None
+    # Draw the text with the signed distance field glyphs, sharp at any scale, set it before load_font()
+    sdf_text = False
+    # Draw every char as one instance of a quad, set it before load_font()
+    instanced_text = False
+    # The fonts for the chars the font does not have, tried in order, set it before load_font()
+    fallback_fonts = []
+    # Adjust the space between the chars by the kerning table of the font, set it before load_font()
+    kerning = True
+    # The pixel sizes the scaled text is rasterized at, instead of shrinking the glyphs of the font size,
+    # like the top bar at the scale 0.5, None for only the font size, set it before load_font()
+    text_size_buckets = (12, 16, 20, 24, 32)
+    # The TextEffect under the text when the draw has no effect, see util/text_effect.py
+    text_effect = TextEffect()
+    # Count the GL calls and bytes of every frame, see frame_stats() and util/gl_stats.py
+    # Or call gl_stats.enable(modules) before the render_loop(), to count the modules of the main_render() as well
+    count_gl_calls = False
+
+    # The labels of the top bar, created by the first render_top_bar()
+    top_bar = None
 
     # Addons
     text_renderer = TextRenderer()
@@ -89,9 +117,18 @@ class GLFWWindow(CursorPosition):
         pass
 
     def cleanup(self):
+        self.text_renderer.save_disk_caches()
         logger.info('Cleanup')
 
     def load_font(self, font_path: str, font_size: int = 48):
+        self.text_renderer.async_glyphs = self.async_glyphs
+        self.text_renderer.disk_cache_dir = self.glyph_cache_dir
+        self.text_renderer.sdf = self.sdf_text
+        self.text_renderer.instanced = self.instanced_text
+        self.text_renderer.fallback_font_paths = self.fallback_fonts
+        self.text_renderer.kerning = self.kerning
+        self.text_renderer.size_buckets = self.text_size_buckets
+        self.text_renderer.effect = self.text_effect
         self.text_renderer.load_font(font_path, font_size)
         self.font_path = font_path
         self.font_size = font_size
@@ -172,20 +209,50 @@ class GLFWWindow(CursorPosition):
         scale = 0.5
         color = (1.0, 1.0, 1.0, 1.0)
 
-        text = f"GLFW ({glfw.__version__}) is Rendering at {self.width} x {self.height} ({self.refresh_rate} Hz)"
-        self.draw_text(text, -1.0, 1.0, scale, TextAnchor.TL, color)
+        # 顶栏是常驻的标签，每帧只改写变化的字符
+        if self.top_bar is None:
+            text = f"GLFW ({glfw.__version__}) is Rendering at {self.width} x {self.height} ({self.refresh_rate} Hz)"
+            self.top_bar = {
+                'info': self.create_label(text, -1.0, 1.0, scale, TextAnchor.TL, color),
+                'focus': self.create_label('', 0, 1.0, scale, TextAnchor.T, color),
+                'fps': self.create_template(' | '.join(['-', 'FPS: {:7.2f}']), 1.0, 1.0, scale, TextAnchor.TR, color, values=(0,)),
+            }
+
+        self.top_bar['focus'].text = '窗口获得焦点' if self.is_focused else '窗口失去焦点'
+        self.top_bar['fps'].set(self.fps.get_fps())
+        return
+
+    def render_frame(self, main_render: callable):
+        '''
+        Draw one frame into the back buffer, the caller swaps the buffers.
+        '''
+        # 上一帧到此结束，包括交换缓冲区
+        gl_stats.new_frame()
+
+        # 设置透明背景
+        glClearColor(0.0, 0.0, 0.0, 0.0)
+        glClear(GL_COLOR_BUFFER_BIT)
+
+        # The main_render() may bind things without the gl_state.
+        gl_state.invalidate()
+        self.text_renderer.new_frame()
+
+        # Run the main_render() for custom rendering.
+        main_render()
 
-        text = '窗口获得焦点' if self.is_focused else '窗口失去焦点'
-        self.draw_text(text, 0, 1.0, scale, TextAnchor.T, color)
+        # Draw the top bar.
+        self.render_top_bar()
 
-        text = ' | '.join([
-            '-',
-            f'FPS: {self.fps.get_fps():.2f}'
-        ])
-        self.draw_text(text, 1.0, 1.0, scale, TextAnchor.TR, color)
+        # Draw the queued texts.
+        self.text_renderer.flush()
         return
 
-    def render_loop(self, main_render: callable):
+    def render_loop(self, main_render: callable, max_frames: int = None):
+        '''
+        Render until the window closes.
+
+        :param max_frames: stop after the frames, like the benchmarks, None for running until the window closes.
+        '''
         window = self.window
 
         # Bind focus callback
@@ -197,17 +264,17 @@ class GLFWWindow(CursorPosition):
         glEnable(GL_BLEND)
         glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
 
+        if self.count_gl_calls:
+            gl_stats.enable()
+
         # Main rendering loop
+        frame = 0
         while not glfw.window_should_close(window):
-            # 设置透明背景
-            glClearColor(0.0, 0.0, 0.0, 0.0)
-            glClear(GL_COLOR_BUFFER_BIT)
+            if max_frames is not None and frame >= max_frames:
+                break
+            frame += 1
 
-            # Run the main_render() for custom rendering.
-            main_render()
-
-            # Draw the top bar.
-            self.render_top_bar()
+            self.render_frame(main_render)
 
             # Just draw the buffer.
             glfw.swap_buffers(window)
@@ -222,6 +289,21 @@ class GLFWWindow(CursorPosition):
         logger.info('Rendering stops')
         return
 
+    def frame_stats(self):
+        '''
+        The GL calls and bytes of the last frame, counted when count_gl_calls is set.
+
+        :return stats dict: the draw_calls, vertices, binds, uniforms, texture_uploads, texture_bytes,
+                            buffer_uploads and buffer_bytes, and the calls of every GL function.
+        '''
+        return gl_stats.frame_stats()
+
+    def dump_frame_stats(self, path):
+        '''
+        Write the GL calls and bytes of the last frames into the JSON file.
+        '''
+        gl_stats.dump(path)
+
     def draw_rect(self, x, y, w, h, color=(1, 1, 1, 1)):
         '''
         Suppose the x, y is the SW corner of the rectangle.
@@ -249,20 +331,98 @@ class GLFWWindow(CursorPosition):
         glEnd()
         return
 
-    def draw_text(self, text, x, y, scale, anchor: TextAnchor = TextAnchor.BL, color=(1.0, 1.0, 1.0, 1.0)):
+    def draw_text(self, text, x, y, scale, anchor: TextAnchor = TextAnchor.BL, color=(1.0, 1.0, 1.0, 1.0), effect=None):
         '''
         The text is actually drawn by pixel units.
+        If deferred_text is set, the text is queued and drawn by the render_loop before swapping buffers.
 
         :param x: (-1, 1) position.
         :param y: (-1, 1) position.
+        :param effect: the TextEffect under the text, None for the text_effect.
         '''
         color = ColorTransfer(color).rgba
 
+        w, h, h2 = self.text_renderer.bounding_box(text, scale)
+        x, y = self.anchor_position(x, y, w, h, anchor)
+
+        if self.deferred_text:
+            self.text_renderer.queue_text(text, x, y, scale, color, effect)
+        else:
+            self.text_renderer.render_text(text, x, y, scale, color, effect)
+        return w, h, h2
+
+    def draw_paragraph(self, text, x, y, scale, anchor: TextAnchor = TextAnchor.TL, color=(1.0, 1.0, 1.0, 1.0), max_width=None, align='left', line_spacing=1.0, effect=None):
+        '''
+        Draw the multi-line text, the lines are wrapped to max_width and spaced by the font metrics.
+        The layout is cached, the same paragraph in the next frames is only copied into the batch.
+
+        :param x: (-1, 1) position.
+        :param y: (-1, 1) position.
+        :param max_width: the width of the lines in pixels, None for not wrapping.
+        :param align: the lines align to the 'left', 'center' or 'right' of the paragraph.
+        :param line_spacing: the times of the line height of the font.
+        :param effect: the TextEffect under the text, None for the text_effect.
+
+        :return w, h: the size of the paragraph in pixels.
+        '''
+        color = ColorTransfer(color).rgba
+
+        paragraph = self.text_renderer.layout_paragraph(
+            text, scale, max_width, align, line_spacing)
+        w, h = paragraph['width'], paragraph['height']
+        x, y = self.anchor_position(x, y, w, h, anchor)
+
+        if self.deferred_text:
+            self.text_renderer.queue_paragraph(paragraph, x, y, color, effect)
+        else:
+            self.text_renderer.render_paragraph(paragraph, x, y, color, effect)
+        return w, h
+
+    def create_label(self, text, x, y, scale, anchor: TextAnchor = TextAnchor.BL, color=(1.0, 1.0, 1.0, 1.0), max_width=None, align='left', line_spacing=1.0, effect=None):
+        '''
+        Create the retained text, it is drawn every frame until label.remove().
+        It is laid out and uploaded only when its fields change, like label.text = 'new text'.
+        The labels are drawn before the queued texts.
+
+        :param x: (-1, 1) position.
+        :param y: (-1, 1) position.
+        :param effect: the TextEffect under the text, None for the text_effect.
+
+        :return label TextLabel: the label.
+        '''
+        return self.label_buffer().create(text, x, y, scale, color, anchor=anchor,
+                                          max_width=max_width, align=align, line_spacing=line_spacing,
+                                          effect=effect)
+
+    def create_template(self, template, x, y, scale, anchor: TextAnchor = TextAnchor.BL, color=(1.0, 1.0, 1.0, 1.0), values=(), effect=None):
+        '''
+        Create the retained text of the format string, like 'FPS: {:6.2f}'.
+        Update it every frame with template.set(value), only the changed digits are written.
+
+        :param x: (-1, 1) position.
+        :param y: (-1, 1) position.
+        :param values: the first values of the fields, tuple or dict.
+        :param effect: the TextEffect under the text, None for the text_effect.
+
+        :return template TextTemplate: the template.
+        '''
+        return self.label_buffer().create_template(template, x, y, scale, color, anchor, values, effect)
+
+    def label_buffer(self):
+        '''The LabelBuffer of the text renderer, positioning the labels like draw_text().'''
+        labels = self.text_renderer.labels
+        labels.anchor_position = self.anchor_position
+        labels.convert_color = lambda c: ColorTransfer(c).rgba
+        return labels
+
+    def anchor_position(self, x, y, w, h, anchor: TextAnchor):
+        '''
+        Convert the (-1, 1) position into the pixels of the SW corner of the (w, h) box on the anchor.
+        '''
         x = int((x+1) * 0.5 * self.width)
         y = int((y+1) * 0.5 * self.height)
         # x = int(x * self.width)
         # y = int(y * self.height)
-        w, h, h2 = self.text_renderer.bounding_box(text, scale)
 
         if anchor == TextAnchor.BL:
             pass
@@ -286,9 +446,7 @@ class GLFWWindow(CursorPosition):
         elif anchor == TextAnchor.R:
             y -= h // 2
             x -= w
-
-        self.text_renderer.render_text(text, x, y, scale, color)
-        return w, h, h2
+        return x, y
 
 # %% ---- 2025-10-09 ------------------------
 # Play ground
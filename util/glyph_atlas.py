@@ -0,0 +1,346 @@
+"""
+File: glyph_atlas.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    Glyph texture atlas.
+    Pack the glyph bitmaps into a few large single channel textures,
+    so a whole string can be drawn with one texture and one draw call.
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+from .easy_import import *
+from .gl_state import gl_state
+
+from OpenGL.GL import *
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+class ShelfPacker:
+    '''
+    Shelf packing of rectangles into a fixed size page.
+
+    The page is cut into horizontal shelves.
+    A rectangle goes into the shelf which wastes the least height,
+    a new shelf is opened on the top of the skyline if none fits.
+    The freed rectangles are reused for the rectangles which fit in them,
+    the rest of a reused rectangle is split and stays free.
+    '''
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        # Every shelf is [y, height, x_cursor]
+        self.shelves = []
+        # The skyline, the y of the next new shelf
+        self.top = 0
+        # The freed [x, y, w, h] rectangles
+        self.free_rects = []
+
+    def pack(self, w, h):
+        '''
+        Find the place for the (w, h) rectangle.
+
+        :return (x, y): the NW corner of the place, or None if the page is full.
+        '''
+        if w > self.width or h > self.height:
+            return None
+
+        # The freed rectangle which wastes the least area
+        best = None
+        for rect in self.free_rects:
+            if rect[2] >= w and rect[3] >= h:
+                if best is None or rect[2] * rect[3] < best[2] * best[3]:
+                    best = rect
+        if best is not None:
+            self.free_rects.remove(best)
+            self.split(best, w, h)
+            return best[0], best[1]
+
+        best = None
+        for shelf in self.shelves:
+            y, sh, cursor = shelf
+            if sh < h or cursor + w > self.width:
+                continue
+            # Do not put tiny glyphs into very tall shelves
+            if sh > h * 2 and sh - h > 8:
+                continue
+            if best is None or sh < best[1]:
+                best = shelf
+
+        if best is None:
+            if self.top + h > self.height:
+                return None
+            best = [self.top, h, 0]
+            self.shelves.append(best)
+            self.top += h
+
+        x, y = best[2], best[0]
+        best[2] += w
+        return x, y
+
+    def split(self, rect, w, h):
+        '''
+        Give back the rest of the freed rect after the (w, h) rectangle takes its NW corner.
+
+        The rest is cut into the right and the bottom parts,
+        the larger of the two parts keeps the full side of the rect.
+        '''
+        x, y, rw, rh = rect
+        dw, dh = rw - w, rh - h
+        if dw * rh > rw * dh:
+            # 右侧的整列更大, 下方只到 w 为止
+            right, bottom = [x + w, y, dw, rh], [x, y + h, w, dh]
+        else:
+            right, bottom = [x + w, y, dw, h], [x, y + h, rw, dh]
+        for part in (right, bottom):
+            if part[2] > 0 and part[3] > 0:
+                self.free_rects.append(part)
+
+    def free(self, x, y, w, h):
+        '''Give back the rectangle of pack().'''
+        self.free_rects.append([x, y, w, h])
+
+    def usage(self):
+        '''The fraction of the page that is taken by the shelves.'''
+        return self.top / self.height
+
+
+class AtlasPage:
+    '''
+    One texture of the atlas.
+    '''
+
+    def __init__(self, size):
+        self.size = size
+        self.packer = ShelfPacker(size, size)
+        self.glyphs = 0  # the number of glyphs in the page
+        # The CPU copy of the texels, the batched uploads send whole regions of it
+        self.pixels = np.zeros((size, size), dtype=np.ubyte)
+
+        self.texture = glGenTextures(1)
+        gl_state.bind_texture(self.texture)
+
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+
+        # Clear the page, the padding between glyphs must be empty.
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_R8, size, size, 0,
+                     GL_RED, GL_UNSIGNED_BYTE, self.pixels)
+
+    def write(self, data, x, y, pad):
+        '''
+        Write the (h, w) bitmap into the pixels, with the empty padding around it.
+        The texture is not changed until upload().
+        '''
+        h, w = data.shape
+        self.pixels[y:y+h+2*pad, x:x+w+2*pad] = 0
+        self.pixels[y+pad:y+pad+h, x+pad:x+pad+w] = data
+
+    def upload(self, x, y, w, h):
+        '''
+        Upload the (x, y, w, h) region of the pixels to the texture.
+        '''
+        gl_state.bind_texture(self.texture)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexSubImage2D(GL_TEXTURE_2D, 0, x, y, w, h,
+                        GL_RED, GL_UNSIGNED_BYTE, np.ascontiguousarray(self.pixels[y:y+h, x:x+w]))
+
+    def release(self):
+        gl_state.delete_textures([self.texture])
+
+
+class GlyphAtlas:
+    '''
+    The glyph atlas with multiple pages.
+
+    A new page is opened when all the pages are full.
+    The glyph is known by its page index and its uv rectangle (u0, v0, u1, v1),
+    the (u0, v0) is the first row of the bitmap, i.e. the top of the glyph.
+
+    The removed glyphs give their places back to the page,
+    and the page without glyphs is released, its index is reused by the next new page.
+    '''
+    page_size = 1024
+    # Empty texels around every glyph, prevent the bilinear sampling from bleeding.
+    padding = 2
+
+    def __init__(self, page_size=None, padding=None):
+        if page_size is not None:
+            self.page_size = page_size
+        if padding is not None:
+            self.padding = padding
+        self.pages = []
+
+    def add(self, data, w, h):
+        '''
+        Put the glyph bitmap into the atlas.
+
+        :param data np.array: the (h, w) single channel bitmap.
+        :param w int: the width of the bitmap.
+        :param h int: the height of the bitmap.
+
+        :return page int: the index of the page.
+        :return uv tuple: the (u0, v0, u1, v1) rectangle in the page.
+        '''
+        page_index, x, y = self.place(w, h)
+        pad = self.padding
+
+        # Upload with the padding, the place may be used by a removed glyph.
+        page = self.pages[page_index]
+        page.write(np.asarray(data).reshape(h, w), x, y, pad)
+        page.upload(x, y, w + 2 * pad, h + 2 * pad)
+
+        return page_index, self.uv(x, y, w, h)
+
+    def add_many(self, bitmaps):
+        '''
+        Put the glyph bitmaps into the atlas, one upload for every page they go to.
+
+        :param bitmaps list: the (h, w) single channel bitmaps.
+
+        :return placements list: the (page, uv) of every bitmap like add(), (None, None) for the empty bitmaps.
+        :return uploads int: the number of the texture uploads.
+        '''
+        pad = self.padding
+        placements = []
+        regions = {}  # page_index -> [x0, y0, x1, y1], the region to upload
+        for data in bitmaps:
+            h, w = data.shape
+            if w == 0 or h == 0:
+                placements.append((None, None))
+                continue
+
+            page_index, x, y = self.place(w, h)
+            self.pages[page_index].write(data, x, y, pad)
+            placements.append((page_index, self.uv(x, y, w, h)))
+
+            x1, y1 = x + w + 2 * pad, y + h + 2 * pad
+            region = regions.setdefault(page_index, [x, y, x1, y1])
+            region[:] = min(region[0], x), min(region[1], y), max(
+                region[2], x1), max(region[3], y1)
+
+        for page_index, (x0, y0, x1, y1) in regions.items():
+            self.pages[page_index].upload(x0, y0, x1 - x0, y1 - y0)
+
+        return placements, len(regions)
+
+    def place(self, w, h):
+        '''
+        Find the place for the (w, h) glyph and count it in the page, a new page is opened if all are full.
+
+        :return page_index int: the index of the page.
+        :return x, y int: the NW corner of the place, with the padding.
+        '''
+        pad = self.padding
+        pw, ph = w + 2 * pad, h + 2 * pad
+
+        if pw > self.page_size or ph > self.page_size:
+            raise ValueError(
+                f'Glyph ({w} x {h}) is larger than the atlas page ({self.page_size})')
+
+        # Try the newest page first, the older pages are most likely full.
+        for page_index in reversed(range(len(self.pages))):
+            if self.pages[page_index] is None:
+                continue
+            xy = self.pages[page_index].packer.pack(pw, ph)
+            if xy is not None:
+                break
+        else:
+            page_index = self.new_page()
+            xy = self.pages[page_index].packer.pack(pw, ph)
+
+        self.pages[page_index].glyphs += 1
+        return page_index, xy[0], xy[1]
+
+    def uv(self, x, y, w, h):
+        '''The uv rectangle of the (w, h) glyph placed on (x, y) with the padding.'''
+        x, y = x + self.padding, y + self.padding
+        s = self.page_size
+        return (x / s, y / s, (x + w) / s, (y + h) / s)
+
+    def new_page(self):
+        page = AtlasPage(self.page_size)
+        if None in self.pages:
+            page_index = self.pages.index(None)
+            self.pages[page_index] = page
+        else:
+            self.pages.append(page)
+            page_index = len(self.pages) - 1
+        logger.info(f'Atlas page created: {page_index} ({self.page_size})')
+        return page_index
+
+    def remove(self, page_index, uv):
+        '''
+        Remove the glyph of add().
+        '''
+        page = self.pages[page_index]
+        s = self.page_size
+        pad = self.padding
+        x = round(uv[0] * s) - pad
+        y = round(uv[1] * s) - pad
+        w = round(uv[2] * s) - round(uv[0] * s) + 2 * pad
+        h = round(uv[3] * s) - round(uv[1] * s) + 2 * pad
+        page.packer.free(x, y, w, h)
+        page.glyphs -= 1
+
+        if page.glyphs == 0:
+            page.release()
+            self.pages[page_index] = None
+            logger.info(f'Atlas page released: {page_index}')
+
+    @staticmethod
+    def glyph_bytes(w, h):
+        '''The texels taken by the (w, h) glyph, with the padding.'''
+        pad = GlyphAtlas.padding
+        return (w + 2 * pad) * (h + 2 * pad)
+
+    def texture(self, page_index):
+        return self.pages[page_index].texture
+
+    def page_bytes(self):
+        '''The memory of one page, the texture and its CPU copy, one byte per texel in each.'''
+        return 2 * self.page_size * self.page_size
+
+    def memory_bytes(self, cpu_copy=True):
+        '''
+        The memory of the pages, the page is freed only when it has no glyphs.
+
+        :param cpu_copy bool: count the CPU copies of the pages, or only the textures.
+        '''
+        pages = sum(p is not None for p in self.pages)
+        return pages * (self.page_bytes() if cpu_copy else self.page_size * self.page_size)
+
+    def release(self):
+        for page in self.pages:
+            if page is not None:
+                page.release()
+        self.pages = []
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
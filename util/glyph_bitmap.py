@@ -0,0 +1,141 @@
+"""
+File: glyph_bitmap.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    Glyph bitmap ingestion.
+    Read the FT_Bitmap of FreeType into the (rows, width) uint8 coverage array,
+    by viewing its buffer directly, without building the python list of freetype.Bitmap.buffer.
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+from .easy_import import *
+
+import freetype
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+def buffer_view(bitmap):
+    '''
+    View the buffer of the bitmap as the (rows, |pitch|) uint8 array, without copy.
+    The rows are in the order from top to bottom, whatever the sign of the pitch is.
+
+    The view is only valid until the glyph slot is loaded again,
+    FreeType reuses the buffer for the next glyph.
+
+    :param bitmap freetype.Bitmap: the bitmap of the glyph slot.
+
+    :return view np.array: the (rows, |pitch|) uint8 array.
+    '''
+    ft_bitmap = bitmap._FT_Bitmap
+    rows, pitch = ft_bitmap.rows, abs(ft_bitmap.pitch)
+    if rows == 0 or pitch == 0 or not ft_bitmap.buffer:
+        return np.zeros((rows, pitch), dtype=np.ubyte)
+
+    view = np.ctypeslib.as_array(ft_bitmap.buffer, shape=(rows * pitch,))
+    view = view.reshape(rows, pitch)
+
+    # 负的 pitch 表示自下而上存储，内存中第一行是字形的最底行
+    if ft_bitmap.pitch < 0:
+        view = view[::-1]
+    return view
+
+
+def unpack_bits(view, width, bits):
+    '''
+    Unpack the packed pixels of the rows, MSB first.
+
+    :param view np.array: the (rows, pitch) uint8 array.
+    :param width int: the pixels of every row.
+    :param bits int: the bits of every pixel, 1, 2 or 4.
+
+    :return levels np.array: the (rows, width) uint8 levels, in 0 ... 2**bits-1.
+    '''
+    unpacked = np.unpackbits(view, axis=1)
+    if bits == 1:
+        return unpacked[:, :width]
+
+    unpacked = unpacked.reshape(len(view), -1, bits)[:, :width]
+    weights = (1 << np.arange(bits - 1, -1, -1)).astype(np.ubyte)
+    return unpacked @ weights
+
+
+def bitmap_to_array(bitmap):
+    '''
+    Convert the bitmap of any pixel_mode into the (rows, width) uint8 coverage array,
+    0 is transparent and 255 is opaque.
+
+    - MONO: 1 bit per pixel, unpacked by np.unpackbits.
+    - GRAY: 1 byte per pixel, scaled by num_grays, it is a view of the FreeType buffer if possible.
+    - GRAY2, GRAY4: 2 or 4 bits per pixel.
+    - LCD, LCD_V: the mean of the 3 subpixels, the width or the rows is the third of the bitmap's.
+    - BGRA: the alpha channel of the color glyphs.
+
+    The returned array may be a view of the FreeType buffer,
+    use it (or copy it) before the glyph slot is loaded again.
+
+    :param bitmap freetype.Bitmap: the bitmap of the glyph slot.
+
+    :return data np.array: the (rows, width) uint8 array.
+    '''
+    mode = bitmap.pixel_mode
+    width = bitmap.width
+    view = buffer_view(bitmap)
+
+    if mode == freetype.FT_PIXEL_MODE_MONO:
+        data = unpack_bits(view, width, 1)
+        # 0/1 映射到 0/255
+        data *= 255
+        return data
+
+    if mode == freetype.FT_PIXEL_MODE_GRAY:
+        data = view[:, :width]
+        num_grays = bitmap.num_grays
+        if num_grays not in (0, 256):
+            data = (data.astype(np.uint16) * 255 //
+                    (num_grays - 1)).astype(np.ubyte)
+        return data
+
+    if mode in (freetype.FT_PIXEL_MODE_GRAY2, freetype.FT_PIXEL_MODE_GRAY4):
+        bits = 2 if mode == freetype.FT_PIXEL_MODE_GRAY2 else 4
+        levels = unpack_bits(view, width, bits)
+        return levels * np.ubyte(255 // ((1 << bits) - 1))
+
+    if mode == freetype.FT_PIXEL_MODE_LCD:
+        rgb = view[:, :width - width % 3].reshape(len(view), -1, 3)
+        return rgb.mean(axis=2, dtype=np.float32).round().astype(np.ubyte)
+
+    if mode == freetype.FT_PIXEL_MODE_LCD_V:
+        rows = len(view) - len(view) % 3
+        rgb = view[:rows, :width].reshape(-1, 3, width)
+        return rgb.mean(axis=1, dtype=np.float32).round().astype(np.ubyte)
+
+    if mode == freetype.FT_PIXEL_MODE_BGRA:
+        return view[:, :width * 4].reshape(len(view), width, 4)[:, :, 3]
+
+    raise ValueError(f'Unknown pixel_mode of the bitmap: {mode}')
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
@@ -0,0 +1,219 @@
+"""
+File: glyph_disk_cache.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    Persistent glyph cache on the disk.
+    The rasterized bitmaps and metrics are saved for the next start,
+    and memory-mapped on loading, so the cached glyphs never touch FreeType.
+
+    Every (fonts, size, load flags, variant) has its own pair of files,
+    - <key>.bin: the bitmaps, one after another, the file is only appended.
+    - <key>.idx.npy: the index of the bitmaps, see GlyphDiskCache.index_dtype.
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+from .easy_import import *
+
+import os
+import atexit
+import hashlib
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+def file_hash(path, chunk_size=1 << 20):
+    '''The sha1 of the file content.'''
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+
+class GlyphDiskCache:
+    '''
+    The glyphs of the fonts at the size, on the disk.
+
+    The get() gives the glyph like rasterize_glyph(), its data is a view of the mapped file.
+    The put() keeps the new glyph in memory, the save() appends them to the files.
+    It is saved on exit as well, until close().
+    '''
+    # Change it when the bitmaps are produced in another way, the old files are not used anymore.
+    version = 1
+
+    index_dtype = np.dtype([
+        ('codepoint', '<u4'),
+        ('offset', '<u8'),
+        ('rows', '<u2'),
+        ('width', '<u2'),
+        ('bearing_x', '<i2'),
+        ('bearing_y', '<i2'),
+        ('advance', '<i2'),
+    ])
+
+    def __init__(self, cache_dir, font_paths, size, flags, variant=''):
+        '''
+        :param cache_dir str: the folder of the cache files.
+        :param font_paths list: the font files, the glyphs may come from any of them.
+        :param size int: the font size.
+        :param flags int: the FreeType load flags of the glyphs.
+        :param variant str: how the bitmaps are made from the glyphs, like 'sdf4x4'.
+        '''
+        self.cache_dir = cache_dir
+        self.key = self.make_key(font_paths, size, flags, variant)
+        base = os.path.join(cache_dir, self.key)
+        self.index_path = base + '.idx.npy'
+        self.data_path = base + '.bin'
+
+        self.unsaved = {}  # codepoint -> glyph, not on the disk yet
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+
+        self.load()
+        atexit.register(self.save)
+
+    @classmethod
+    def make_key(cls, font_paths, size, flags, variant=''):
+        sha1 = hashlib.sha1()
+        for path in font_paths:
+            sha1.update(file_hash(path).encode())
+        return f'{sha1.hexdigest()[:16]}-{size}-{flags:x}{variant}-v{cls.version}'
+
+    def load(self):
+        '''
+        Map the cache files, the broken files are ignored.
+        '''
+        self.index = np.zeros(0, dtype=self.index_dtype)
+        self.data = np.zeros(0, dtype=np.ubyte)
+
+        if os.path.isfile(self.index_path) and os.path.isfile(self.data_path):
+            try:
+                index = np.load(self.index_path)
+                data_size = os.path.getsize(self.data_path)
+                ends = index['offset'] + \
+                    index['rows'].astype(np.uint64) * index['width']
+                if index.dtype != self.index_dtype or (len(index) and ends.max() > data_size):
+                    raise ValueError('The index does not match the data')
+                self.index = index
+                if data_size > 0:
+                    self.data = np.memmap(
+                        self.data_path, dtype=np.ubyte, mode='r')
+            except Exception as err:
+                logger.warning(f'Ignore the broken glyph cache {self.key}: {err}')
+
+        self.slots = dict(
+            zip(self.index['codepoint'].tolist(), range(len(self.index))))
+        logger.info(f'Glyph cache {self.key}: {len(self.index)} glyphs')
+
+    def __len__(self):
+        return len(self.slots) + len(self.unsaved)
+
+    def get(self, char):
+        '''
+        Get the glyph of the char.
+
+        :return glyph dict: the data (rows, width), bearing and advance, or None if it is not cached.
+        '''
+        codepoint = ord(char)
+        glyph = self.unsaved.get(codepoint)
+        if glyph is not None:
+            self.hits += 1
+            return glyph
+
+        slot = self.slots.get(codepoint)
+        if slot is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        record = self.index[slot]
+        rows, width = int(record['rows']), int(record['width'])
+        offset = int(record['offset'])
+        return {
+            'data': self.data[offset:offset + rows * width].reshape(rows, width),
+            'bearing': (int(record['bearing_x']), int(record['bearing_y'])),
+            'advance': int(record['advance']),
+        }
+
+    def put(self, char, glyph):
+        '''
+        Keep the glyph of rasterize_glyph(), until save().
+        '''
+        codepoint = ord(char)
+        if codepoint in self.slots:
+            return
+        # 复制一份，data 可能是 FreeType 缓冲区的视图
+        self.unsaved[codepoint] = dict(glyph, data=np.array(glyph['data']))
+
+    def save(self):
+        '''
+        Append the new glyphs to the cache files.
+        '''
+        if not self.unsaved:
+            return
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        records = np.zeros(len(self.unsaved), dtype=self.index_dtype)
+
+        # 先追加位图，再写索引，中途失败时旧的索引仍然有效
+        with open(self.data_path, 'ab') as f:
+            offset = f.tell()
+            for i, (codepoint, glyph) in enumerate(self.unsaved.items()):
+                data = np.ascontiguousarray(glyph['data'], dtype=np.ubyte)
+                records[i] = (codepoint, offset, *data.shape,
+                              *glyph['bearing'], glyph['advance'])
+                f.write(data.tobytes())
+                offset += data.nbytes
+
+        index = np.concatenate([self.index, records])
+        tmp_path = self.index_path + '.tmp.npy'
+        np.save(tmp_path, index)
+        os.replace(tmp_path, self.index_path)
+
+        logger.info(
+            f'Glyph cache {self.key}: {len(records)} glyphs saved, {len(index)} in total')
+        self.unsaved = {}
+        self.load()
+
+    def close(self):
+        '''
+        Save the new glyphs, the cache is not saved on exit anymore, when it is replaced by another one.
+        '''
+        self.save()
+        atexit.unregister(self.save)
+
+    def stats(self):
+        return {
+            'glyphs': len(self),
+            'unsaved': len(self.unsaved),
+            'hits': self.hits,
+            'misses': self.misses,
+            'file_bytes': int(self.data.nbytes + self.index.nbytes),
+        }
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
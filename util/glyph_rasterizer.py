@@ -0,0 +1,189 @@
+"""
+File: glyph_rasterizer.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    Glyph rasterization.
+    The FreeType rendering of the new chars runs on a worker thread,
+    the render thread only uploads the finished bitmaps,
+    so the first appearance of a char does not stall the frame.
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+from .easy_import import *
+from .glyph_bitmap import bitmap_to_array
+
+import time
+import queue
+import threading
+import freetype
+from collections import deque
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+def rasterize_glyph(faces, char, copy=False):
+    '''
+    Render the char with the first face of the fallback chain having it.
+
+    :param faces ChainFaces: the faces of the FontChain.
+    :param copy bool: copy the bitmap out of the FreeType buffer, it is required if the glyph is kept after the next load.
+
+    :return glyph dict: the data (rows, width), bearing and advance of the char.
+    '''
+    face = faces.face(char)
+    face.load_char(char, freetype.FT_LOAD_RENDER)
+    data = bitmap_to_array(face.glyph.bitmap)
+    return {
+        'data': data.copy() if copy else data,
+        'bearing': (face.glyph.bitmap_left, face.glyph.bitmap_top),
+        'advance': face.glyph.advance.x >> 6,
+    }
+
+
+class GlyphRasterizer:
+    '''
+    Rasterize the chars on a worker thread.
+
+    The worker owns its faces, the FreeType faces are never shared between threads.
+    The render thread calls request() for the missing chars,
+    and collect() at the start of the frame to get the finished glyphs.
+
+    Only the render thread calls request(), collect() and stats().
+    The glyphs of the other pixel sizes (the size buckets) are rasterized by the same worker,
+    with the faces it opens at the size on the first request.
+    '''
+
+    # The number of latencies kept for the statistics
+    latency_window = 256
+
+    def __init__(self, chain, size, rasterize=rasterize_glyph):
+        '''
+        :param chain FontChain: the fonts.
+        :param rasterize callable: the function like rasterize_glyph(), e.g. rasterize_sdf_glyph().
+        '''
+        self.rasterize = rasterize
+        self.chain = chain
+
+        # The faces are created here and used only by the worker from now on
+        self.faces = chain.open(size)
+        # 其他尺寸的 face，由工作线程打开和使用
+        self.bucket_faces = {}
+
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        self.pending = set()  # requested and not collected yet
+        self.latencies = deque(maxlen=self.latency_window)
+        self.rasterized = 0
+
+        self.thread = threading.Thread(
+            target=self._run, name='GlyphRasterizer', daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            item = self.requests.get()
+            if item is None:
+                break
+            char, bucket, requested = item
+            try:
+                glyph = self.rasterize(self.bucket_face(bucket), char, copy=True)
+            except Exception as err:
+                logger.exception(err)
+                glyph = None
+            self.results.put((char, bucket, glyph, requested))
+
+    def bucket_face(self, bucket):
+        '''The faces of the pixel size, only called by the worker.'''
+        if not bucket:
+            return self.faces
+        faces = self.bucket_faces.get(bucket)
+        if faces is None:
+            faces = self.bucket_faces[bucket] = self.chain.open(bucket)
+        return faces
+
+    def request(self, char, bucket=0):
+        '''
+        Ask the worker for the char, the char already requested is ignored.
+
+        :param bucket int: the pixel size of the glyph, 0 for the size of the rasterizer.
+        '''
+        if (char, bucket) in self.pending:
+            return
+        self.pending.add((char, bucket))
+        self.requests.put((char, bucket, time.perf_counter()))
+
+    def collect(self, max_count=None):
+        '''
+        Get the finished glyphs, without waiting for the worker.
+
+        :param max_count int: the most glyphs to get, None for all of them.
+
+        :return glyphs list: the (char, bucket, glyph) of the requests, the glyph is None if it fails.
+        '''
+        glyphs = []
+        now = time.perf_counter()
+        while max_count is None or len(glyphs) < max_count:
+            try:
+                char, bucket, glyph, requested = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending.discard((char, bucket))
+            self.latencies.append(now - requested)
+            self.rasterized += 1
+            glyphs.append((char, bucket, glyph))
+        return glyphs
+
+    def wait(self, timeout=None):
+        '''
+        Block until all the requested chars are finished, for warming up and testing.
+        '''
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while self.results.qsize() < len(self.pending):
+            if deadline is not None and time.perf_counter() > deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+    def stats(self):
+        '''
+        The queue depth and the latency (ms) from request() to collect() of the recent glyphs.
+        '''
+        latencies = np.array(self.latencies) * 1000
+        return {
+            'queue_depth': len(self.pending),
+            'ready': self.results.qsize(),
+            'rasterized': self.rasterized,
+            'latency_ms_mean': float(latencies.mean()) if len(latencies) else 0.0,
+            'latency_ms_p95': float(np.percentile(latencies, 95)) if len(latencies) else 0.0,
+            'latency_ms_max': float(latencies.max()) if len(latencies) else 0.0,
+        }
+
+    def close(self):
+        '''Stop the worker after the queued requests, their glyphs are never collected.'''
+        self.requests.put(None)
+        self.thread.join()
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
@@ -0,0 +1,148 @@
+"""
+File: glyph_sdf.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    Signed distance field (SDF) glyphs.
+    The glyph is rendered large, its distance field is computed and shrunk into a small texture,
+    the SDF variant of the shader/font/text.frag draws the sharp edge from it at any scale.
+
+    The SDF texel is 0.5 on the edge of the glyph, larger inside and smaller outside,
+    it reaches 0 (or 1) at the spread texels away from the edge.
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+from .easy_import import *
+from .glyph_bitmap import bitmap_to_array
+
+import freetype
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+def squared_distance(feature, radius):
+    '''
+    The squared distance of every pixel to its nearest feature pixel.
+    The distance is exact within the radius, the farther ones are larger than radius**2.
+
+    The separable brute-force search, first along the columns and then along the rows,
+    every pass looks radius pixels both sides.
+
+    :param feature np.array: the (h, w) bool array.
+    :param radius int: the search radius in pixels.
+
+    :return distance np.array: the (h, w) float32 squared distance.
+    '''
+    far = np.float32((radius + 1) ** 2)
+    h, w = feature.shape
+    f = np.where(feature, np.float32(0), far)
+
+    # 沿列方向，到同一列中最近特征点的距离平方
+    padded = np.pad(f, ((radius, radius), (0, 0)), constant_values=far)
+    g = f.copy()
+    for d in range(1, radius + 1):
+        np.minimum(g, padded[radius-d:radius-d+h] + d * d, out=g)
+        np.minimum(g, padded[radius+d:radius+d+h] + d * d, out=g)
+
+    # 沿行方向，合并各列的结果
+    padded = np.pad(g, ((0, 0), (radius, radius)), constant_values=far)
+    distance = g.copy()
+    for d in range(1, radius + 1):
+        np.minimum(distance, padded[:, radius-d:radius-d+w] + d * d, out=distance)
+        np.minimum(distance, padded[:, radius+d:radius+d+w] + d * d, out=distance)
+
+    return distance
+
+
+def signed_distance(inside, radius):
+    '''
+    The signed distance to the edge of the shape, in pixels, positive inside.
+    The edge is between the inside and outside pixels, so the distance is +-0.5 next to it.
+
+    :param inside np.array: the (h, w) bool array of the shape.
+    :param radius int: the largest distance of interest.
+
+    :return distance np.array: the (h, w) float32 signed distance.
+    '''
+    to_inside = np.sqrt(squared_distance(inside, radius))
+    to_outside = np.sqrt(squared_distance(~inside, radius))
+    return np.where(inside, to_outside - 0.5, 0.5 - to_inside)
+
+
+def rasterize_sdf_glyph(faces, char, copy=False, spread=4, upscale=4):
+    '''
+    Render the char like rasterize_glyph(), but into the SDF.
+
+    The face renders at upscale times of the SDF size,
+    the metrics are in the pixels of the face (the large ones),
+    and the SDF texel covers upscale x upscale of them.
+
+    :param copy bool: not used, the SDF is always a new array.
+    :param spread int: the SDF texels around the glyph, the distance reaching 0 or 1.
+    :param upscale int: the pixels of the face in every SDF texel.
+
+    :return glyph dict: the data (rows, width) of the SDF with the spread around the glyph,
+                        the bearing of the NW corner of the SDF, and the advance.
+    '''
+    face = faces.face(char)
+    face.load_char(char, freetype.FT_LOAD_RENDER)
+    glyph = face.glyph
+    coverage = bitmap_to_array(glyph.bitmap)
+    rows, width = coverage.shape
+    left, top = glyph.bitmap_left, glyph.bitmap_top
+    advance = glyph.advance.x >> 6
+
+    if rows == 0 or width == 0:
+        return {
+            'data': np.zeros((0, 0), dtype=np.ubyte),
+            'bearing': (left, top),
+            'advance': advance,
+        }
+
+    # 画布按 upscale 对齐，SDF 纹素的边界落在整像素上
+    pad = spread * upscale
+    x0 = (left - pad) // upscale * upscale
+    y0 = -((-(top + pad)) // upscale) * upscale
+    off_x, off_y = left - x0, y0 - top
+    w = -((-(off_x + width + pad)) // upscale) * upscale
+    h = -((-(off_y + rows + pad)) // upscale) * upscale
+
+    inside = np.zeros((h, w), dtype=bool)
+    inside[off_y:off_y+rows, off_x:off_x+width] = coverage >= 128
+
+    # 大尺寸下计算距离场，再按 upscale x upscale 平均缩小
+    distance = signed_distance(inside, pad + upscale)
+    distance = distance.reshape(
+        h // upscale, upscale, w // upscale, upscale).mean(axis=(1, 3))
+    distance /= upscale
+
+    sdf = np.clip(0.5 + distance / (2 * spread), 0.0, 1.0)
+    return {
+        'data': (sdf * 255).round().astype(np.ubyte),
+        'bearing': (x0, y0),
+        'advance': advance,
+    }
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
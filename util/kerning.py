@@ -0,0 +1,180 @@
+"""
+File: kerning.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    The kerning of the glyph pairs.
+    The 'kern' table of every font is read once into a dense matrix of the kerned glyphs,
+    and the pairs of a string are found by one fancy indexing, without FreeType.
+
+    Only the format 0 (the pair list) of the 'kern' table is read,
+    the GPOS kerning is not supported.
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+from .easy_import import *
+
+import ctypes
+import freetype
+
+KERN_TAG = int.from_bytes(b'kern', 'big')
+
+# The pair of the format 0 subtable
+PAIR_DTYPE = np.dtype([('left', '>u2'), ('right', '>u2'), ('value', '>i2')])
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+def load_sfnt_table(face, tag):
+    '''
+    :return table bytes: the raw table of the font, or None if it does not have the table.
+    '''
+    length = freetype.FT_ULong(0)
+    err = freetype.raw.FT_Load_Sfnt_Table(
+        face._FT_Face, tag, 0, None, ctypes.byref(length))
+    if err or length.value == 0:
+        return None
+    buffer = (ctypes.c_ubyte * length.value)()
+    err = freetype.raw.FT_Load_Sfnt_Table(
+        face._FT_Face, tag, 0, buffer, ctypes.byref(length))
+    if err:
+        return None
+    return bytes(buffer)
+
+
+def read_kern_table(face):
+    '''
+    Read the horizontal pairs of the 'kern' table,
+    both the OpenType (version 0) and the Apple (version 1) header.
+
+    :return keys np.array: the sorted uint32 keys of the pairs, left << 16 | right, by the glyph indices.
+    :return values np.array: the float32 kerning in the font units.
+    '''
+    keys = np.zeros(0, dtype=np.uint32)
+    values = np.zeros(0, dtype=np.float32)
+    table = load_sfnt_table(face, KERN_TAG)
+    if table is None or len(table) < 4:
+        return keys, values
+
+    # 子表头：格式、是否水平方向，以及第一个字节对的位置
+    version = int.from_bytes(table[:2], 'big')
+    if version == 0:
+        count, offset, header = int.from_bytes(table[2:4], 'big'), 4, 6
+    else:
+        count, offset, header = int.from_bytes(table[4:8], 'big'), 8, 8
+
+    pairs = []
+    for _ in range(count):
+        if offset + header + 8 > len(table):
+            break
+        if version == 0:
+            length = int.from_bytes(table[offset+2:offset+4], 'big')
+            coverage = int.from_bytes(table[offset+4:offset+6], 'big')
+            fmt, usable = coverage >> 8, (coverage & 0x7) == 0x1
+        else:
+            length = int.from_bytes(table[offset:offset+4], 'big')
+            coverage = int.from_bytes(table[offset+4:offset+6], 'big')
+            fmt, usable = coverage & 0xFF, (coverage & 0xE000) == 0
+
+        n = int.from_bytes(table[offset+header:offset+header+2], 'big')
+        start = offset + header + 8
+        if fmt == 0 and usable:
+            n = min(n, (len(table) - start) // PAIR_DTYPE.itemsize)
+            pairs.append(np.frombuffer(
+                table, dtype=PAIR_DTYPE, count=n, offset=start))
+
+        # 16位的长度可能溢出，格式0的长度由字节对数得出
+        offset = start + n * PAIR_DTYPE.itemsize if fmt == 0 else offset + length
+
+    if not pairs:
+        return keys, values
+
+    pairs = np.concatenate(pairs)
+    keys = (pairs['left'].astype(np.uint32) << 16) | pairs['right']
+    keys, first = np.unique(keys, return_index=True)
+    return keys, pairs['value'][first].astype(np.float32)
+
+
+class Kerning:
+    '''
+    The kerning pairs of all the fonts of the chain, in the pixels of the font size.
+
+    Only the glyphs in the pairs are kerned, every one of them is a row of the dense matrix,
+    the kerning of the pair (a, b) is matrix[row(a), row(b)].
+    The last row and column are zeros, the row -1 is for the glyphs without kerning,
+    and the glyphs from different fonts are never kerned, their rows do not share the pairs.
+    '''
+
+    # The most kerned glyphs of all the fonts, the matrix is 16 MB at most
+    max_rows = 2048
+
+    def __init__(self, faces, size):
+        '''
+        :param faces ChainFaces: the faces of the fonts.
+        :param size float: the font size in pixels.
+        '''
+        fonts = []
+        self.font_rows = []  # 每个字体的 {字形序号: 行}
+        count = 0
+        for face in faces.faces:
+            keys, values = read_kern_table(face)
+            glyphs = np.unique(np.concatenate([keys >> 16, keys & 0xFFFF]))
+            if count + len(glyphs) > self.max_rows:
+                logger.warning(
+                    f'Ignore the kerning of {face.family_name}, too many kerned glyphs: {len(glyphs)}')
+                keys, values, glyphs = keys[:0], values[:0], glyphs[:0]
+            fonts.append((keys, values * (size / face.units_per_EM), glyphs, count))
+            self.font_rows.append(
+                dict(zip(glyphs.tolist(), range(count, count + len(glyphs)))))
+            count += len(glyphs)
+
+        self.pairs = 0
+        self.matrix = np.zeros((count + 1, count + 1), dtype=np.float32)
+        for keys, values, glyphs, offset in fonts:
+            left = np.searchsorted(glyphs, keys >> 16) + offset
+            right = np.searchsorted(glyphs, keys & 0xFFFF) + offset
+            self.matrix[left, right] = values
+            self.pairs += len(keys)
+
+    def __len__(self):
+        return self.pairs
+
+    def row(self, font_index, glyph_index):
+        '''
+        :return row int: the row of the glyph of the font, -1 if it is not in any pair.
+        '''
+        return self.font_rows[font_index].get(glyph_index, -1)
+
+    def lookup(self, rows):
+        '''
+        The kerning between the neighbors of the glyphs.
+
+        :param rows np.array: the rows of the glyphs of the string.
+
+        :return kerning np.array: the (n-1,) float32 kerning after every glyph but the last.
+        '''
+        return self.matrix[rows[:-1], rows[1:]]
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
@@ -0,0 +1,123 @@
+"""
+File: layout_cache.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    LRU cache of the text layouts.
+    Most of the strings are the same in every frame,
+    their vertices, paragraphs and bounding boxes are computed once and reused.
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+import sys
+from collections import OrderedDict
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+class LayoutCache:
+    '''
+    The LRU cache of the layouts.
+
+    Every entry is a dict of fields, the TextRenderer.layout_cache keeps
+    - vertices (or instances in the instanced mode): the (vertices, pages, slots) of the text,
+      with the pen on (0, 0), see TextRenderer.layout_text().
+    - the same field of the paragraph key: the paragraph dict of TextRenderer.layout_paragraph().
+
+    The TextMetrics.bbox_cache keeps the bbox field, the (width, height, height2) of the text.
+    '''
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.entry_bytes = {}
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+
+    def get(self, key, field):
+        '''
+        Get the field of the entry.
+
+        :return value: the value of the field, or None if it is not cached.
+        '''
+        entry = self.entries.get(key)
+        if entry is None or field not in entry:
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[field]
+
+    def put(self, key, field, value):
+        '''
+        Put the field of the entry, evict the least recently used entries if it is full.
+        '''
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = {}
+        self.entries.move_to_end(key)
+        entry[field] = value
+
+        self.bytes -= self.entry_bytes.get(key, 0)
+        self.entry_bytes[key] = self._sizeof(key, entry)
+        self.bytes += self.entry_bytes[key]
+
+        while len(self.entries) > self.max_entries:
+            old_key, _ = self.entries.popitem(last=False)
+            self.bytes -= self.entry_bytes.pop(old_key)
+            self.evictions += 1
+
+    def clear(self):
+        '''Drop all the entries, e.g. the glyphs are moved in the atlas.'''
+        self.entries.clear()
+        self.entry_bytes.clear()
+        self.bytes = 0
+
+    @staticmethod
+    def _sizeof(key, entry):
+        size = sys.getsizeof(key[0])
+        for value in entry.values():
+            if isinstance(value, tuple):
+                size += sum(getattr(e, 'nbytes', 8) for e in value)
+            elif isinstance(value, dict):
+                size += sum(getattr(e, 'nbytes', 8) for e in value.values())
+        return size
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+        }
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
@@ -0,0 +1,124 @@
+"""
+File: paragraph.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    The line breaking of the paragraphs.
+
+    The line is broken at the spaces, and between the CJK chars,
+    but not before the closing punctuations (like '，。）') or after the opening ones (like '（「'),
+    the word longer than the line is broken anywhere.
+    The '\\n' always starts a new line.
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+from .easy_import import *
+
+from .text_layout import text_to_codepoints
+
+# The CJK blocks, the line can be broken before and after their chars
+CJK_RANGES = [
+    (0x2E80, 0xA000),  # radicals, punctuations, kana, ideographs
+    (0xAC00, 0xD7B0),  # hangul syllables
+    (0xF900, 0xFB00),  # compatibility ideographs
+    (0xFE30, 0xFE50),  # compatibility forms
+    (0xFF00, 0xFFF0),  # fullwidth forms
+    (0x20000, 0x30000),  # ideographs extension B ...
+]
+
+SPACES = ' \t　'
+
+# The chars not at the start of the line, and the ones not at the end of the line
+NO_LINE_START = ',.;:!?)]}%\'"、。，．；：！？）］｝〕〉》」』】〗〙〛”’…‥ーぁぃぅぇぉっゃゅょゎァィゥェォッャュョヮヵヶ'
+NO_LINE_END = '([{（［｛〔〈《「『【〖〘〚“‘'
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+def _chars_mask(codepoints, chars):
+    return np.isin(codepoints, text_to_codepoints(chars))
+
+
+def break_opportunities(text):
+    '''
+    Where the line can be broken.
+
+    :return can_break np.array: the bool array, can_break[i] means the line can start at the char i.
+    '''
+    codepoints = text_to_codepoints(text)
+    cjk = np.zeros(len(codepoints), dtype=bool)
+    for start, stop in CJK_RANGES:
+        cjk |= (codepoints >= start) & (codepoints < stop)
+    space = _chars_mask(codepoints, SPACES)
+
+    can_break = np.zeros(len(codepoints), dtype=bool)
+    # 空格前后、中日韩字符前后都可以断行
+    can_break[1:] = space[:-1] | space[1:] | cjk[:-1] | cjk[1:]
+    can_break[1:] &= ~_chars_mask(codepoints[1:], NO_LINE_START)
+    can_break[1:] &= ~_chars_mask(codepoints[:-1], NO_LINE_END)
+    # 空格总是可以挂在行尾
+    can_break[1:] |= space[1:]
+    return can_break
+
+
+def break_lines(text, advances, max_width=None):
+    '''
+    Break the text of one line (without '\\n') into the lines not wider than max_width.
+    The spaces at the break are dropped.
+
+    :param advances np.array: the advance of every char.
+    :param max_width float: the width of the lines, None for not wrapping.
+
+    :return lines list: the (start, stop) of the lines in the text.
+    '''
+    n = len(text)
+    pen = np.concatenate([[0.0], np.cumsum(advances, dtype=np.float64)])
+    if max_width is None or pen[-1] <= max_width:
+        return [(0, len(text.rstrip(SPACES)))]
+
+    breaks = np.flatnonzero(break_opportunities(text))
+    lines = []
+    start = 0
+    while start < n:
+        # 从 start 开始最多能放下的字符，至少一个
+        end = int(np.searchsorted(pen, pen[start] + max_width, 'right')) - 1
+        end = max(end, start + 1)
+        if end >= n:
+            stop = n
+        else:
+            i = int(np.searchsorted(breaks, end, 'right')) - 1
+            stop = int(breaks[i]) if i >= 0 and breaks[i] > start else end
+
+        line_stop = stop
+        while line_stop > start and text[line_stop - 1] in SPACES:
+            line_stop -= 1
+        lines.append((start, line_stop))
+
+        start = stop
+        while start < n and text[start] in SPACES:
+            start += 1
+    return lines or [(0, 0)]
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
@@ -0,0 +1,130 @@
+"""
+File: stream_buffer.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    Streaming vertex buffer.
+    The vertices of every frame are written into the buffer like a ring,
+    so the CPU never waits for the GPU to finish reading the previous draws.
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+from .easy_import import *
+from .gl_state import gl_state
+
+import ctypes
+from OpenGL.GL import *
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+class StreamingBuffer:
+    '''
+    The growable streaming GL_ARRAY_BUFFER.
+
+    - The writes go to increasing offsets of the buffer (ring buffer),
+      the range is mapped unsynchronized, since nobody is reading it.
+    - When the ring is full, the buffer is orphaned by glBufferData(None),
+      the driver gives a fresh storage and the old one lives until the GPU is done with it.
+    - When one write is larger than the buffer, the capacity is doubled until it fits.
+
+    The buffer name never changes, so the VAO attribute pointers stay valid.
+    '''
+
+    def __init__(self, stride, capacity=1 << 18):
+        '''
+        :param stride int: the bytes of one vertex, the writes are aligned to it.
+        :param capacity int: the initial bytes of the buffer.
+        '''
+        self.stride = stride
+        self.capacity = capacity - capacity % stride
+        self.offset = 0
+
+        # Statistics
+        self.high_water_mark = 0  # the largest write in bytes
+        self.orphans = 0  # how many times the ring wraps
+        self.grows = 0  # how many times the capacity grows
+
+        self.vbo = glGenBuffers(1)
+        gl_state.bind_buffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(GL_ARRAY_BUFFER, self.capacity, None, GL_STREAM_DRAW)
+
+    def write(self, array):
+        '''
+        Write the vertices into the buffer.
+        The buffer is left bound to GL_ARRAY_BUFFER.
+
+        :param array np.array: the vertices, its nbytes is multiple of the stride.
+
+        :return first int: the index of the first vertex, for glDrawArrays.
+        '''
+        array = np.ascontiguousarray(array)
+        nbytes = array.nbytes
+        self.high_water_mark = max(self.high_water_mark, nbytes)
+
+        gl_state.bind_buffer(GL_ARRAY_BUFFER, self.vbo)
+
+        if nbytes > self.capacity:
+            # 扩容，按2倍增长
+            capacity = self.capacity
+            while capacity < nbytes:
+                capacity *= 2
+            self.capacity = capacity - capacity % self.stride
+            glBufferData(GL_ARRAY_BUFFER, self.capacity, None, GL_STREAM_DRAW)
+            self.offset = 0
+            self.grows += 1
+            logger.debug(f'Streaming buffer grows to {self.capacity} bytes')
+
+        elif self.offset + nbytes > self.capacity:
+            # 孤立旧存储，从头开始写
+            glBufferData(GL_ARRAY_BUFFER, self.capacity, None, GL_STREAM_DRAW)
+            self.offset = 0
+            self.orphans += 1
+
+        if nbytes == 0:
+            return self.offset // self.stride
+
+        pointer = glMapBufferRange(
+            GL_ARRAY_BUFFER, self.offset, nbytes,
+            GL_MAP_WRITE_BIT | GL_MAP_INVALIDATE_RANGE_BIT | GL_MAP_UNSYNCHRONIZED_BIT)
+        ctypes.memmove(pointer, array.ctypes.data, nbytes)
+        glUnmapBuffer(GL_ARRAY_BUFFER)
+
+        first = self.offset // self.stride
+        self.offset += nbytes
+        return first
+
+    def stats(self):
+        return {
+            'capacity': self.capacity,
+            'high_water_mark': self.high_water_mark,
+            'orphans': self.orphans,
+            'grows': self.grows,
+        }
+
+    def release(self):
+        gl_state.delete_buffers([self.vbo])
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
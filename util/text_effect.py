@@ -0,0 +1,83 @@
+"""
+File: text_effect.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    The effects drawn under the text, chosen for every draw.
+    Every kind of the effects is a variant of the shader/font/text.frag,
+    compiled when it is used first, the plain text takes only one texture sample.
+
+    The offset and the width are in the screen pixels,
+    the shader converts them into the texture coordinates by the derivatives,
+    so they are the same for the glyphs of any size and scale.
+    The effect is drawn inside the quad of the glyph,
+    it is larger than the glyph by the padding of the atlas (or the spread of the SDF glyph),
+    the wider effect is clipped, set GlyphAtlas.padding larger for it.
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+from typing import NamedTuple
+
+# The kinds and their macros in the shader
+EFFECT_DEFINES = {
+    'plain': [],
+    'shadow': ['EFFECT_SHADOW'],
+    'outline': ['EFFECT_OUTLINE'],
+    'glow': ['EFFECT_GLOW'],
+}
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+class TextEffect(NamedTuple):
+    '''
+    The effect under the text.
+    - kind: 'plain', 'shadow', 'outline' or 'glow'.
+    - offset: the (x, y) pixels of the shadow, x to the right and y to the top.
+    - width: the pixels of the outline and the glow.
+    - color: the RGBA of the effect, None for the inverse of the text color.
+    '''
+    kind: str = 'shadow'
+    offset: tuple = (2.0, -2.0)
+    width: float = 1.0
+    color: tuple = None
+
+    def uniforms(self):
+        '''
+        :return uniforms list: the (name, kind, value) of the uniforms, see GLState.set_uniform().
+        '''
+        color = (1.0, 1.0, 1.0, 1.0) if self.color is None else tuple(self.color)
+        return [
+            ('effectOffset', '2f', tuple(self.offset)),
+            ('effectWidth', '1f', float(self.width)),
+            ('effectColor', '4f', color),
+            ('effectInverse', '1i', int(self.color is None)),
+        ]
+
+
+PLAIN = TextEffect('plain')
+SHADOW = TextEffect('shadow')
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
@@ -0,0 +1,707 @@
+"""
+File: text_label.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    The retained text labels.
+    Every label owns a slice of the persistent vertex buffer,
+    it is laid out and uploaded only when it changes,
+    the unchanged labels are drawn from the buffer without any layout or upload.
+
+    The TextTemplate is the label of the format string, like 'FPS: {:6.2f}',
+    its fields are the fixed width runs of cells,
+    the new values only rewrite the cells of the changed chars.
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+from .easy_import import *
+from .gl_state import gl_state
+from .text_layout import layout_quads, layout_instances, pen_advances
+
+import re
+import string
+from OpenGL.GL import *
+
+# The chars of the fields laid out at the start, the others are added when they appear.
+# The digits are the first 10 of them, the cells are as wide as the widest digit
+FIELD_CHARS = '0123456789 +-.,:%'
+
+# The width in the format spec, [[fill]align][sign][z][#][0][width]
+_SPEC_WIDTH = re.compile(r'^(?:.?[<>=^])?[+\- ]?z?#?0?(\d+)')
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+class TextLabel:
+    '''
+    The retained text, created by LabelBuffer.create() or GLFWWindow.create_label().
+    Setting any of the fields marks it dirty, the next LabelBuffer.draw() lays it out and uploads it again.
+    The visible and the effect only change how the labels are drawn.
+    '''
+    fields = ('text', 'x', 'y', 'scale', 'color', 'anchor',
+              'max_width', 'align', 'line_spacing')
+
+    def __init__(self, buffer, text, x, y, scale=1.0, color=(1.0, 1.0, 1.0), anchor=None,
+                 max_width=None, align='left', line_spacing=1.0, effect=None):
+        self._buffer = buffer
+        self._visible = True
+        self._effect = effect
+        self._text = text
+        self._x = x
+        self._y = y
+        self._scale = scale
+        self._color = color
+        self._anchor = anchor
+        self._max_width = max_width
+        self._align = align
+        self._line_spacing = line_spacing
+
+        # 在缓冲区中的位置，按字符计
+        self.start = 0
+        self.capacity = 0
+        self.count = 0
+        self.runs = []
+        self.slots = np.zeros(0, dtype=np.int32)
+        self.width = 0.0
+        self.height = 0.0
+        # 放置的位置和颜色，只改写部分字符时使用
+        self.origin = (0.0, 0.0)
+        self.rgba = color
+
+    def _set(self, name, value):
+        old = getattr(self, '_' + name)
+        same = old is value
+        if not same:
+            try:
+                same = bool(old == value)
+            except ValueError:
+                same = False
+        if not same:
+            setattr(self, '_' + name, value)
+            self._buffer.mark_dirty(self)
+
+    @property
+    def visible(self):
+        return self._visible
+
+    @visible.setter
+    def visible(self, value):
+        if value != self._visible:
+            self._visible = value
+            self._buffer.lists_dirty = True
+
+    @property
+    def effect(self):
+        '''The TextEffect under the label, None for the default effect of the renderer.'''
+        return self._effect
+
+    @effect.setter
+    def effect(self, value):
+        if value != self._effect:
+            self._effect = value
+            self._buffer.lists_dirty = True
+
+    def update(self, **kwargs):
+        '''Set several fields at once, like label.update(text='Hi', x=0.5).'''
+        for name, value in kwargs.items():
+            setattr(self, name, value)
+
+    def remove(self):
+        '''Remove the label, its slice of the buffer is reused.'''
+        self._buffer.remove(self)
+
+    def layout(self, renderer):
+        '''
+        :return paragraph dict: the layout of the label, like TextRenderer.layout_paragraph().
+        '''
+        return renderer.layout_paragraph(
+            self.text, self.scale, self.max_width, self.align, self.line_spacing)
+
+
+def _field_property(name):
+    return property(lambda self: getattr(self, '_' + name),
+                    lambda self, value: self._set(name, value))
+
+
+for _name in TextLabel.fields:
+    setattr(TextLabel, _name, _field_property(_name))
+
+
+def _shift_x(records, dx):
+    '''Move the chars along x, dx is one value for every char.'''
+    if records.dtype.names:
+        records['pos'][:, 0] += dx
+    else:
+        records[:, :, 0] += np.asarray(dx, dtype=np.float32)[:, np.newaxis]
+
+
+class TextTemplate(TextLabel):
+    '''
+    The label of the format string, like 'FPS: {:6.2f}' or '{x:5.0f}, {y:5.0f}',
+    created by LabelBuffer.create_template() or GLFWWindow.create_template().
+
+    The literal parts are laid out once.
+    Every field is a run of cells, as wide as the widest digit,
+    so the values never move the other chars,
+    and set() only rewrites the cells of the changed chars.
+    The width of the field is the width in its format spec, the value longer than it is shown as '#'.
+    The field without the width grows to its longest value, the template is laid out again when it grows.
+    '''
+
+    def __init__(self, buffer, template, x, y, scale=1.0, color=(1.0, 1.0, 1.0), anchor=None, values=(), effect=None):
+        super().__init__(buffer, '', x, y, scale, color, anchor, effect=effect)
+        self.template = template
+        self.fields = []  # 每个字段的 (前面的文本, 名称, 转换, 格式)
+        self.tail = ''
+        auto = 0
+        for literal, name, spec, conversion in string.Formatter().parse(template):
+            if name is None:
+                self.tail += literal
+                continue
+            if name == '':
+                name, auto = auto, auto + 1
+            elif name.isdigit():
+                name = int(name)
+            self.fields.append((self.tail + literal, name, conversion, spec))
+            self.tail = ''
+
+        # 没有写宽度的字段，宽度随最长的值增长
+        self.widths = []
+        self.fixed = []  # 格式中写了宽度的字段
+        for _, _, _, spec in self.fields:
+            match = _SPEC_WIDTH.match(spec)
+            self.fixed.append(match is not None)
+            self.widths.append(int(match.group(1)) if match else 0)
+        self.strings = [' ' * width for width in self.widths]
+        self.charset = FIELD_CHARS
+
+        # 排版的结果，改写字符时使用
+        self.glyphs = None  # 字段字符在单元格中的顶点
+        self.glyph_pages = None
+        self.pages = None
+        self.cell = 0.0
+        self.cells = []  # 每个字段第一个单元格在标签中的序号
+        self.cell_x = None  # 每个字符的单元格位置
+
+        if isinstance(values, dict):
+            self.set(**values)
+        elif values:
+            self.set(*values)
+
+    @property
+    def text(self):
+        '''The current text of the template.'''
+        return ''.join(literal + value for (literal, *_), value
+                       in zip(self.fields, self.strings)) + self.tail
+
+    def format(self, args, kwargs):
+        strings = []
+        for i, (_, name, conversion, spec) in enumerate(self.fields):
+            value = kwargs[name] if isinstance(name, str) else args[name]
+            if conversion == 'r':
+                value = repr(value)
+            elif conversion == 's':
+                value = str(value)
+            elif conversion == 'a':
+                value = ascii(value)
+            value = format(value, spec)
+
+            if not self.fixed[i]:
+                self.widths[i] = max(self.widths[i], len(value))
+            width = self.widths[i]
+            strings.append(value.rjust(width) if len(value) <= width else '#' * width)
+        return strings
+
+    def set(self, *args, **kwargs):
+        '''
+        Set the values of the fields, like str.format().
+        Only the cells of the changed chars are written into the buffer.
+        '''
+        if not self.fields:
+            return
+        widths = list(self.widths)
+        strings = self.format(args, kwargs)
+        if strings == self.strings:
+            return
+        old, self.strings = self.strings, strings
+
+        # 新的字符需要重新排版
+        new_chars = set(''.join(strings)).difference(self.charset)
+        if new_chars:
+            self.charset += ''.join(sorted(new_chars))
+        # 字段变宽时，后面的字符都要移动，重新排版
+        if new_chars or widths != self.widths:
+            self._buffer.mark_dirty(self)
+            return
+
+        if self.glyphs is None or not self._buffer.placed(self):
+            return
+
+        cells = []
+        chars = []
+        for first, a, b in zip(self.cells, old, strings):
+            for i, (c0, c1) in enumerate(zip(a, b)):
+                if c0 != c1:
+                    cells.append(first + i)
+                    chars.append(self.charset.index(c1))
+        cells = np.array(cells, dtype=np.int64)
+        chars = np.array(chars, dtype=np.int64)
+
+        renderer = self._buffer.renderer
+        records = self.glyphs[chars]
+        renderer.translate(records, *self.origin)
+        _shift_x(records, self.cell_x[cells])
+        renderer.write_color(records, self.rgba)
+        self._buffer.patch(self, cells, records)
+
+        # 字符换到了别的图集页
+        pages = self.glyph_pages[chars]
+        if (pages != self.pages[cells]).any():
+            self.pages[cells] = pages
+            self.runs = renderer.make_runs(self.pages)
+            self._buffer.lists_dirty = True
+
+    def layout(self, renderer):
+        '''
+        Lay out the literal parts and the cells of the current values, in one line.
+
+        :return paragraph dict: the layout like TextRenderer.layout_paragraph().
+        '''
+        layout = layout_instances if renderer.instanced else layout_quads
+        table = renderer.table
+        scale = self.scale
+        bucket = renderer.size_bucket(scale)
+        baseline = -renderer.descender * scale
+
+        # 字段的字符，居中在单元格中，单元格与最宽的数字等宽
+        char_slots = renderer.glyph_slots(self.charset, bucket)
+        advances = table.advance[char_slots] * scale
+        self.cell = cell = float(advances[:10].max())
+        self.glyphs = renderer.make_staging(len(self.charset))
+        self.glyph_pages = np.full(len(self.charset), -1, dtype=np.int32)
+        for i, advance in enumerate(advances):
+            count, pages = layout(
+                table, char_slots[i:i+1], (cell - advance) / 2, baseline, scale, self.glyphs[i:])
+            if count:
+                self.glyph_pages[i] = pages[0]
+        # 空白的字符随便放在哪一页
+        blank = self.glyph_pages < 0
+        self.glyph_pages[blank] = self.glyph_pages[~blank][0] if not blank.all() else 0
+
+        parts = []
+        pages = []
+        slots = [char_slots]
+        cell_x = []
+        self.cells = []
+        pen = 0.0
+        first = 0
+        for (literal, *_), value in zip(self.fields + [(self.tail,)], self.strings + [None]):
+            if literal:
+                literal_slots = renderer.glyph_slots(literal, bucket)
+                out = renderer.make_staging(len(literal))
+                count, literal_pages = layout(
+                    table, literal_slots, pen, baseline, scale, out)
+                parts.append(out[:count])
+                pages.append(literal_pages)
+                slots.append(literal_slots)
+                pen += float(pen_advances(table, literal_slots).sum()) * scale
+                first += count
+            if value is None:
+                continue
+
+            chars = np.array([self.charset.index(c) for c in value], dtype=np.int64)
+            records = self.glyphs[chars]
+            xs = pen + cell * np.arange(len(value))
+            _shift_x(records, xs)
+            parts.append(records)
+            pages.append(self.glyph_pages[chars])
+            cell_x.append(xs)
+            self.cells.append(first)
+            pen += cell * len(value)
+            first += len(value)
+
+        # 每个字符的单元格位置，不是单元格的为0
+        self.pages = np.concatenate(pages) if pages else np.zeros(0, dtype=np.int32)
+        self.cell_x = np.zeros(len(self.pages), dtype=np.float32)
+        for first, xs in zip(self.cells, cell_x):
+            self.cell_x[first:first+len(xs)] = xs
+
+        vertices = np.concatenate(parts) if parts else renderer.make_staging(0)
+        return {
+            'vertices': vertices,
+            'runs': renderer.make_runs(self.pages),
+            'slots': np.concatenate(slots),
+            'width': pen,
+            'height': (renderer.ascender - renderer.descender) * scale,
+        }
+
+
+class LabelBuffer:
+    '''
+    The persistent vertex buffer of the TextLabels, owned by the TextRenderer.
+
+    The buffer has a CPU mirror, every label takes a slice of it, sized to the power of 2,
+    so the label changing its text usually stays in its slice.
+    The unused chars of the slices are zeros, the degenerated quads drawing nothing,
+    so the neighbor labels on the same atlas page are drawn as one range.
+    The draw lists are the (first, count) ranges of the visible labels for every effect and atlas page,
+    they are rebuilt only when the labels change,
+    and every page is one glMultiDrawArrays (or one instanced draw per range).
+    '''
+
+    def __init__(self, renderer, capacity=1024):
+        '''
+        :param renderer TextRenderer: the renderer for the layout and the shader.
+        :param capacity int: the initial chars of the buffer.
+        '''
+        self.renderer = renderer
+        self.capacity = capacity
+        self.labels = {}  # 按创建顺序绘制
+        self.dirty = {}
+        self.lists_dirty = False
+        self.free = [(0, capacity)]  # 空闲的 (start, size)
+        self.uploads = []  # 等待上传的 (start, count)，清零或改写的字符
+        self.data = None  # CPU mirror, like the staging of the renderer
+        self.vao = None
+        self.vbo = None
+        self.gpu_capacity = 0  # 显存中的字符数，与 capacity 不同时整体上传
+        self.draw_lists = {}
+        self.slots = np.zeros(0, dtype=np.int32)
+        self.evictions = 0
+
+        # Convert the label position into the pixels of its SW corner, like GLFWWindow.anchor_position
+        self.anchor_position = None
+        # Convert the label color into the RGBA
+        self.convert_color = None
+
+        # Statistics
+        self.layouts = 0
+        self.uploaded_bytes = 0
+
+    def create(self, text, x, y, scale=1.0, color=(1.0, 1.0, 1.0), **kwargs):
+        '''
+        Create the label, the x, y are the pixels of its SW corner without the anchor_position.
+
+        :return label TextLabel: the label.
+        '''
+        label = TextLabel(self, text, x, y, scale, color, **kwargs)
+        self.labels[label] = None
+        self.mark_dirty(label)
+        return label
+
+    def create_template(self, template, x, y, scale=1.0, color=(1.0, 1.0, 1.0), anchor=None, values=(), effect=None):
+        '''
+        Create the TextTemplate, the values (tuple or dict) are the first values of the fields.
+
+        :return template TextTemplate: the template, update it with template.set(...).
+        '''
+        label = TextTemplate(self, template, x, y, scale, color, anchor, values, effect)
+        self.labels[label] = None
+        self.mark_dirty(label)
+        return label
+
+    def remove(self, label):
+        if self.labels.pop(label, 'missing') == 'missing':
+            return
+        self.dirty.pop(label, None)
+        self._clear(label.start, label.count)
+        self._release(label.start, label.capacity)
+        label.capacity = label.count = 0
+        self.lists_dirty = True
+
+    def mark_dirty(self, label):
+        if label in self.labels:
+            self.dirty[label] = None
+
+    def __len__(self):
+        return len(self.labels)
+
+    def placed(self, label):
+        '''If the vertices of the label are in the buffer, and they are up to date.'''
+        return self.data is not None and label in self.labels and label not in self.dirty
+
+    def patch(self, label, indices, records):
+        '''
+        Rewrite some chars of the label, they are uploaded by the next draw().
+
+        :param indices np.array: the chars in the label, in the ascending order.
+        :param records np.array: the new vertices (or instance records) of them.
+        '''
+        self.data[label.start + indices] = records
+        # 连续的字符一次上传，indices 是升序的
+        first = previous = None
+        for i in indices.tolist():
+            if previous is None or i != previous + 1:
+                if first is not None:
+                    self.uploads.append((label.start + first, previous + 1 - first))
+                first = i
+            previous = i
+        if first is not None:
+            self.uploads.append((label.start + first, previous + 1 - first))
+
+    def _allocate(self, count):
+        '''
+        :return start, size int: the slice of the buffer for the count chars.
+        '''
+        size = 16
+        while size < count:
+            size *= 2
+
+        for i, (start, free_size) in enumerate(self.free):
+            if free_size >= size:
+                if free_size == size:
+                    self.free.pop(i)
+                else:
+                    self.free[i] = (start + size, free_size - size)
+                return start, size
+
+        # 扩容，按2倍增长，显存在下次上传时整体重建
+        capacity = self.capacity
+        while capacity - self.capacity + self._free_tail() < size:
+            capacity *= 2
+        self._release(self.capacity, capacity - self.capacity)
+        self.capacity = capacity
+        if self.data is not None:
+            data = self.renderer.make_staging(capacity)
+            data[:len(self.data)] = self.data
+            self.data = data
+        return self._allocate(count)
+
+    def _free_tail(self):
+        '''The free chars at the end of the buffer.'''
+        if self.free and sum(self.free[-1]) == self.capacity:
+            return self.free[-1][1]
+        return 0
+
+    def _clear(self, start, count):
+        '''Zero the chars of the released slice, they can be drawn in the merged ranges.'''
+        if self.data is not None and count > 0:
+            self.data[start:start+count] = 0
+            self.uploads.append((start, count))
+
+    def _release(self, start, size):
+        if size == 0:
+            return
+        free = sorted(self.free + [(start, size)])
+        merged = [free[0]]
+        for s, n in free[1:]:
+            last_start, last_size = merged[-1]
+            if last_start + last_size == s:
+                merged[-1] = (last_start, last_size + n)
+            else:
+                merged.append((s, n))
+        self.free = merged
+
+    def init_buffer(self):
+        '''The VAO and VBO of the labels, the attributes are the same as the renderer's.'''
+        renderer = self.renderer
+        self.vao = glGenVertexArrays(1)
+        self.vbo = glGenBuffers(1)
+        gl_state.bind_vertex_array(self.vao)
+        gl_state.bind_buffer(GL_ARRAY_BUFFER, self.vbo)
+        if renderer.instanced:
+            renderer.init_instance_attributes()
+        else:
+            renderer.init_vertex_attributes()
+
+    def update(self):
+        '''
+        Lay out and upload the dirty labels, and rebuild the draw lists if they change.
+        '''
+        renderer = self.renderer
+
+        # 字符被淘汰后图集位置可能被复用，所有标签重新排版
+        evictions = renderer.cache_counts['evictions']
+        if evictions != self.evictions:
+            self.evictions = evictions
+            self.dirty.update(dict.fromkeys(self.labels))
+
+        if not self.dirty and not self.lists_dirty and not self.uploads:
+            return
+
+        if self.data is None:
+            self.data = renderer.make_staging(self.capacity)
+        if self.vao is None:
+            self.init_buffer()
+
+        uploads = self.uploads
+        self.uploads = []
+        rebuild = self.lists_dirty or bool(self.dirty)
+        pending = {}
+        for label in self.dirty:
+            paragraph = label.layout(renderer)
+            vertices = paragraph['vertices']
+            count = len(vertices)
+            if count > label.capacity:
+                self._clear(label.start, label.count)
+                self._release(label.start, label.capacity)
+                label.start, label.capacity = self._allocate(count)
+                label.count = 0
+
+            x, y = label.x, label.y
+            if self.anchor_position is not None:
+                x, y = self.anchor_position(
+                    x, y, paragraph['width'], paragraph['height'], label.anchor)
+            color = label.color
+            if self.convert_color is not None:
+                color = self.convert_color(color)
+
+            label.origin = (x, y)
+            label.rgba = color
+
+            out = self.data[label.start:label.start+count]
+            out[:] = vertices
+            renderer.translate(out, x, y)
+            renderer.write_color(out, color)
+            # 变短时清零多余的部分
+            stop = label.start + max(count, label.count)
+            self.data[label.start+count:stop] = 0
+
+            label.count = count
+            label.runs = paragraph['runs']
+            label.slots = paragraph['slots']
+            label.width, label.height = paragraph['width'], paragraph['height']
+            uploads.append((label.start, stop - label.start))
+            self.layouts += 1
+
+            # 字形还在工作线程中光栅化，下一帧再排版
+            if renderer.has_placeholder(label.slots):
+                pending[label] = None
+
+        self.dirty = pending
+        self.upload(uploads)
+        if rebuild:
+            self.build_draw_lists()
+
+    def upload(self, ranges):
+        gl_state.bind_buffer(GL_ARRAY_BUFFER, self.vbo)
+        if self.gpu_capacity != self.capacity:
+            glBufferData(GL_ARRAY_BUFFER, self.data.nbytes,
+                         self.data, GL_DYNAMIC_DRAW)
+            self.gpu_capacity = self.capacity
+            self.uploaded_bytes += self.data.nbytes
+            return
+
+        itemsize = self.data[:1].nbytes
+        for start, count in ranges:
+            if count == 0:
+                continue
+            chunk = np.ascontiguousarray(self.data[start:start+count])
+            glBufferSubData(GL_ARRAY_BUFFER, start * itemsize,
+                            chunk.nbytes, chunk)
+            self.uploaded_bytes += chunk.nbytes
+
+    def build_draw_lists(self):
+        '''
+        The (first, count) ranges of the visible labels for every (effect, page),
+        in the vertices for glMultiDrawArrays, or in the instances.
+        The runs following each other in the buffer with the same effect and page are merged,
+        the zeros between them are drawn as nothing.
+        '''
+        vertices_per_char = 1 if self.renderer.instanced else 6
+        lists = {}
+        slots = []
+        last = None  # 可以继续合并的 ((效果, 图集页), [first, stop])
+        for label in sorted(self.labels, key=lambda e: e.start):
+            if not label.visible:
+                last = None
+                continue
+            slots.append(label.slots)
+            first = label.start
+            for page, count in label.runs:
+                key = (label.effect, page)
+                if last is not None and last[0] == key:
+                    last[1][1] = first + count
+                else:
+                    last = (key, [first, first + count])
+                    lists.setdefault(key, []).append(last[1])
+                first += count
+
+        self.draw_lists = {}
+        for key, ranges in lists.items():
+            ranges = np.array(ranges, dtype=np.int32) * vertices_per_char
+            self.draw_lists[key] = (
+                ranges[:, 0].copy(), ranges[:, 1] - ranges[:, 0])
+        self.slots = np.concatenate(slots) if slots else np.zeros(0, dtype=np.int32)
+        self.lists_dirty = False
+
+    def touch(self):
+        '''Mark the glyphs of the visible labels used in this frame, so they are not evicted.'''
+        self.renderer.table.last_used[self.slots] = self.renderer.frame
+
+    def draw(self):
+        '''
+        Draw the visible labels, the dirty ones are updated first.
+        '''
+        self.update()
+        if not self.draw_lists:
+            return
+
+        renderer = self.renderer
+        gl_state.bind_vertex_array(self.vao)
+        gl_state.bind_buffer(GL_ARRAY_BUFFER, self.vbo)
+
+        current = 'none'
+        for (effect, page), (firsts, counts) in self.draw_lists.items():
+            if effect != current:
+                current = effect
+                renderer.use_effect(effect)
+            gl_state.bind_texture(renderer.atlas.texture(page))
+            if renderer.instanced:
+                # OpenGL 3.3 没有 base instance，每个范围指向各自的记录
+                for first, count in zip(firsts.tolist(), counts.tolist()):
+                    renderer.bind_instances(first)
+                    glDrawArraysInstanced(GL_TRIANGLE_STRIP, 0, 4, count)
+            else:
+                glMultiDrawArrays(GL_TRIANGLES, firsts, counts, len(firsts))
+
+    def stats(self):
+        return {
+            'labels': len(self.labels),
+            'dirty': len(self.dirty),
+            'capacity': self.capacity,
+            'layouts': self.layouts,
+            'uploaded_bytes': self.uploaded_bytes,
+        }
+
+    def reset(self):
+        '''
+        Drop the vertices of all the labels, they are laid out again with the new font or mode.
+        '''
+        self.release()
+        self.data = None
+        self.uploads = []
+        self.dirty.update(dict.fromkeys(self.labels))
+
+    def release(self):
+        if self.vbo is not None:
+            gl_state.delete_buffers([self.vbo])
+            glDeleteVertexArrays(1, [self.vao])
+            if gl_state.vertex_array == self.vao:
+                gl_state.vertex_array = None
+            self.vbo = self.vao = None
+            self.gpu_capacity = 0
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
@@ -0,0 +1,339 @@
+"""
+File: text_layout.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    Vectorized text layout.
+    The metrics of the cached glyphs are kept in numpy arrays,
+    so a string is laid out by array operations instead of a loop over its chars.
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+from .easy_import import *
+
+# Columns of the GlyphTable.data
+ADVANCE, BEARING_X, BEARING_Y, WIDTH, HEIGHT, U0, V0, U1, V1, PAGE = range(10)
+
+# The corners of the glyph quad, layout_quads computes them for every glyph
+# x0, x1, y0, y1, u0, u1, v0, v1
+# The (x0, y0) is the SW corner on the screen, and the (u0, v0) is the top of the glyph.
+X0, X1, Y0, Y1, CU0, CU1, CV0, CV1 = range(8)
+
+# The 6 vertices (x, y, u, v) of the quad (2 triangles), see TextRenderer.layout_text
+# Every vertex is VERTEX_FLOATS float32,
+# the 5th holds the (u, v) of the opposite corner of the quad as uint16, see vertex_opposites,
+# the last one holds the RGBA bytes, see vertex_colors
+VERTEX_FLOATS = 6
+_QUAD = np.array([
+    [X0, Y1, CU0, CV0],  # c
+    [X1, Y0, CU1, CV1],  # b
+    [X0, Y0, CU0, CV1],  # a
+    [X0, Y1, CU0, CV0],  # c
+    [X1, Y1, CU1, CV0],  # d
+    [X1, Y0, CU1, CV1],  # b
+]).ravel()
+# The (u, v) of the opposite corner of every vertex, the two corners give the uv rect of the quad
+_OPPOSITE = np.array([
+    [CU1, CV1],  # c
+    [CU0, CV0],  # b
+    [CU1, CV0],  # a
+    [CU1, CV1],  # c
+    [CU0, CV1],  # d
+    [CU0, CV0],  # b
+]).ravel()
+
+# The instance record of the glyph, see layout_instances
+# - pos: the SW corner on the screen.
+# - size: the width and height on the screen.
+# - uv: the (u0, v0, u1, v1) in the atlas page, normalized to 0 ... 65535.
+# - color: the RGBA, normalized to 0 ... 255.
+INSTANCE_DTYPE = np.dtype([
+    ('pos', '<f4', 2),
+    ('size', '<f2', 2),
+    ('uv', '<u2', 4),
+    ('color', 'u1', 4),
+])
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+def vertex_colors(vertices):
+    '''
+    The RGBA bytes of the vertices.
+
+    :param vertices np.array: the (n, 6, VERTEX_FLOATS) float32 vertices.
+
+    :return colors np.array: the (n, 6, 4) uint8 view of their last float.
+    '''
+    return vertices[..., VERTEX_FLOATS-1:].view(np.uint8)
+
+
+def vertex_opposites(vertices):
+    '''
+    The (u, v) of the opposite corner of the glyph quad,
+    with the (u, v) of the vertex it is the uv rect of the quad, the effects do not sample beyond it.
+
+    :param vertices np.array: the (n, 6, VERTEX_FLOATS) float32 vertices.
+
+    :return opposites np.array: the (n, 6, 2) uint16 view of the 5th float, normalized to 0 ... 65535.
+    '''
+    return vertices[..., 4:5].view(np.uint16)
+
+
+def text_to_codepoints(text):
+    '''Convert the text into the uint32 array of its codepoints, without the python loop.'''
+    return np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+
+
+class GlyphTable:
+    '''
+    The metrics of the cached glyphs, one row for every glyph (slot).
+
+    - data: the metrics, see the columns ADVANCE, BEARING_X, ...
+    - corners: the (x0, x1, y0, y1, u0, u1, v0, v1) of the quad, at scale 1 and the pen on (0, 0).
+    - codepoints: the codepoint of the slot, -1 for the free slots, -2 for the unmapped slots.
+    - kern_rows: the row of the glyph in the Kerning, -1 if it is not kerned.
+    - last_used: the frame when the glyph is used the last time.
+    - pinned: the glyph is never evicted, like the warmed up glyphs.
+    - buckets: the size bucket of the glyph, 0 for the font size.
+    - kerning: the Kerning of the glyphs, or None.
+
+    The codepoints of the BMP are mapped to the slots by a dense array,
+    the others by a dict.
+    The glyphs of every size bucket have their own maps,
+    the same codepoint has one slot in every bucket.
+    '''
+
+    def __init__(self, capacity=256):
+        self.data = np.zeros((capacity, 10), dtype=np.float32)
+        self.corners = np.zeros((capacity, 8), dtype=np.float32)
+        self.advance = np.zeros(capacity, dtype=np.float32)
+        self.visible = np.zeros(capacity, dtype=bool)
+        self.pages = np.zeros(capacity, dtype=np.int32)
+        self.codepoints = np.full(capacity, -1, dtype=np.int64)
+        self.kern_rows = np.full(capacity, -1, dtype=np.int32)
+        self.last_used = np.zeros(capacity, dtype=np.int64)
+        self.pinned = np.zeros(capacity, dtype=bool)
+        self.buckets = np.zeros(capacity, dtype=np.int32)
+        self.kerning = None
+        self.size = 0
+        self.free_slots = []
+        self.bmp_slots = np.full(0x10000, -1, dtype=np.int32)
+        self.astral_slots = {}
+        # 其他尺寸的映射，尺寸 -> (bmp_slots, astral_slots)
+        self.bucket_maps = {0: (self.bmp_slots, self.astral_slots)}
+
+    def _maps(self, bucket):
+        '''The (bmp_slots, astral_slots) of the bucket, created when it is used first.'''
+        maps = self.bucket_maps.get(bucket)
+        if maps is None:
+            maps = self.bucket_maps[bucket] = (
+                np.full(0x10000, -1, dtype=np.int32), {})
+        return maps
+
+    def _grow(self):
+        n = len(self.data) * 2
+        for name in ['data', 'corners', 'advance', 'visible', 'pages', 'codepoints', 'kern_rows', 'last_used', 'pinned', 'buckets']:
+            old = getattr(self, name)
+            new = np.zeros((n,) + old.shape[1:], dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+        self.codepoints[self.size:] = -1
+
+    def add(self, codepoint, advance, bearing, size, uv, page, pad=0, kern_row=-1, bucket=0):
+        '''
+        Add the glyph of the codepoint.
+        The glyph with the codepoint None is not mapped by slots(), like the placeholder,
+        it is only used by its slot.
+
+        The quad is larger than the glyph by pad on every side, the uv covers the whole quad.
+        The SDF glyphs use it for the spread around the glyph.
+
+        :param kern_row int: the row of the glyph in the Kerning.
+        :param bucket int: the size bucket of the glyph, see slots().
+
+        :return slot int: the row of the glyph.
+        '''
+        if self.free_slots:
+            slot = self.free_slots.pop()
+        else:
+            if self.size == len(self.data):
+                self._grow()
+            slot = self.size
+            self.size += 1
+
+        self.data[slot] = (advance, bearing[0], bearing[1], size[0], size[1],
+                           uv[0], uv[1], uv[2], uv[3], -1 if page is None else page)
+
+        x0 = bearing[0] - pad
+        y0 = bearing[1] - size[1] - pad
+        self.corners[slot] = (x0, x0 + size[0] + 2 * pad, y0, y0 + size[1] + 2 * pad,
+                              uv[0], uv[2], uv[1], uv[3])
+        self.advance[slot] = advance
+        self.visible[slot] = size[0] > 0 and size[1] > 0
+        self.pages[slot] = -1 if page is None else page
+        self.kern_rows[slot] = kern_row
+        self.buckets[slot] = bucket
+
+        bmp_slots, astral_slots = self._maps(bucket)
+        if codepoint is None:
+            self.codepoints[slot] = -2
+        elif codepoint < 0x10000:
+            self.codepoints[slot] = codepoint
+            bmp_slots[codepoint] = slot
+        else:
+            self.codepoints[slot] = codepoint
+            astral_slots[codepoint] = slot
+        return slot
+
+    def remove(self, slot):
+        '''
+        Remove the glyph, its slot is reused by the next add().
+        '''
+        codepoint = int(self.codepoints[slot])
+        bmp_slots, astral_slots = self._maps(int(self.buckets[slot]))
+        if 0 <= codepoint < 0x10000:
+            bmp_slots[codepoint] = -1
+        elif codepoint >= 0x10000:
+            astral_slots.pop(codepoint, None)
+
+        self.codepoints[slot] = -1
+        self.kern_rows[slot] = -1
+        self.pinned[slot] = False
+        self.advance[slot] = 0
+        self.visible[slot] = False
+        self.free_slots.append(slot)
+
+    def __len__(self):
+        return self.size - len(self.free_slots)
+
+    def slots(self, codepoints, bucket=0):
+        '''
+        Find the slots of the codepoints.
+
+        :param codepoints np.array: the uint32 codepoints.
+        :param bucket int: the size bucket of the glyphs, 0 for the font size.
+
+        :return slots np.array: the int32 slots, -1 for the glyphs not in the table.
+        '''
+        bmp_slots, astral_slots = self._maps(bucket)
+        if codepoints.max(initial=0) < 0x10000:
+            return bmp_slots[codepoints]
+
+        bmp = codepoints < 0x10000
+        slots = np.full(len(codepoints), -1, dtype=np.int32)
+        slots[bmp] = bmp_slots[codepoints[bmp]]
+        for i in np.flatnonzero(~bmp):
+            slots[i] = astral_slots.get(int(codepoints[i]), -1)
+        return slots
+
+
+def pen_advances(table, slots):
+    '''
+    How far the pen moves after every glyph, at scale 1, with the kerning to the next glyph.
+
+    :return advance np.array: the float32 advances of the slots.
+    '''
+    advance = table.advance[slots]
+    if table.kerning is not None and len(slots) > 1:
+        advance[:-1] += table.kerning.lookup(table.kern_rows[slots])
+    return advance
+
+
+def layout_corners(table, slots, x, y, scale):
+    '''
+    Lay out the glyphs, the glyphs without pixels (like space) only move the pen.
+
+    :return corners np.array: the (count, 8) corners of the glyphs with pixels.
+    :return pages np.array: the atlas page of every glyph with pixels.
+    '''
+    # 画笔位置，不含当前字符的前缀和
+    advance = pen_advances(table, slots)
+    pen = np.cumsum(advance)
+    pen -= advance
+
+    # 跳过完全透明的字符（如空格）
+    visible = table.visible[slots]
+    if not visible.all():
+        slots = slots[visible]
+        pen = pen[visible]
+
+    corners = table.corners[slots]
+    corners[:, :4] *= scale
+    pen *= scale
+    pen += x
+    corners[:, :2] += pen[:, np.newaxis]
+    corners[:, 2:4] += y
+
+    return corners, table.pages[slots]
+
+
+def layout_quads(table, slots, x, y, scale, out):
+    '''
+    Lay out the glyphs and write their quads into out.
+    The glyphs without pixels (like space) only move the pen.
+
+    :param table GlyphTable: the glyphs.
+    :param slots np.array: the slots of the glyphs in the string.
+    :param x, y float: the pen position of the first glyph.
+    :param scale float: the scale factor.
+    :param out np.array: the (n, 6, VERTEX_FLOATS) float32 staging array, n >= len(slots).
+                         The colors of the vertices are not written.
+
+    :return count int: the number of quads written into out[:count].
+    :return pages np.array: the atlas page of every quad.
+    '''
+    corners, pages = layout_corners(table, slots, x, y, scale)
+    count = len(corners)
+
+    # 一次写入所有字符的6个顶点
+    out[:count, :, :4] = np.take(corners, _QUAD, axis=1).reshape(count, 6, 4)
+    vertex_opposites(out[:count])[:] = np.round(
+        np.take(corners, _OPPOSITE, axis=1).reshape(count, 6, 2) * 65535)
+
+    return count, pages
+
+
+def layout_instances(table, slots, x, y, scale, out):
+    '''
+    Lay out the glyphs and write their instance records into out, like layout_quads.
+    The color of the records is not written.
+
+    :param out np.array: the (n,) INSTANCE_DTYPE staging array, n >= len(slots).
+
+    :return count int: the number of records written into out[:count].
+    :return pages np.array: the atlas page of every record.
+    '''
+    corners, pages = layout_corners(table, slots, x, y, scale)
+    count = len(corners)
+
+    out = out[:count]
+    out['pos'] = corners[:, [X0, Y0]]
+    out['size'] = corners[:, [X1, Y1]] - corners[:, [X0, Y0]]
+    out['uv'] = np.round(corners[:, [CU0, CV0, CU1, CV1]] * 65535)
+
+    return count, pages
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
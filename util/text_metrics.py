@@ -0,0 +1,150 @@
+"""
+File: text_metrics.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    Measure the text with the glyph metrics only.
+    The glyphs are loaded by FreeType without rendering them,
+    so measuring never rasterizes a glyph, never touches the atlas, and never needs the GL context.
+    The metrics are kept in a GlyphTable of their own, about 100 bytes for every glyph.
+
+    It has its own faces and a lock, so the text can be measured on any thread,
+    or before the window is created.
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+from .easy_import import *
+from .text_layout import GlyphTable, pen_advances, text_to_codepoints
+from .text_layout import HEIGHT
+from .layout_cache import LayoutCache
+
+import threading
+import freetype
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+class TextMetrics:
+    '''
+    The metrics of the glyphs of the FontChain at one size.
+
+    The face is opened at the raster size of the renderer,
+    and the metrics are converted into the pixels of the font size,
+    so the advances are the same as the rasterized glyphs (and the SDF glyphs) have.
+    The height of the hinted outline is the rows of its bitmap.
+    '''
+
+    def __init__(self, chain, raster_size, size, kerning=None, max_entries=512):
+        '''
+        :param chain FontChain: the fonts.
+        :param raster_size int: the size the glyphs are rasterized at.
+        :param size int: the font size, the metrics are in its pixels.
+        :param kerning Kerning: the kerning of the fonts, None for not kerning.
+        :param max_entries int: the bounding boxes of the strings kept in the cache.
+        '''
+        self.chain = chain
+        self.faces = chain.open(raster_size)
+        self.ratio = size / raster_size
+        self.table = GlyphTable()
+        self.table.kerning = kerning
+        self.bbox_cache = LayoutCache(max_entries)
+        self.lock = threading.Lock()
+
+    def load_char(self, char):
+        '''
+        Load the metrics of the char without rendering it.
+
+        :return slot int: the row of the char in the table.
+        '''
+        face = self.faces.face(char)
+        face.load_char(char, freetype.FT_LOAD_DEFAULT)
+        metrics = face.glyph.metrics
+        ratio = self.ratio
+        advance = (face.glyph.advance.x >> 6) * ratio
+        bearing = (metrics.horiBearingX / 64 * ratio,
+                   metrics.horiBearingY / 64 * ratio)
+        size = (metrics.width / 64 * ratio, metrics.height / 64 * ratio)
+        return self.table.add(ord(char), advance, bearing, size, (0.0, 0.0, 0.0, 0.0), None,
+                              kern_row=self.kern_row(char, face))
+
+    def kern_row(self, char, face):
+        '''The row of the char in the Kerning, -1 if the kerning is off.'''
+        kerning = self.table.kerning
+        if kerning is None:
+            return -1
+        return kerning.row(self.chain.resolve(ord(char)), face.get_char_index(char))
+
+    def glyph_slots(self, text):
+        '''
+        :return slots np.array: the slots of the chars of the text, the missing ones are loaded.
+        '''
+        codepoints = text_to_codepoints(text)
+        slots = self.table.slots(codepoints)
+        if (slots < 0).any():
+            for codepoint in np.unique(codepoints[slots < 0]):
+                self.load_char(chr(codepoint))
+            slots = self.table.slots(codepoints)
+        return slots
+
+    def advance(self, char):
+        '''
+        :return advance float: how far the pen moves after the char in pixels, without the kerning.
+        '''
+        with self.lock:
+            return float(self.table.advance[self.glyph_slots(char)[0]])
+
+    def bounding_box(self, text, scale=1.0):
+        '''
+        The bounding box of the text, see TextRenderer.bounding_box().
+
+        :return width, height, height2 float: the size of the text in pixels.
+        '''
+        if not text:
+            return 0, 0, 0
+
+        with self.lock:
+            key = (text, scale)
+            bbox = self.bbox_cache.get(key, 'bbox')
+            if bbox is not None:
+                return bbox
+
+            slots = self.glyph_slots(text)
+            width = float(pen_advances(self.table, slots).sum()) * scale
+            height = float(self.table.data[slots, HEIGHT].max()) * scale
+            bbox = (width, height, height)
+            self.bbox_cache.put(key, 'bbox', bbox)
+            return bbox
+
+    def stats(self):
+        '''
+        :return stats dict: the glyphs measured, and the cache of the bounding boxes.
+        '''
+        return {
+            'glyphs': len(self.table),
+            'bbox_cache': self.bbox_cache.stats(),
+        }
+
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
@@ -19,28 +19,58 @@ Functions:
 # %% ---- 2025-10-09 ------------------------
 # Requirements and constants
 from .easy_import import *
-
+from .glyph_atlas import GlyphAtlas
+from .glyph_bitmap import bitmap_to_array
+from .glyph_rasterizer import GlyphRasterizer, rasterize_glyph
+from .glyph_sdf import rasterize_sdf_glyph
+from .glyph_disk_cache import GlyphDiskCache
+from .font_fallback import FontChain
+from .kerning import Kerning
+from .charset import charset_chars
+from .paragraph import break_lines
+from .stream_buffer import StreamingBuffer
+from .text_layout import GlyphTable, layout_quads, layout_instances, pen_advances, text_to_codepoints, vertex_colors
+from .text_layout import INSTANCE_DTYPE, VERTEX_FLOATS
+from .layout_cache import LayoutCache
+from .text_metrics import TextMetrics
+from .text_effect import TextEffect, EFFECT_DEFINES
+from .text_label import LabelBuffer
+from .gl_state import gl_state
+
+import time
 import freetype
+from functools import partial
 from OpenGL.GL import *
 from OpenGL.GL.shaders import compileProgram, compileShader
 from OpenGL.GL.shaders import ShaderCompilationError
-from collections import OrderedDict
+from collections import OrderedDict, Counter
 
 # %%
 # 顶点着色器
 vertex_shader_source = open(
-    './shader/font/shadow.vert', encoding='utf-8').read()
-# 片段着色器
+    './shader/font/text.vert', encoding='utf-8').read()
+# 顶点着色器（实例化绘制）
+instanced_vertex_shader_source = open(
+    './shader/font/instanced.vert', encoding='utf-8').read()
+# 片段着色器，位图或距离场字形，以及文字下面的效果，由宏选择
 fragment_shader_source = open(
-    './shader/font/shadow.frag', encoding='utf-8').read()
+    './shader/font/text.frag', encoding='utf-8').read()
 
 # %% ---- 2025-10-09 ------------------------
 # Function and class
 
 
 class TextShader:
+    # Draw the glyphs from their signed distance fields
+    sdf = False
+    # Draw one instance for every glyph, instead of 6 vertices
+    instanced = False
+    # The effect of the texts drawn without choosing one
+    effect = TextEffect()
+
     def __init__(self):
-        pass
+        # 每种效果的着色器程序，第一次使用时编译
+        self.programs = {}
 
     def init_shader(self, width, height):
         self.width = width
@@ -55,39 +85,126 @@ class TextShader:
         ], dtype=np.float32)
 
         # Compile shaders
+        self.programs = {}
+        self.shader_program = self.use_effect(self.effect)
+
+        if self.instanced:
+            self.init_instanced_buffer()
+            return
+
+        # 生成 VAO、流式 VBO（每个顶点 VERTEX_FLOATS 个float）
+        self.vao = glGenVertexArrays(1)
+        self.stream = StreamingBuffer(VERTEX_FLOATS * sizeof(GLfloat))
+        self.vbo = self.stream.vbo
+
+        gl_state.bind_vertex_array(self.vao)
+        gl_state.bind_buffer(GL_ARRAY_BUFFER, self.vbo)
+        self.init_vertex_attributes()
+
+    def effect_program(self, kind):
+        '''
+        The shader program of the kind of the effects, compiled when it is used first.
+        The variant is chosen by the macros inserted after the #version line of the text.frag.
+        '''
+        program = self.programs.get(kind)
+        if program is not None:
+            return program
+
+        defines = list(EFFECT_DEFINES[kind])
+        if self.sdf:
+            defines.append('SDF')
+        version, body = fragment_shader_source.split('\n', 1)
+        source = '\n'.join([version, *[f'#define {e}' for e in defines], body])
         try:
             vertex_shader = compileShader(
-                vertex_shader_source, GL_VERTEX_SHADER)
-            fragment_shader = compileShader(
-                fragment_shader_source, GL_FRAGMENT_SHADER)
-            self.shader_program = compileProgram(
-                vertex_shader, fragment_shader)
+                instanced_vertex_shader_source if self.instanced else vertex_shader_source, GL_VERTEX_SHADER)
+            fragment_shader = compileShader(source, GL_FRAGMENT_SHADER)
+            program = compileProgram(vertex_shader, fragment_shader)
         except ShaderCompilationError as err:
             raise err
-
-        # 生成 VAO、VBO
-        self.vao = glGenVertexArrays(1)
-        self.vbo = glGenBuffers(1)
-
-        glBindVertexArray(self.vao)
-        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
-
-        # 预分配缓冲区大小（6个顶点 * 4个float * 100个字符）
-        glBufferData(GL_ARRAY_BUFFER, 6 * 4 * 100 *
-                     sizeof(GLfloat), None, GL_DYNAMIC_DRAW)
+        logger.debug(f'Compiled the text shader: {kind}, {defines}')
+        self.programs[kind] = program
+        return program
+
+    def use_effect(self, effect):
+        '''
+        Use the program of the effect, and upload its uniforms and the projection.
+
+        :param effect TextEffect: the effect, None for the default effect.
+
+        :return program int: the program in use.
+        '''
+        effect = self.effect if effect is None else effect
+        program = self.effect_program(effect.kind)
+        gl_state.use_program(program)
+        gl_state.set_uniform(program, 'projection', 'mat4', self.projection)
+        for name, kind, value in effect.uniforms():
+            gl_state.set_uniform(program, name, kind, value)
+        return program
+
+    def init_vertex_attributes(self):
+        '''
+        Set the vertex attributes of the bound VAO to the bound GL_ARRAY_BUFFER, see VERTEX_FLOATS.
+        '''
+        stride = VERTEX_FLOATS * sizeof(GLfloat)
 
         # 设置顶点属性指针
         # 位置属性
         glVertexAttribPointer(0, 2, GL_FLOAT, GL_FALSE,
-                              4 * sizeof(GLfloat), ctypes.c_void_p(0))
+                              stride, ctypes.c_void_p(0))
         glEnableVertexAttribArray(0)
         # 纹理坐标属性
-        glVertexAttribPointer(1, 2, GL_FLOAT, GL_FALSE, 4 *
-                              sizeof(GLfloat), ctypes.c_void_p(2 * sizeof(GLfloat)))
+        glVertexAttribPointer(1, 2, GL_FLOAT, GL_FALSE,
+                              stride, ctypes.c_void_p(2 * sizeof(GLfloat)))
         glEnableVertexAttribArray(1)
-
-        glBindBuffer(GL_ARRAY_BUFFER, 0)
-        glBindVertexArray(0)
+        # 颜色属性，最后一个float中的4个字节
+        glVertexAttribPointer(2, 4, GL_UNSIGNED_BYTE, GL_TRUE,
+                              stride, ctypes.c_void_p(5 * sizeof(GLfloat)))
+        glEnableVertexAttribArray(2)
+        # 四边形对角的纹理坐标，一个float中的2个uint16
+        glVertexAttribPointer(3, 2, GL_UNSIGNED_SHORT, GL_TRUE,
+                              stride, ctypes.c_void_p(4 * sizeof(GLfloat)))
+        glEnableVertexAttribArray(3)
+
+    def init_instanced_buffer(self):
+        '''
+        The VAO and the streaming VBO of the instance records, see INSTANCE_DTYPE.
+        The attribute pointers are set by bind_instances() before every draw.
+        '''
+        self.vao = glGenVertexArrays(1)
+        self.stream = StreamingBuffer(INSTANCE_DTYPE.itemsize)
+        self.vbo = self.stream.vbo
+
+        gl_state.bind_vertex_array(self.vao)
+        gl_state.bind_buffer(GL_ARRAY_BUFFER, self.vbo)
+        self.init_instance_attributes()
+
+    def init_instance_attributes(self):
+        '''
+        Enable the instance attributes of the bound VAO, and point them to the bound GL_ARRAY_BUFFER.
+        '''
+        for location in range(1, 5):
+            glEnableVertexAttribArray(location)
+            glVertexAttribDivisor(location, 1)
+        self.bind_instances(0)
+
+    def bind_instances(self, first):
+        '''
+        Point the instance attributes to the records from the first one.
+        There is no base instance in OpenGL 3.3, so the offset goes into the pointers.
+        '''
+        stride = INSTANCE_DTYPE.itemsize
+        offset = first * stride
+        fields = INSTANCE_DTYPE.fields
+        # 位置、尺寸、纹理坐标、颜色
+        glVertexAttribPointer(1, 2, GL_FLOAT, GL_FALSE, stride,
+                              ctypes.c_void_p(offset + fields['pos'][1]))
+        glVertexAttribPointer(2, 2, GL_HALF_FLOAT, GL_FALSE, stride,
+                              ctypes.c_void_p(offset + fields['size'][1]))
+        glVertexAttribPointer(3, 4, GL_UNSIGNED_SHORT, GL_TRUE, stride,
+                              ctypes.c_void_p(offset + fields['uv'][1]))
+        glVertexAttribPointer(4, 4, GL_UNSIGNED_BYTE, GL_TRUE, stride,
+                              ctypes.c_void_p(offset + fields['color'][1]))
 
 
 class TextRenderer(TextShader):
@@ -95,75 +212,568 @@ class TextRenderer(TextShader):
     # And I believe it has every char I want.
     default_font_path = 'c:\\windows\\fonts\\msyh.ttc'
     default_font_size = 24
-
-    def __init__(self, max_cache_size=1024):
+    # The fonts for the chars the font of load_font() does not have, tried in order before the default_font_path
+    fallback_font_paths = []
+    # The CPU bytes of every cached glyph, besides its texels in the atlas
+    glyph_overhead_bytes = 256
+    # The most glyphs of the rasterizer uploaded by one new_frame()
+    max_uploads_per_frame = 64
+    # The SDF glyphs, the em size of the SDF texture, the spread texels around the glyph,
+    # and the glyph is rendered at sdf_upscale times of the size for computing the SDF
+    sdf_size = 32
+    sdf_spread = 4
+    sdf_upscale = 4
+    # The pixel sizes the text is also rasterized at, None for only the font size.
+    # The text is drawn with the glyphs of the smallest size not smaller than its pixel size (font size x scale),
+    # so the small text does not store and sample the glyphs of the font size, see size_bucket().
+    # Not used by the SDF glyphs, set it before load_font()
+    size_buckets = None
+
+    def __init__(self, max_cache_size=1024, max_cache_bytes=16 << 20, async_glyphs=False, disk_cache_dir=None, sdf=False, instanced=False, kerning=True):
         super().__init__()
+        self.sdf = sdf  # 使用距离场字形，任意缩放都保持清晰
+        self.instanced = instanced  # 每个字符上传一条实例记录
+        self.kerning = kerning  # 按字体的 kern 表调整相邻字符的间距
         self.face = None
-        self.characters = OrderedDict()  # 使用有序字典实现LRU缓存
+        self.faces = None  # 回退链中所有字体的 face
+        self.metrics = None  # 字形度量，测量文本用，见 TextMetrics
+        self.characters = OrderedDict()  # 使用有序字典实现LRU缓存，键是字符，其他尺寸的字形是 (字符, 尺寸)
+        self.bucket_faces = {}  # 其他尺寸的 face，第一次使用时打开
+        self.bucket_sizes = []  # 可用的尺寸，含字号
         self.max_cache_size = max_cache_size  # 最大缓存字符数
+        self.max_cache_bytes = max_cache_bytes  # 最大缓存字节数，含图集的纹理页及其 CPU 副本，见 resident_bytes()
+        self.pinned_limits = [0, 0]  # warm_up() 为常驻字符加大的字符数与字节数
+        self.cache_bytes = 0  # 所有字符的字节数，含各自的纹素
+        self.cache_counts = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self.frame = 0  # 当前帧，当前帧用到的字符不会被淘汰
+        self.atlas = GlyphAtlas()  # 所有字符共享的纹理图集
+        self.table = GlyphTable()  # 字符度量的数组，供向量化排版使用
+        self.layout_cache = LayoutCache()  # 重复字符串的排版结果
+
+        # 在工作线程中光栅化新字符，未完成的字符用占位符代替
+        self.async_glyphs = async_glyphs
+        self.rasterizer = None
+        self.placeholder_slot = None
+
+        # 磁盘上的字形缓存，命中时不经过 FreeType，其他尺寸的字形各有一个
+        self.disk_cache_dir = disk_cache_dir
+        self.disk_cache = None
+        self.bucket_disk_caches = {}
+
+        # 顶点暂存区，每个字符 (6个顶点, VERTEX_FLOATS个float)，或一条实例记录
+        self.staging = self.make_staging(1024)
+        # 等待 flush() 的文本，顶点在 staging[:batch_size]
+        # 按顺序记录连续的 (图集页, 字符数)，颜色在顶点中
+        self.batch = []
+        self.batch_size = 0
+
+        # 常驻的文本标签，只在变化时排版和上传
+        self.labels = LabelBuffer(self)
 
     def load_font(self, font_path, size=None):
         """初始化字体"""
         if size is None:
             size = self.default_font_size
 
-        self.face = freetype.Face(font_path)
-        self.face.set_char_size(size << 6)
-
-        self.default_face = freetype.Face(self.default_font_path)
-        self.default_face.set_char_size(size << 6)
-
-        logger.info(f'Using font: {font_path} ({size})')
-        logger.info(f'Using font(default): {self.default_font_path} ({size})')
-
-    def load_char(self, char):
-        if char in self.characters:
-            return self.characters[char]
-
-        face = self.face if self.face.get_char_index(
-            char) > 0 else self.default_face
-        face.load_char(char, freetype.FT_LOAD_RENDER)
-        bitmap = face.glyph.bitmap
-        glyph = face.glyph
+        # 距离场字形按大尺寸渲染，与显示的字号无关
+        if self.sdf:
+            raster_size = self.sdf_size * self.sdf_upscale
+            self.rasterize = partial(
+                rasterize_sdf_glyph, spread=self.sdf_spread, upscale=self.sdf_upscale)
+            variant = f'sdf{self.sdf_spread}x{self.sdf_upscale}'
+        else:
+            raster_size = size
+            self.rasterize = rasterize_glyph
+            variant = ''
+
+        # instanced 可能在构造之后才设置
+        self.staging = self.make_staging(len(self.staging))
+        self.labels.reset()
+
+        # 回退链，每个字符使用第一个包含它的字体
+        self.chain = FontChain(
+            [font_path, *self.fallback_font_paths, self.default_font_path])
+        self.faces = self.chain.open(raster_size)
+        self.face = self.faces[0]
+        self.font_path = font_path
+        self.font_size = size
+
+        # 按像素尺寸分档的字形，距离场字形与尺寸无关，不分档
+        self.bucket_faces = {}
+        self.bucket_sizes = [] if self.sdf else sorted(
+            set(self.size_buckets or ()) | {size})
+
+        for path, coverage in zip(self.chain.font_paths, self.chain.coverages):
+            logger.info(f'Using font: {path} ({size}), {len(coverage)} chars')
+
+        # 字体的度量，按显示的字号，段落的行距由它决定
+        metrics = self.face.size
+        ratio = size / raster_size
+        self.ascender = metrics.ascender / 64 * ratio
+        self.descender = metrics.descender / 64 * ratio
+        self.line_height = metrics.height / 64 * ratio
+
+        # 字距对在加载字体时读取一次，排版时只查表
+        self.table.kerning = None
+        if self.kerning:
+            kerning = Kerning(self.faces, size)
+            logger.info(f'Kerning pairs: {len(kerning)}')
+            if len(kerning) > 0:
+                self.table.kerning = kerning
+
+        # 只读取度量的测量引擎，测量文本不光栅化字形
+        self.metrics = TextMetrics(
+            self.chain, raster_size, size, self.table.kerning)
+
+        self.close_disk_caches()
+        if self.disk_cache_dir is not None:
+            self.disk_cache = GlyphDiskCache(
+                self.disk_cache_dir, self.chain.font_paths, raster_size, freetype.FT_LOAD_RENDER, variant)
+
+        if self.async_glyphs:
+            if self.rasterizer is not None:
+                self.rasterizer.close()
+            self.rasterizer = GlyphRasterizer(
+                self.chain, raster_size, self.rasterize)
+
+            # 占位符只移动画笔，不绘制
+            if self.placeholder_slot is not None:
+                self.table.remove(self.placeholder_slot)
+            self.placeholder_slot = self.table.add(
+                None, size // 2, (0, 0), (0, 0), (0.0, 0.0, 0.0, 0.0), None)
+
+    def load_char(self, char, bucket=0):
+        '''
+        Load the char, rasterize it if it is not in the cache.
+
+        :param bucket int: the pixel size of the glyph, 0 for the font size, see size_bucket().
+        '''
+        key = (char, bucket) if bucket else char
+        if key in self.characters:
+            ch = self.characters[key]
+            self.table.last_used[ch['slot']] = self.frame
+            return ch
+
+        # data 可能是 FreeType 缓冲区的视图，在下次 load_char 之前用完
+        return self.add_glyph(char, self.fetch_glyph(char, bucket), bucket=bucket)
+
+    def fetch_glyph(self, char, bucket=0, copy=False):
+        '''
+        Read the glyph from the disk cache of the size, or rasterize it and put it into the cache.
+
+        :param bucket int: the pixel size of the glyph, 0 for the font size.
+        :param copy bool: copy the bitmap out of the FreeType buffer, see rasterize_glyph().
+
+        :return glyph dict: the glyph like rasterize_glyph().
+        '''
+        disk_cache = self.bucket_disk_cache(bucket)
+        glyph = disk_cache.get(char) if disk_cache is not None else None
+        if glyph is None:
+            glyph = self.rasterize(self.bucket_face(bucket), char, copy=copy)
+            if disk_cache is not None:
+                disk_cache.put(char, glyph)
+        return glyph
+
+    def bucket_face(self, bucket):
+        '''The faces of the pixel size, opened on the first use.'''
+        if not bucket:
+            return self.faces
+        faces = self.bucket_faces.get(bucket)
+        if faces is None:
+            faces = self.bucket_faces[bucket] = self.chain.open(bucket)
+        return faces
+
+    def bucket_disk_cache(self, bucket):
+        '''The disk cache of the pixel size, opened on the first use, None without the disk_cache_dir.'''
+        if not bucket or self.disk_cache is None:
+            return self.disk_cache
+        disk_cache = self.bucket_disk_caches.get(bucket)
+        if disk_cache is None:
+            disk_cache = self.bucket_disk_caches[bucket] = GlyphDiskCache(
+                self.disk_cache_dir, self.chain.font_paths, bucket, freetype.FT_LOAD_RENDER)
+        return disk_cache
+
+    def save_disk_caches(self):
+        '''Append the new glyphs of every size to the disk caches.'''
+        for disk_cache in [self.disk_cache, *self.bucket_disk_caches.values()]:
+            if disk_cache is not None:
+                disk_cache.save()
+
+    def close_disk_caches(self):
+        '''Save and close the disk caches of the old font, they are not saved on exit anymore.'''
+        for disk_cache in [self.disk_cache, *self.bucket_disk_caches.values()]:
+            if disk_cache is not None:
+                disk_cache.close()
+        self.disk_cache = None
+        self.bucket_disk_caches = {}
+
+    def add_glyph(self, char, glyph, placement=None, bucket=0):
+        '''
+        Put the rasterized glyph into the cache, the atlas and the GlyphTable.
+
+        :param glyph dict: the glyph of rasterize_glyph().
+        :param placement tuple: the (page, uv) if the glyph is already in the atlas, see warm_up().
+        :param bucket int: the pixel size the glyph is rasterized at, 0 for the font size.
+        '''
+        data = glyph['data']
+        rows, width = data.shape
+
+        # 放入纹理图集，空白字符（如空格）不占用图集
+        if width == 0 or rows == 0:
+            page, uv = None, (0.0, 0.0, 0.0, 0.0)
+        elif placement is not None:
+            page, uv = placement
+        else:
+            page, uv = self.atlas.add(data, width, rows)
 
-        texture = glGenTextures(1)
-        glBindTexture(GL_TEXTURE_2D, texture)
+        if self.sdf:
+            bearing, size, advance, pad = self.sdf_metrics(glyph, width, rows)
+            quad_uv = uv
+        else:
+            bearing, size, advance, pad = glyph['bearing'], (width, rows), glyph['advance'], 0
+            ratio = 1.0
+            if bucket:
+                bearing, size, advance, ratio = self.bucket_metrics(
+                    char, glyph, width, rows, bucket)
+            # 四边加上图集中的留白，文字下面的效果画在其中
+            if page is not None:
+                pad = self.atlas.padding * ratio
+                margin = self.atlas.padding / self.atlas.page_size
+                quad_uv = (uv[0] - margin, uv[1] - margin,
+                           uv[2] + margin, uv[3] + margin)
+            else:
+                quad_uv = uv
+
+        key = (char, bucket) if bucket else char
+        self.characters[key] = {
+            'page': page,
+            'uv': uv,
+            'size': size,
+            'bearing': bearing,
+            'advance': advance,
+            'bucket': bucket,
+            'texels': width * rows,
+        }
 
-        # 重要：单字节对齐，针对宽度不是4的情况
-        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        ch = self.characters[key]
+        ch['slot'] = self.table.add(
+            ord(char), ch['advance'], ch['bearing'], ch['size'], quad_uv, page, pad, self.kern_row(char), bucket)
+        self.table.last_used[ch['slot']] = self.frame
+
+        # 字符占用的字节数，含图集中的纹素
+        ch['bytes'] = self.glyph_overhead_bytes
+        if page is not None:
+            ch['bytes'] += GlyphAtlas.glyph_bytes(width, rows)
+        self.cache_bytes += ch['bytes']
+        self.evict_chars()
+
+        return ch
+
+    def kern_row(self, char):
+        '''
+        The row of the char in the Kerning, -1 if the kerning is off.
+        '''
+        if self.table.kerning is None:
+            return -1
+        index = self.chain.resolve(ord(char))
+        return self.table.kerning.row(index, self.faces[index].get_char_index(char))
+
+    def bucket_metrics(self, char, glyph, width, rows, bucket):
+        '''
+        Convert the metrics of the glyph rasterized at the bucket size into the pixels of the font size.
+        The advance is the one of the font size, see TextMetrics,
+        so the text has the same width with the glyphs of any size.
+
+        :return bearing, size, advance: the metrics of the glyph.
+        :return ratio float: the pixels of the font size in every texel.
+        '''
+        ratio = self.font_size / bucket
+        bearing = (glyph['bearing'][0] * ratio, glyph['bearing'][1] * ratio)
+        size = (width * ratio, rows * ratio)
+        return bearing, size, self.metrics.advance(char), ratio
+
+    def size_bucket(self, scale):
+        '''
+        The glyphs for drawing the text at the scale,
+        the smallest size in size_buckets not smaller than the pixel size of the text,
+        or the largest size if the text is larger than all of them.
+
+        :return bucket int: the pixel size of the glyphs, 0 for the font size.
+        '''
+        sizes = self.bucket_sizes
+        if len(sizes) < 2:
+            return 0
+        # 留半个像素的余量，缩放的舍入误差不会换到更大的尺寸
+        pixels = self.font_size * scale - 0.5
+        bucket = sizes[-1]
+        for size in sizes:
+            if size >= pixels:
+                bucket = size
+                break
+        return 0 if bucket == self.font_size else bucket
+
+    def sdf_metrics(self, glyph, width, rows):
+        '''
+        Convert the metrics of the SDF glyph into the pixels of the font size.
+        The glyph metrics are in the pixels of the large face, see rasterize_sdf_glyph().
+
+        :return bearing, size, advance: the metrics of the glyph without the spread.
+        :return pad float: the spread around the glyph.
+        '''
+        ratio = self.font_size / (self.sdf_size * self.sdf_upscale)
+        advance = glyph['advance'] * ratio
+        x0, y0 = glyph['bearing'][0] * ratio, glyph['bearing'][1] * ratio
+        if width == 0 or rows == 0:
+            return (x0, y0), (0, 0), advance, 0
+
+        texel = self.sdf_upscale * ratio
+        pad = self.sdf_spread * texel
+        bearing = (x0 + pad, y0 - pad)
+        size = (width * texel - 2 * pad, rows * texel - 2 * pad)
+        return bearing, size, advance, pad
+
+    def warm_up(self, charset, pin=True):
+        '''
+        Load the chars of the charset before they are drawn.
+        The glyphs are rasterized (or read from the disk cache) first,
+        and then uploaded together, one texture upload for every atlas page.
+
+        With pin, the warmed chars and the chars of the charset already cached are never evicted,
+        max_cache_size and max_cache_bytes are raised by the chars and the resident bytes they add,
+        so the other chars keep the room they had, see unpin_chars().
+        Without pin, the charset must fit into the limits, or ValueError is raised,
+        and the warmed chars are evicted as usual when they are not used.
+
+        :param charset: the chars, ranges or named sets, see charset.charset_chars().
+        :param pin bool: keep the warmed chars in the cache.
+
+        :return stats dict: the chars loaded, the chars resident, the seconds and the bytes they take, and the texture uploads.
+        '''
+        t = time.perf_counter()
+        charset = charset_chars(charset)
+        chars = [c for c in charset if c not in self.characters]
+
+        glyphs = [self.fetch_glyph(char, copy=True) for char in chars]
+        t_rasterize = time.perf_counter() - t
+
+        # 至少需要的字节数，图集页面的两份纹素
+        need_bytes = sum(
+            self.glyph_overhead_bytes + (2 * GlyphAtlas.glyph_bytes(w, rows) if w and rows else 0)
+            for rows, w in (g['data'].shape for g in glyphs))
+        resident_bytes = self.resident_bytes()
+        if pin:
+            # 加入时不淘汰，之后按实际增加的字节数加大限额
+            limits = self.max_cache_size, self.max_cache_bytes
+            self.max_cache_size = self.max_cache_bytes = float('inf')
+        elif (len(self.characters) + len(chars) > self.max_cache_size
+              or resident_bytes + need_bytes > self.max_cache_bytes):
+            raise ValueError(
+                f'Warm up of {len(chars)} chars (>= {need_bytes} bytes) exceeds the cache limits, '
+                f'{len(self.characters)}/{self.max_cache_size} chars and '
+                f'{resident_bytes}/{self.max_cache_bytes} bytes are taken, '
+                'use pin=True or raise max_cache_size and max_cache_bytes')
+
+        placements, uploads = self.atlas.add_many([g['data'] for g in glyphs])
+
+        cache_bytes = self.cache_bytes
+        for char, glyph, placement in zip(chars, glyphs, placements):
+            ch = self.add_glyph(char, glyph, placement)
+            self.table.pinned[ch['slot']] = pin
+
+        if pin:
+            # 已在缓存中的字符也固定，它们的字节数已在原来的限额中
+            for char in charset:
+                self.table.pinned[self.characters[char]['slot']] = True
+            grown = max(self.resident_bytes() - resident_bytes, 0)
+            self.pinned_limits[0] += len(chars)
+            self.pinned_limits[1] += grown
+            self.max_cache_size = limits[0] + len(chars)
+            self.max_cache_bytes = limits[1] + grown
+
+        stats = {
+            'chars': len(chars),
+            'resident': sum(c in self.characters for c in charset),
+            'pinned': int(self.table.pinned[:self.table.size].sum()),
+            'seconds': time.perf_counter() - t,
+            'rasterize_seconds': t_rasterize,
+            'bytes': self.cache_bytes - cache_bytes,
+            'resident_bytes': self.resident_bytes() - resident_bytes,
+            'uploads': uploads,
+        }
+        logger.info(f'Warm up: {stats}')
+        return stats
+
+    def unpin_chars(self):
+        '''
+        Let the pinned chars of warm_up() be evicted again,
+        the cache limits go back to the ones before the warm-ups.
+        '''
+        self.table.pinned[:] = False
+        self.max_cache_size -= self.pinned_limits[0]
+        self.max_cache_bytes -= self.pinned_limits[1]
+        self.pinned_limits = [0, 0]
+        self.evict_chars()
+
+    def remove_char(self, char, bucket=0):
+        '''
+        Remove the char from the cache, the atlas and the GlyphTable.
+        '''
+        ch = self.characters.pop((char, bucket) if bucket else char)
+        if ch['page'] is not None:
+            self.atlas.remove(ch['page'], ch['uv'])
+        self.table.remove(ch['slot'])
+        self.cache_bytes -= ch['bytes']
+
+    def resident_bytes(self):
+        '''
+        The bytes charged to max_cache_bytes, the atlas pages and the overhead of the chars.
+        The pages are charged whole, with their CPU copies, as the page is freed only when it is empty.
+        '''
+        return len(self.characters) * self.glyph_overhead_bytes + self.atlas.memory_bytes()
+
+    def evict_chars(self):
+        '''
+        Evict the least recently used chars, if the cache exceeds max_cache_bytes or max_cache_size.
+        It evicts down to 90% of the limits at once, so it does not run for every new char.
+        The chars used in the current frame and the pinned chars are never evicted.
+
+        Over max_cache_bytes, the chars are evicted by pages, only the empty page gives its memory back.
+        The page used the least recently goes first with all its chars,
+        the pages with the chars which can not be evicted are kept.
+        Over max_cache_size, the chars are evicted one by one.
+        '''
+        over_bytes = self.resident_bytes() > self.max_cache_bytes
+        if not over_bytes and len(self.characters) <= self.max_cache_size:
+            return
 
-        if bitmap.pixel_mode == freetype.FT_PIXEL_MODE_MONO:
-            data = self.mono_to_grayscale(bitmap)
-        else:
-            # 直接构造 numpy array, 注意 shape/类型
-            data = np.array(bitmap.buffer, dtype=np.ubyte)
-
-        # 纹理参数
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-
-        # 上传纹理（单通道）
-        if bitmap.width > 0 and bitmap.rows > 0:
-            glTexImage2D(GL_TEXTURE_2D, 0, GL_RED, bitmap.width,
-                         bitmap.rows, 0, GL_RED, GL_UNSIGNED_BYTE, data)
+        size = self.table.size
+        codepoints = self.table.codepoints[:size]
+        last_used = self.table.last_used[:size]
+        evictable = (codepoints >= 0) & (
+            last_used < self.frame) & ~self.table.pinned[:size]
+        evicted = 0
+
+        if over_bytes:
+            max_bytes = self.max_cache_bytes * 0.9
+            pages = self.table.pages[:size]
+            # 占用页面的槽位，含占位字形
+            placed = (codepoints != -1) & (pages >= 0)
+            newest = np.full(len(self.atlas.pages), -1, dtype=np.int64)
+            np.maximum.at(newest, pages[placed], last_used[placed])
+            for page in np.argsort(newest, kind='stable'):
+                if self.resident_bytes() <= max_bytes:
+                    break
+                in_page = placed & (pages == page)
+                if not in_page.any() or (in_page & ~evictable).any():
+                    continue
+                for slot in np.flatnonzero(in_page):
+                    self.remove_char(chr(codepoints[slot]), int(self.table.buckets[slot]))
+                    evicted += 1
+
+        if len(self.characters) > self.max_cache_size:
+            max_size = int(self.max_cache_size * 0.9)
+            # 按页面淘汰过的槽位已是空闲的
+            candidates = np.flatnonzero(evictable & (codepoints >= 0))
+            candidates = candidates[np.argsort(
+                last_used[candidates], kind='stable')]
+            for slot in candidates:
+                if len(self.characters) <= max_size:
+                    break
+                self.remove_char(chr(codepoints[slot]), int(self.table.buckets[slot]))
+                evicted += 1
+
+        if evicted:
+            # 缓存的排版引用了被淘汰字符的图集位置
+            self.layout_cache.clear()
+            self.cache_counts['evictions'] += evicted
+            logger.debug(
+                f'Evicted {evicted} chars, {self.resident_bytes()} bytes resident')
+
+    def new_frame(self):
+        '''
+        Start a new frame, the chars of the previous frames can be evicted from now on.
+        The glyphs finished by the rasterizer are uploaded here.
+        The render_loop calls it, call it yourself if drawing without the render_loop.
+        '''
+        self.frame += 1
+        if self.rasterizer is not None:
+            self.upload_glyphs()
+        self.labels.touch()
+
+    def upload_glyphs(self):
+        '''
+        Upload the glyphs finished by the rasterizer, at most max_uploads_per_frame of them.
+        '''
+        for char, bucket, glyph in self.rasterizer.collect(self.max_uploads_per_frame):
+            if glyph is None or ((char, bucket) if bucket else char) in self.characters:
+                continue
+            disk_cache = self.bucket_disk_cache(bucket)
+            if disk_cache is not None:
+                disk_cache.put(char, glyph)
+            self.add_glyph(char, glyph, bucket=bucket)
+
+    def cache_stats(self):
+        '''
+        The statistics of the glyph cache.
+        '''
+        return dict(self.cache_counts,
+                    chars=len(self.characters),
+                    pinned=int(self.table.pinned[:self.table.size].sum()),
+                    glyph_bytes=self.cache_bytes,
+                    resident_bytes=self.resident_bytes(),
+                    max_cache_bytes=self.max_cache_bytes,
+                    gpu_bytes=self.atlas.memory_bytes(cpu_copy=False),
+                    pages=sum(p is not None for p in self.atlas.pages),
+                    rasterizer=None if self.rasterizer is None else self.rasterizer.stats(),
+                    disk_cache=None if self.disk_cache is None else self.disk_cache.stats(),
+                    bucket_disk_caches={bucket: e.stats() for bucket, e in self.bucket_disk_caches.items()},
+                    buckets=dict(Counter(ch['bucket'] for ch in self.characters.values())),
+                    labels=self.labels.stats(),
+                    metrics=None if self.metrics is None else self.metrics.stats())
+
+    def glyph_slots(self, text, bucket=0):
+        '''
+        Find the slots of the chars in the GlyphTable, load the missing chars.
+        With the rasterizer, the missing chars are requested and take the placeholder slot,
+        see has_placeholder().
+
+        :param bucket int: the pixel size of the glyphs, 0 for the font size, see size_bucket().
+        '''
+        codepoints = text_to_codepoints(text)
+        slots = self.table.slots(codepoints, bucket)
+        missing = slots < 0
+        if missing.any():
+            # 先标记已缓存的字符，加载新字符时不会淘汰它们
+            self.table.last_used[slots[~missing]] = self.frame
+            new_chars = np.unique(codepoints[missing])
+            if self.rasterizer is not None:
+                disk_cache = self.bucket_disk_cache(bucket)
+                for codepoint in new_chars:
+                    # 磁盘缓存命中的字符直接加载，不必等待工作线程
+                    char = chr(codepoint)
+                    glyph = disk_cache.get(char) if disk_cache is not None else None
+                    if glyph is not None:
+                        self.add_glyph(char, glyph, bucket=bucket)
+                    else:
+                        self.rasterizer.request(char, bucket)
+                slots = self.table.slots(codepoints, bucket)
+                slots[slots < 0] = self.placeholder_slot
+            else:
+                for codepoint in new_chars:
+                    self.load_char(chr(codepoint), bucket)
+                slots = self.table.slots(codepoints, bucket)
+            self.cache_counts['misses'] += len(new_chars)
+            self.cache_counts['hits'] += len(slots) - len(new_chars)
         else:
-            empty_data = np.array([0], dtype=np.ubyte)
-            glTexImage2D(GL_TEXTURE_2D, 0, GL_RED, 1, 1, 0,
-                         GL_RED, GL_UNSIGNED_BYTE, empty_data)
-
-        # 解绑纹理
-        glBindTexture(GL_TEXTURE_2D, 0)
-
-        self.characters[char] = {
-            'texture': texture,
-            'size': (bitmap.width, bitmap.rows),
-            'bearing': (glyph.bitmap_left, glyph.bitmap_top),
-            'advance': glyph.advance.x >> 6
-        }
+            self.table.last_used[slots] = self.frame
+            self.cache_counts['hits'] += len(slots)
+        return slots
 
-        return self.characters[char]
+    def has_placeholder(self, slots):
+        '''
+        If some chars are not rasterized yet, the layout of the slots is not cached.
+        '''
+        return self.placeholder_slot is not None and bool((slots == self.placeholder_slot).any())
 
     def bounding_box(self, text, scale=1.0):
         """
@@ -172,6 +782,10 @@ class TextRenderer(TextShader):
         The (width, height) gives the bounding box of the text.
         The (width, height2) gives the real range of the text, which contains the descender of each char.
 
+        It is measured by the metrics of the glyphs, see TextMetrics,
+        the glyphs are not rasterized and the GL context is not required,
+        it only needs load_font().
+
         :param text str: the input text.
         :param scale float: the scale factor.
 
@@ -179,129 +793,330 @@ class TextRenderer(TextShader):
         :return height int: the height of the input text, it shows the bottom line of the string.
         :return height2 int: the real height of the input text, it contains the descender of each char.
         """
-        width = 0
-        height = 0
-        height2 = 0
-        for char in text:
-            ch = self.load_char(char)
-            width += ch['advance'] * scale
-            height = max(height, ch['size'][1] * scale)
-            # height2 = max(
-            #     height2, (ch['bbox_height'] + ch['descender']) * scale)
-        height2 = height
+        return self.metrics.bounding_box(text, scale)
+
+    def layout_key(self, text, scale):
+        return (text, scale, self.font_path, self.font_size, self.kerning, self.size_bucket(scale))
 
-        return width, height, height2
+    def make_staging(self, capacity):
+        if self.instanced:
+            return np.zeros(capacity, dtype=INSTANCE_DTYPE)
+        return np.zeros((capacity, 6, VERTEX_FLOATS), dtype=np.float32)
 
-    def render_text(self, text, x, y, scale=1.0, color=(1.0, 1.0, 1.0)):
+    def reserve(self, n):
         """
-        Render the text on position x, y.
+        Make sure the staging has room for n more chars after the batch.
         """
-        if not text:
+        needed = self.batch_size + n
+        if needed <= len(self.staging):
             return
+        capacity = len(self.staging)
+        while capacity < needed:
+            capacity *= 2
+        staging = self.make_staging(capacity)
+        staging[:self.batch_size] = self.staging[:self.batch_size]
+        self.staging = staging
+
+    def layout_text(self, text, x, y, scale=1.0, start=None):
+        """
+        Compute the vertices of the text on position x, y.
+        The vertices are written into the staging at start, right after the batch by default.
+
+        Every char is 6 vertices (2 triangles)
+        a----b
+        |1 / |
+        | / 2|
+        c----d
+        But the char on the screen is like
+        c----d
+        |2 / |
+        | / 1|
+        a----b
+
+        In the instanced mode, every char is one instance record instead, see layout_instances().
+
+        :return count int: the number of chars with pixels, they are in staging[start:start+count].
+        :return pages np.array: the atlas page of every char.
+        """
+        if start is None:
+            start = self.batch_size
+        self.reserve(start - self.batch_size + len(text))
+        out = self.staging[start:]
 
-        glUseProgram(self.shader_program)
-        glUniform3f(glGetUniformLocation(self.shader_program, "textColor"),
-                    color[0], color[1], color[2])
+        if self.instanced:
+            field, layout = 'instances', layout_instances
+        else:
+            field, layout = 'vertices', layout_quads
+
+        # 命中缓存时直接复制顶点，不需要重新排版
+        key = self.layout_key(text, scale)
+        cached = self.layout_cache.get(key, field)
+        if cached is None:
+            slots = self.glyph_slots(text, self.size_bucket(scale))
+            count, pages = layout(self.table, slots, 0, 0, scale, out)
+            if not self.has_placeholder(slots):
+                self.layout_cache.put(
+                    key, field, (out[:count].copy(), pages, slots))
+        else:
+            vertices, pages, slots = cached
+            count = len(vertices)
+            out[:count] = vertices
+            self.table.last_used[slots] = self.frame
+            self.cache_counts['hits'] += len(slots)
 
-        glUniformMatrix4fv(glGetUniformLocation(self.shader_program, "projection"),
-                           1, GL_FALSE, self.projection)
+        self.translate(out[:count], x, y)
+        return count, pages
 
-        glActiveTexture(GL_TEXTURE0)
-        glBindVertexArray(self.vao)
+    def translate(self, out, x, y):
+        """
+        Move the chars by (x, y).
 
-        # 为整个文本准备顶点数据
-        vertices = []
-        textures_used = []  # 记录使用的纹理和对应的顶点范围
+        :param out np.array: the chars, a slice of the staging like array.
+        """
+        if self.instanced:
+            out['pos'] += (x, y)
+        else:
+            out[:, :, 0] += x
+            out[:, :, 1] += y
 
-        start_index = 0
+    def layout_paragraph(self, text, scale=1.0, max_width=None, align='left', line_spacing=1.0):
+        """
+        Lay out the paragraph, the result is cached like the layout of the text.
+        The lines are wrapped to max_width, see paragraph.break_lines(),
+        and the baselines are spaced by the line height of the font.
+
+        :param text str: the paragraph, the '\\n' starts a new line.
+        :param max_width float: the width of the lines in pixels, None for not wrapping.
+        :param align str: the lines align to the 'left', 'center' or 'right' of the paragraph.
+        :param line_spacing float: the times of the line height of the font.
+
+        :return paragraph dict: the layout of the paragraph, its SW corner is on (0, 0)
+            - vertices: the vertices (or the instance records) of the chars.
+            - runs: the (page, count) runs of the chars.
+            - slots: the slots of the glyphs.
+            - lines: the (text, x, y) of the lines, the pen position of every line.
+            - width, height: the size of the paragraph.
+        """
+        field = 'instances' if self.instanced else 'vertices'
+        key = self.layout_key(text, scale) + \
+            ('paragraph', max_width, align, line_spacing)
+        cached = self.layout_cache.get(key, field)
+        if cached is not None:
+            return cached
+
+        # 先断行，每个自然段按宽度折行
+        lines = []
+        slots = []
+        bucket = self.size_bucket(scale)
+        for hard_line in text.split('\n'):
+            line_slots = self.glyph_slots(hard_line, bucket)
+            slots.append(line_slots)
+            advances = pen_advances(self.table, line_slots) * scale
+            for a, b in break_lines(hard_line, advances, max_width):
+                lines.append(hard_line[a:b])
+        slots = np.concatenate(slots)
+
+        widths = [self.bounding_box(line, scale)[0] if line else 0.0
+                  for line in lines]
+        width = max(widths)
+        step = self.line_height * line_spacing * scale
+        height = (self.ascender - self.descender) * scale + \
+            step * (len(lines) - 1)
+        offset = {'left': 0.0, 'center': 0.5, 'right': 1.0}[align]
+
+        # 各行排在暂存区的批次之后，再复制出来
+        start = end = self.batch_size
+        pages = [np.zeros(0, dtype=np.int32)]
+        placed = []
+        for i, (line, line_width) in enumerate(zip(lines, widths)):
+            x = (width - line_width) * offset
+            y = height - self.ascender * scale - step * i
+            placed.append((line, x, y))
+            if line:
+                count, line_pages = self.layout_text(
+                    line, x, y, scale, start=end)
+                end += count
+                pages.append(line_pages)
+
+        paragraph = {
+            'vertices': self.staging[start:end].copy(),
+            'runs': self.make_runs(np.concatenate(pages)),
+            'slots': slots,
+            'lines': placed,
+            'width': width,
+            'height': height,
+        }
+        if not self.has_placeholder(slots):
+            self.layout_cache.put(key, field, paragraph)
+        return paragraph
 
-        for char in text:
-            self.load_char(char)
-            if char not in self.characters:
-                continue  # 跳过未加载的字符
+    def place_paragraph(self, paragraph, x, y, color):
+        """
+        Copy the paragraph into the staging right after the batch, its SW corner on (x, y).
 
-            ch = self.characters[char]
+        :return start, count int: the chars are in staging[start:start+count].
+        """
+        vertices = paragraph['vertices']
+        count = len(vertices)
+        self.reserve(count)
+        start = self.batch_size
+        out = self.staging[start:start+count]
+        out[:] = vertices
+        self.translate(out, x, y)
+        self.write_color(out, color)
+        self.table.last_used[paragraph['slots']] = self.frame
+        return start, count
+
+    def render_paragraph(self, paragraph, x, y, color=(1.0, 1.0, 1.0), effect=None):
+        """
+        Render the paragraph of layout_paragraph(), its SW corner on (x, y).
+        """
+        start, count = self.place_paragraph(paragraph, x, y, color)
+        self.draw_batch(self.staging[start:start+count],
+                        self.effect_runs(paragraph['runs'], effect))
 
-            # 计算位置
-            xpos = x + ch['bearing'][0] * scale
-            ypos = y - (ch['size'][1] - ch['bearing'][1]) * scale
-            w = ch['size'][0] * scale
-            h = ch['size'][1] * scale
-            x += ch['advance'] * scale
+    def queue_paragraph(self, paragraph, x, y, color=(1.0, 1.0, 1.0), effect=None):
+        """
+        Queue the paragraph of layout_paragraph(), it is drawn by the next flush().
+        """
+        start, count = self.place_paragraph(paragraph, x, y, color)
+        self.batch_size += count
+        self.append_runs(self.effect_runs(paragraph['runs'], effect))
 
-            # 跳过完全透明的字符（如空格）
-            if not all([w > 0, h > 0]):
-                continue
+    def write_color(self, out, color):
+        """
+        Write the color into the chars,
+        the vertices (or the instance records) carry their own RGBA,
+        so the texts of any colors are drawn together.
+
+        :param out np.array: the chars, a slice of the staging like array.
+        :param color tuple: the (r, g, b) or (r, g, b, a) in 0 ... 1, the alpha is 1 if not given.
+        """
+        rgba = tuple(color[:4]) + (1.0,) * (4 - len(color[:4]))
+        rgba = [round(min(max(c, 0.0), 1.0) * 255) for c in rgba]
+        if self.instanced:
+            out['color'] = rgba
+        else:
+            vertex_colors(out)[:] = rgba
+
+    @staticmethod
+    def make_runs(pages):
+        """
+        Split the chars into runs of the same atlas page.
+        """
+        if len(pages) == 0:
+            return []
+        bounds = [0] + (np.flatnonzero(pages[1:] != pages[:-1]) + 1).tolist() + [len(pages)]
+        return [(int(pages[a]), b - a) for a, b in zip(bounds[:-1], bounds[1:])]
+
+    def effect_runs(self, runs, effect=None):
+        """
+        The runs of the chars drawn with the effect, their keys are (effect, page).
+
+        :param effect TextEffect: the effect, None for the default effect.
+        """
+        effect = self.effect if effect is None else effect
+        return [((effect, page), count) for page, count in runs]
 
-            # 每个字符的6个顶点（2个三角形）
-            # a----b
-            # |1 / |
-            # | / 2|
-            # c----d
-            # But the char on the screen is like
-            # c----d
-            # |2 / |
-            # | / 1|
-            # a----b
-            _vertices = [
-                # Triangle 1
-                [xpos,     ypos + h, 0.0, 0.0],  # c
-                [xpos + w, ypos,     1.0, 1.0],  # b
-                [xpos,     ypos,     0.0, 1.0],  # a
-                # Triangle 2
-                [xpos,     ypos + h, 0.0, 0.0],  # c
-                [xpos + w, ypos + h, 1.0, 0.0],  # d
-                [xpos + w, ypos,     1.0, 1.0],  # b
-            ]
-
-            [vertices.extend(e) for e in _vertices]
-
-            # 记录这个字符使用的纹理和顶点范围
-            end_index = len(vertices) // 4  # 每个顶点4个float
-            textures_used.append({
-                'texture': ch['texture'],
-                'start': start_index,
-                'count': end_index - start_index
-            })
-            start_index = end_index
-
-        if vertices:
-            # 上传顶点数据
-            vertices_array = np.array(vertices, dtype=np.float32)
-            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
-            glBufferSubData(GL_ARRAY_BUFFER, 0,
-                            vertices_array.nbytes, vertices_array)
-
-            # 按纹理分组绘制
-            for texture_info in textures_used:
-                glBindTexture(GL_TEXTURE_2D, texture_info['texture'])
-                glDrawArrays(
-                    GL_TRIANGLES, texture_info['start'], texture_info['count'])
-
-        glBindVertexArray(0)
-        glBindTexture(GL_TEXTURE_2D, 0)
+    def render_text(self, text, x, y, scale=1.0, color=(1.0, 1.0, 1.0), effect=None):
+        """
+        Render the text on position x, y.
+        """
+        if not text:
+            return
+
+        count, pages = self.layout_text(text, x, y, scale)
+        start = self.batch_size
+        self.write_color(self.staging[start:start+count], color)
+        self.draw_batch(self.staging[start:start+count],
+                        self.effect_runs(self.make_runs(pages), effect))
         return
 
-    def mono_to_grayscale(self, bitmap):
-        """将单色位图转换为灰度"""
-        width = bitmap.width
-        rows = bitmap.rows
-        pitch = bitmap.pitch
+    def queue_text(self, text, x, y, scale=1.0, color=(1.0, 1.0, 1.0), effect=None):
+        """
+        Queue the text on position x, y, it is drawn by the next flush().
 
-        # 创建灰度数据数组
-        data = np.zeros((rows, width), dtype=np.ubyte)
+        :param effect TextEffect: the effect under the text, None for the default effect.
+        """
+        if not text:
+            return
+
+        count, pages = self.layout_text(text, x, y, scale)
+        self.write_color(
+            self.staging[self.batch_size:self.batch_size+count], color)
+        self.batch_size += count
+        self.append_runs(self.effect_runs(self.make_runs(pages), effect))
+        return
+
+    def append_runs(self, runs):
+        """
+        Append the runs of the queued chars to the batch, see effect_runs().
+        """
+        # 与上一段同一效果、同一图集页时直接合并
+        if runs and self.batch and self.batch[-1][0] == runs[0][0]:
+            key, n = runs.pop(0)
+            self.batch[-1] = (key, self.batch[-1][1] + n)
+        self.batch.extend(runs)
+
+    def flush(self):
+        """
+        Draw the labels, and then the queued texts, one upload for all of them.
+        The texts are drawn in the order they are queued, the later ones on top of the earlier ones,
+        only the adjacent runs of the same effect and atlas page share a draw, see append_runs().
+        """
+        self.labels.draw()
+
+        vertices = self.staging[:self.batch_size]
+        runs = self.batch
+        self.batch = []
+        self.batch_size = 0
+
+        self.draw_batch(vertices, runs)
+        return
+
+    def draw_batch(self, vertices, runs):
+        """
+        Draw the vertices.
+        One upload, and one draw for every run.
 
-        for y in range(rows):
-            for x in range(width):
-                byte_index = y * pitch + x // 8
-                bit_index = 7 - (x % 8)  # FT 位图是 MSB 优先
+        :param vertices np.array: the (n, 6, VERTEX_FLOATS) vertices of n chars, or the (n,) instance records.
+        :param runs list: the contiguous ((effect, page), count) runs of the chars, see effect_runs().
+        """
+        if not runs:
+            return
 
-                if byte_index < len(bitmap.buffer):
-                    byte_val = bitmap.buffer[byte_index]
-                    bit_val = (byte_val >> bit_index) & 1
-                    data[y, x] = 255 if bit_val else 0
+        gl_state.bind_vertex_array(self.vao)
+        current = None
+
+        # 上传顶点数据，所有文本一次上传
+        start = self.stream.write(vertices)
+
+        if self.instanced:
+            # 每个图集页一次实例化绘制，每个实例是4个顶点的三角形带
+            for (effect, page), count in runs:
+                if effect != current:
+                    current = effect
+                    self.use_effect(effect)
+                gl_state.bind_texture(self.atlas.texture(page))
+                self.bind_instances(start)
+                glDrawArraysInstanced(GL_TRIANGLE_STRIP, 0, 4, count)
+                start += count
+            return
 
-        return data.flatten()
+        # 每个图集页一次绘制，状态没有变化时不调用 GL
+        for (effect, page), count in runs:
+            if effect != current:
+                current = effect
+                self.use_effect(effect)
+            gl_state.bind_texture(self.atlas.texture(page))
+            glDrawArrays(GL_TRIANGLES, start, count * 6)
+            start += count * 6
+
+        return
+
+    def mono_to_grayscale(self, bitmap):
+        """将单色位图转换为灰度"""
+        return bitmap_to_array(bitmap).flatten()
 
 # %% ---- 2025-10-09 ------------------------
 # Play ground
@@ -0,0 +1,204 @@
+"""
+File: glyph_atlas.py
+Author: Chuncheng Zhang
+Date: 2026-10-17
+Copyright & Email: chuncheng.zhang@ia.ac.cn
+
+Purpose:
+    The glyph atlas of the compatibility (fixed-function) renderer.
+    The glyphs are packed row by row into the GL_ALPHA textures,
+    one byte for every texel instead of the four of the RGBA,
+    with the GL_MODULATE texture environment the color comes from glColor and the alpha from the texture.
+
+    Every row (shelf) keeps its free spans, the place of the removed glyph goes back to its row,
+    and joins the free neighbours, so the next glyph of any width up to the span fits in it,
+    see TextRenderer.evict_char().
+
+Functions:
+    1. Requirements and constants
+    2. Function and class
+    3. Play ground
+    4. Pending
+    5. Pending
+"""
+
+
+# %% ---- 2026-10-17 ------------------------
+# Requirements and constants
+from .easy_import import *
+
+from OpenGL.GL import *
+
+
+# %% ---- 2026-10-17 ------------------------
+# Function and class
+
+
+class GlyphAtlas:
+    '''
+    The GL_ALPHA pages of the glyphs, packed into the shelves (rows) from the top.
+
+    - pages: the textures.
+    - tops: the y of the next new shelf of every page.
+    - shelves: the [page, y, height, spans] rows, the spans are the free [x0, x1) of the row, in order.
+    '''
+    # The size of the square page
+    page_size = 1024
+    # The empty texels around every glyph, the linear filter does not bleed into the neighbours
+    padding = 1
+    # The atlas is full with the pages
+    max_pages = 4
+    # The least height of the shelves, the line height of the font makes every glyph fit every shelf
+    shelf_height = 0
+
+    def __init__(self):
+        self.pages = []
+        self.tops = []
+        self.shelves = []
+
+    def new_page(self):
+        '''
+        Create the empty page.
+        '''
+        s = self.page_size
+        texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, texture)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_ALPHA, s, s, 0,
+                     GL_ALPHA, GL_UNSIGNED_BYTE, np.zeros((s, s), dtype=np.uint8))
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+
+        self.pages.append(texture)
+        self.tops.append(0)
+        logger.info(f'Atlas page created: {len(self.pages)-1} ({s})')
+
+    def new_shelf(self, h):
+        '''
+        Open the shelf for the h texels high glyph, on the last page or on a new page.
+
+        :return shelf list: the new shelf, None if the atlas is full.
+        '''
+        s = self.page_size
+        height = max(h, self.shelf_height)
+        if not self.pages or self.tops[-1] + height > s:
+            if len(self.pages) >= self.max_pages:
+                return None
+            self.new_page()
+        shelf = [len(self.pages) - 1, self.tops[-1], height, [[0, s]]]
+        self.tops[-1] += height
+        self.shelves.append(shelf)
+        return shelf
+
+    def place(self, w, h):
+        '''
+        Find the place for the (w, h) rectangle, in the lowest shelf it fits in.
+
+        :return page int: the page of the place, None if the atlas is full.
+        :return x, y int: the NW corner of the place.
+        '''
+        best = None
+        for shelf in self.shelves:
+            if shelf[2] < h or (best is not None and shelf[2] >= best[0][2]):
+                continue
+            for span in shelf[3]:
+                if span[1] - span[0] >= w:
+                    best = shelf, span
+                    break
+
+        if best is None:
+            shelf = self.new_shelf(h)
+            if shelf is None:
+                return None, 0, 0
+            best = shelf, shelf[3][0]
+
+        shelf, span = best
+        x = span[0]
+        span[0] += w
+        if span[0] == span[1]:
+            shelf[3].remove(span)
+        return shelf[0], x, shelf[1]
+
+    def add(self, data, width=None):
+        '''
+        Upload the glyph into the atlas.
+
+        :param data np.array: the (rows, pitch) uint8 alpha of the glyph.
+        :param width int: the texels of every row, the pitch if None.
+
+        :return page int: the page of the glyph, None if the atlas is full.
+        :return uv tuple: the (u0, v0, u1, v1) of the glyph, the (u0, v0) is the top left.
+        '''
+        rows, pitch = data.shape
+        width = pitch if width is None else width
+        pad = self.padding
+        s = self.page_size
+        w, h = width + 2 * pad, rows + 2 * pad
+        if w > s or h > s:
+            raise ValueError(
+                f'Glyph ({width} x {rows}) is larger than the atlas page ({s})')
+
+        page, x, y = self.place(w, h)
+        if page is None:
+            return None, None
+
+        # 复用的位置可能留有旧字形，连同留白一起写入
+        padded = np.zeros((h, w), dtype=np.uint8)
+        padded[pad:pad+rows, pad:pad+width] = data[:, :width]
+
+        glBindTexture(GL_TEXTURE_2D, self.pages[page])
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexSubImage2D(GL_TEXTURE_2D, 0, x, y, w, h,
+                        GL_ALPHA, GL_UNSIGNED_BYTE, padded)
+        x, y = x + pad, y + pad
+        return page, (x / s, y / s, (x + width) / s, (y + rows) / s)
+
+    def remove(self, page, uv):
+        '''
+        Give the place of the glyph of add() back to its shelf, the texels are overwritten by the next glyph.
+        '''
+        s = self.page_size
+        pad = self.padding
+        x0 = round(uv[0] * s) - pad
+        x1 = round(uv[2] * s) + pad
+        y = round(uv[1] * s) - pad
+        shelf = next(e for e in self.shelves
+                     if e[0] == page and e[1] <= y < e[1] + e[2])
+
+        # 按顺序插入，与相邻的空闲区间合并
+        spans = shelf[3]
+        i = 0
+        while i < len(spans) and spans[i][0] < x0:
+            i += 1
+        spans.insert(i, [x0, x1])
+        if i + 1 < len(spans) and spans[i + 1][0] == x1:
+            spans[i][1] = spans.pop(i + 1)[1]
+        if i > 0 and spans[i - 1][1] == x0:
+            spans[i - 1][1] = spans.pop(i)[1]
+
+    def clear(self):
+        '''
+        Delete all the pages, the glyphs are added again from the empty atlas.
+        '''
+        if self.pages:
+            glDeleteTextures(self.pages)
+        self.pages = []
+        self.tops = []
+        self.shelves = []
+
+    def memory_bytes(self):
+        '''The texture memory of the pages.'''
+        return len(self.pages) * self.page_size * self.page_size
+
+# %% ---- 2026-10-17 ------------------------
+# Play ground
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
+
+
+# %% ---- 2026-10-17 ------------------------
+# Pending
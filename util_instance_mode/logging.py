@@ -1,7 +1,10 @@
 from loguru import logger
 
-logger.add('log/debug.log', level='DEBUG',
-           rotation='1 MB', retention='10 days')
-
-logger.add('log/info.log', level='INFO',
-           rotation='1 MB', retention='10 days')
+# The file sinks, created on the first message,
+# the benchmarks remove them and log to the console only
+log_files = [
+    logger.add('log/debug.log', level='DEBUG',
+               rotation='1 MB', retention='10 days', delay=True),
+    logger.add('log/info.log', level='INFO',
+               rotation='1 MB', retention='10 days', delay=True),
+]
@@ -7,6 +7,12 @@ Copyright & Email: chuncheng.zhang@ia.ac.cn
 Purpose:
     TextRender
 
+    The glyphs are packed into the GL_ALPHA pages of the GlyphAtlas,
+    the least recently used glyphs are evicted when the cache or the atlas is full,
+    and the quads of a string are drawn from the client-side vertex arrays,
+    one glDrawArrays for every atlas page the string uses.
+    It runs on the compatibility profile, like the OpenGL 1.1 machines.
+
 Functions:
     1. Requirements and constants
     2. Function and class
@@ -19,6 +25,7 @@ Functions:
 # %% ---- 2025-10-09 ------------------------
 # Requirements and constants
 from .easy_import import *
+from .glyph_atlas import GlyphAtlas
 
 import freetype
 from OpenGL.GL import *
@@ -27,14 +34,63 @@ from collections import OrderedDict
 
 # %% ---- 2025-10-09 ------------------------
 # Function and class
+def bitmap_view(bitmap):
+    '''
+    View the buffer of the FreeType bitmap as the (rows, pitch) uint8 array, without copy.
+    It is valid until the next glyph is loaded into the glyph slot.
+    '''
+    ft_bitmap = bitmap._FT_Bitmap
+    rows, pitch = ft_bitmap.rows, abs(ft_bitmap.pitch)
+    view = np.ctypeslib.as_array(ft_bitmap.buffer, shape=(rows * pitch,))
+    view = view.reshape(rows, pitch)
+    # 负的 pitch 表示自下而上存储
+    return view[::-1] if ft_bitmap.pitch < 0 else view
+
+
 class TextRenderer:
     # I believe windows should have it
     default_font_path = 'c:\\windows\\fonts\\msyh.ttc'
 
     def __init__(self, max_cache_size=1024):
         self.face = None
-        self.characters = OrderedDict()  # 使用有序字典实现LRU缓存
+        self.characters = OrderedDict()  # 已加载的字符，按最近使用排序
         self.max_cache_size = max_cache_size  # 最大缓存字符数
+        self.atlas = GlyphAtlas()  # 所有字符共享的 GL_ALPHA 纹理
+        self.viewport = None  # 视口的 (宽, 高)，第一次绘制时查询一次
+
+    def set_viewport(self, width, height):
+        '''
+        Set the size of the viewport the text is drawn into, call it after changing the glViewport.
+        Otherwise the viewport is queried from GL only once, by the first render_text().
+        '''
+        self.viewport = (width, height)
+
+    def clear_cache(self):
+        '''
+        Drop all the chars and the atlas, they are loaded again when they are drawn.
+        '''
+        self.characters.clear()
+        self.atlas.clear()
+
+    def evict_char(self, keep=()):
+        '''
+        Evict the least recently used char, its place in the atlas is reused by the next char.
+
+        :param keep set: the chars not to evict, like the ones of the text being drawn.
+
+        :return evicted bool: False if all the chars are kept.
+        '''
+        for char in self.characters:
+            if char not in keep:
+                break
+        else:
+            return False
+
+        ch = self.characters.pop(char)
+        if ch['page'] >= 0:
+            self.atlas.remove(ch['page'], ch['uv'])
+        logger.debug(f'Evicted character: {char}')
+        return True
 
     def load_font(self, font_path, size):
         """初始化字体"""
@@ -44,23 +100,26 @@ class TextRenderer:
         self.default_face = freetype.Face(self.default_font_path)
         self.default_face.set_char_size(size << 6)
 
+        # 图集的行至少一个行高，每个字形都放得进任一行中空出的位置
+        self.atlas.shelf_height = max(
+            self.face.size.height, self.default_face.size.height) // 64 + 2 * self.atlas.padding
+
         logger.info(f'Using font: {font_path} ({size})')
         logger.info(f'Using font(default): {self.default_font_path} ({size})')
 
-    def load_char(self, char):
-        """动态加载单个字符（支持中文字符）"""
-        # 如果字符已在缓存中，移到最前面表示最近使用
+    def load_char(self, char, keep=()):
+        """
+        动态加载单个字符（支持中文字符）
+
+        :param keep set: the chars not to evict for loading the char, see evict_char().
+        """
         if char in self.characters:
             self.characters.move_to_end(char)
             return self.characters[char]
 
-        # 如果缓存已满，移除最久未使用的字符
-        if len(self.characters) >= self.max_cache_size:
-            oldest_char = next(iter(self.characters))
-            glDeleteTextures([self.characters[oldest_char]['texture']])
-            del self.characters[oldest_char]
-            logger.warning(
-                f'Characters cache exceeds limit, removed: {oldest_char}')
+        # 如果缓存已满，淘汰最久未使用的字符
+        while len(self.characters) >= self.max_cache_size and self.evict_char(keep):
+            pass
 
         # 加载新字符
         self.face.load_char(char, freetype.FT_LOAD_RENDER |
@@ -91,43 +150,25 @@ class TextRenderer:
                        metrics.horiBearingY) >> 6
         actual_bbox_height = bbox_height
 
-        # 将单通道位图转换为RGBA格式
-
-        # -------------------------
-        # It is Slow.
-        # for i in range(bitmap.rows):
-        #     for j in range(bitmap.width):
-        #         value = bitmap.buffer[i * bitmap.width + j]
-        #         rgba_data.extend([255, 255, 255, value])  # 白色+alpha
-        # -------------------------
-
-        buffer = np.array(bitmap.buffer, dtype=np.uint8).reshape(
-            (bitmap.rows, bitmap.width))
-        rgba_data = np.zeros((bitmap.rows, bitmap.width, 4), dtype=np.uint8)
-        rgba_data[..., :3] = 255  # 设置RGB为白色
-        rgba_data[..., 3] = buffer  # 设置Alpha通道
-        rgba_data = rgba_data.flatten()
-
-        # 生成纹理
-        texture = glGenTextures(1)
-        glBindTexture(GL_TEXTURE_2D, texture)
-        glTexImage2D(
-            GL_TEXTURE_2D, 0, GL_RGBA,
-            bitmap.width, bitmap.rows,
-            0, GL_RGBA, GL_UNSIGNED_BYTE,
-            rgba_data
-        )
-
-        # 设置纹理参数
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        # 单通道位图直接放入 GL_ALPHA 图集，颜色来自 glColor
+        # 空白字符（如空格）不占用图集
+        page, uv = -1, (0.0, 0.0, 0.0, 0.0)
+        if bitmap.width > 0 and bitmap.rows > 0:
+            # 直接读取 FreeType 的缓冲区，上传之前不会加载下一个字形
+            page, uv = self.atlas.add(bitmap_view(bitmap), bitmap.width)
+            # 图集已满时淘汰字符，直到有放得下的位置
+            while page is None and self.evict_char(keep):
+                page, uv = self.atlas.add(bitmap_view(bitmap), bitmap.width)
+            if page is None:
+                logger.warning(
+                    f'Atlas is full of the chars being drawn, {char} is not drawn')
+                return self.blank_char(char, face.glyph.advance.x >> 6)
 
         # 存储字符信息
         self.characters[char] = {
             'char': char,
-            'texture': texture,
+            'page': page,
+            'uv': uv,
             'size': (bitmap.width, bitmap.rows),
             'bearing': (face.glyph.bitmap_left, face.glyph.bitmap_top),
             'advance': face.glyph.advance.x >> 6,
@@ -140,8 +181,9 @@ class TextRenderer:
             'glyph_index': glyph_index
         }
 
-        # 将新字符移到最前面
-        self.characters.move_to_end(char, last=False)
+        # 排版用的度量: advance, bearing, size, uv
+        ch = self.characters[char]
+        ch['quad'] = (ch['advance'], *ch['bearing'], *ch['size'], *uv)
         logger.debug(f'Loaded character: {char}, {self.characters[char]}')
         return self.characters[char]
 
@@ -171,22 +213,105 @@ class TextRenderer:
 
         return width, height, height2
 
+    def blank_char(self, char, advance):
+        '''
+        The char which is not cached and only moves the pen, for the glyph without room in the atlas.
+        '''
+        return {'char': char, 'page': -1, 'advance': advance,
+                'bbox_height': 0, 'descender': 0,
+                'quad': (advance, 0, 0, 0, 0, 0, 0, 0, 0)}
+
+    def load_chars(self, text):
+        """
+        Load the chars of the text, the chars of the text are not evicted by each other.
+
+        :return chars list: the chars, the ones without room in the atlas only move the pen.
+        """
+        characters = self.characters
+        keep = set(text)
+        if len(keep) > self.max_cache_size:
+            logger.warning(
+                f'Too many chars in the text to draw at once: {len(keep)}, the cache exceeds {self.max_cache_size} for them')
+        chars = []
+        for c in text:
+            ch = characters.get(c)
+            if ch is None:
+                ch = self.load_char(c, keep)
+            else:
+                characters.move_to_end(c)
+            chars.append(ch)
+        return chars
+
+    def layout(self, text, x, y, scale=1.0):
+        """
+        Lay out the quads of the text, its SW corner on (x, y).
+        The chars without pixels (like space) only move the pen.
+
+        Every char is 4 vertices of GL_QUADS,
+        the SW, SE, NE, NW corners of the glyph on the screen.
+
+        :return vertices np.array: the (n*4, 2) float32 positions.
+        :return texcoords np.array: the (n*4, 2) float32 texture coordinates.
+        :return runs list: the (page, count) runs of the quads.
+        """
+        chars = self.load_chars(text)
+        quads = np.array([ch['quad'] for ch in chars], dtype=np.float32)
+        pages = np.array([ch['page'] for ch in chars], dtype=np.int32)
+        advance, bx, by, w, h, u0, v0, u1, v1 = quads.T
+
+        # 画笔位置，不含当前字符的前缀和
+        pen = np.cumsum(advance) - advance
+
+        # 跳过空白字符，按图集页排序，每页一次绘制
+        visible = np.flatnonzero(pages >= 0)
+        order = visible[np.argsort(pages[visible], kind='stable')]
+        pages = pages[order]
+
+        x0 = x + (pen[order] + bx[order]) * scale
+        y0 = y - (h[order] - by[order]) * scale
+        x1 = x0 + w[order] * scale
+        y1 = y0 + h[order] * scale
+        u0, v0, u1, v1 = u0[order], v0[order], u1[order], v1[order]
+
+        n = len(order)
+        vertices = np.empty((n, 4, 2), dtype=np.float32)
+        vertices[:, :, 0] = np.stack([x0, x1, x1, x0], axis=1)
+        vertices[:, :, 1] = np.stack([y0, y0, y1, y1], axis=1)
+        # 纹理的 v0 是字形的顶部
+        texcoords = np.empty((n, 4, 2), dtype=np.float32)
+        texcoords[:, :, 0] = np.stack([u0, u1, u1, u0], axis=1)
+        texcoords[:, :, 1] = np.stack([v1, v1, v0, v0], axis=1)
+
+        bounds = [0] + (np.flatnonzero(pages[1:] != pages[:-1]) + 1).tolist() + [n]
+        runs = [(int(pages[a]), b - a) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+        return vertices.reshape(-1, 2), texcoords.reshape(-1, 2), runs
+
     def render_text(self, text, x, y, scale=1.0, color=(1.0, 1.0, 1.0, 1.0)):
         '''
         Draw the text at its SW corner.
+        All the chars of the text are drawn from one vertex array, one draw for every atlas page.
         '''
+        if not text:
+            return
+
+        vertices, texcoords, runs = self.layout(text, x, y, scale)
+        if not runs:
+            return
+
         # 启用必要的OpenGL状态
         # glEnable(GL_BLEND)
         glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
         glEnable(GL_TEXTURE_2D)
+        glTexEnvi(GL_TEXTURE_ENV, GL_TEXTURE_ENV_MODE, GL_MODULATE)
 
         # 设置颜色（包含alpha通道）
         glColor4f(*color)
 
-        # 获取视口尺寸用于坐标转换
-        viewport = glGetIntegerv(GL_VIEWPORT)
-        screen_width = viewport[2]
-        screen_height = viewport[3]
+        # 视口尺寸用于坐标转换，只查询一次
+        if self.viewport is None:
+            viewport = glGetIntegerv(GL_VIEWPORT)
+            self.viewport = (int(viewport[2]), int(viewport[3]))
+        screen_width, screen_height = self.viewport
 
         # 设置正交投影
         glMatrixMode(GL_PROJECTION)
@@ -198,35 +323,20 @@ class TextRenderer:
         glPushMatrix()
         glLoadIdentity()
 
-        for char in text:
-            self.load_char(char)
-
-            ch = self.characters[char]
-            xpos = x + ch['bearing'][0] * scale
-            ypos = y - (ch['size'][1] - ch['bearing'][1]) * scale
-
-            w = ch['size'][0] * scale
-            h = ch['size'][1] * scale
-
-            # 绑定字符纹理
-            glBindTexture(GL_TEXTURE_2D, ch['texture'])
-
-            # 绘制字符
-            glBegin(GL_QUADS)
-            glTexCoord2f(0, 0)
-            glVertex2f(xpos, ypos + h)  # 左下角
-
-            glTexCoord2f(1, 0)
-            glVertex2f(xpos + w, ypos + h)  # 右下角
-
-            glTexCoord2f(1, 1)
-            glVertex2f(xpos + w, ypos)  # 右上角
+        # 客户端顶点数组，整个字符串一次提交
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        glVertexPointer(2, GL_FLOAT, 0, vertices)
+        glTexCoordPointer(2, GL_FLOAT, 0, texcoords)
 
-            glTexCoord2f(0, 1)
-            glVertex2f(xpos, ypos)  # 左上角
-            glEnd()
+        start = 0
+        for page, count in runs:
+            glBindTexture(GL_TEXTURE_2D, self.atlas.pages[page])
+            glDrawArrays(GL_QUADS, start * 4, count * 4)
+            start += count
 
-            x += ch['advance'] * scale
+        glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
 
         # 恢复矩阵状态
         glMatrixMode(GL_PROJECTION)